@@ -0,0 +1,307 @@
+import argparse                                                                 as _argparse
+import datetime                                                                 as _datetime
+import json                                                                     as _json
+import os                                                                       as _os
+import platform                                                                 as _platform
+import sys                                                                      as _sys
+import tempfile                                                                 as _tempfile
+import time                                                                     as _time
+import uuid                                                                     as _uuid
+
+from conway_acceptance.benchmarks.synthetic_scenario_spec                      import SyntheticScenarioSpec
+from conway_acceptance.benchmarks.synthetic_scenario_generator                 import SyntheticScenarioGenerator
+from conway_acceptance.benchmarks.synthetic_test_database                      import SyntheticScenarioManifest, \
+                                                                                        SyntheticTestDatabase
+from conway_acceptance.test_logic.acceptance_test_case                         import AcceptanceTestCase
+from conway_acceptance.test_logic.acceptance_test_notes                        import AcceptanceTestNotes
+from conway_acceptance.test_logic.excels_to_compare                            import ExcelsToCompare, WorksheetComparisonInfo
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class _HarnessTestCase(AcceptanceTestCase):
+    '''
+    AcceptanceTestCase through which the benchmark calls the harness's assertions. It is never run by unittest.
+    '''
+    def runTest(self):
+        pass
+
+
+class _HarnessContext():
+
+    def __init__(self, manifest, notes, seeding_round):
+        '''
+        Stands in for an AcceptanceTestContext, with just the attributes that AcceptanceTestCase's assertions use.
+        The benchmark seeds the database itself, so that it can time each step, and doesn't need an Application.
+        '''
+        self.manifest                                           = manifest
+        self.notes                                              = notes
+        self.seeding_round                                      = seeding_round
+
+
+class HarnessBenchmark():
+
+    # Names of the timed steps, as they appear in the results
+    STAGE_GENERATE                                              = "generate_scenario"
+    STAGE_POPULATE                                              = "populate_from_seed"
+    STAGE_ENRICH                                                = "enrich_from_seed"
+    STAGE_SNAPSHOT                                              = "create_snapshot"
+    STAGE_GET_FILES                                             = "get_files"
+    STAGE_ASSERT                                                = "assert_database_structure"
+    STAGE_TOTAL                                                 = "total"
+
+    # By default a stage regresses if it is more than 20% slower than in the baseline
+    DEFAULT_THRESHOLD                                           = 0.2
+
+    # Stages faster than this in the baseline are not checked for regressions, since their timing is mostly noise
+    MIN_BASELINE_SECONDS                                        = 0.01
+
+    def __init__(self, spec, work_folder, copy_strategy=TestStatics.COPY_STRATEGY_CLONE, digest_fast_path=False,
+                 repeats=3, pipeline_seeding=False):
+        '''
+        Times the test harness end to end on a synthetic scenario, so that changes to the harness can be checked
+        for performance regressions without any application, DataHub or network access.
+
+        The scenario described by `spec` is generated once. Then, `repeats` times, the harness goes through all its
+        seeding rounds like a test case would: seed the database (`populate_from_seed` in round 0,
+        `enrich_from_seed` afterwards), `create_snapshot`, list the files of ACTUALS@latest with `_get_files`, and
+        `assert_database_structure` against EXPECTED@T{round + 1} for all the Excel files. For each step, the
+        fastest of the repeats is kept, since slower ones are due to noise rather than to the code.
+
+        If `spec.mismatch_rate` is bigger than 0, assertions fail, as intended. The benchmark records the failures
+        and carries on, so the time spent reporting differences is measured too.
+
+        @param spec A SyntheticScenarioSpec object.
+
+        @param work_folder A string, the absolute path of the folder under which the scenario is generated. It
+                serves as the scenarios' root folder, so the harness's shared caches are created under it too.
+
+        @param copy_strategy A string, the TestDatabase copy strategy, either TestStatics.COPY_STRATEGY_CLONE or
+                TestStatics.COPY_STRATEGY_PLAIN.
+
+        @param digest_fast_path A boolean, passed to the AcceptanceTestCase. By default it is False, since otherwise
+                a passing scenario would not load any Excel file and comparisons would not be measured.
+
+        @param repeats An int, the number of times the seeding rounds are timed.
+
+        @param pipeline_seeding A boolean, to set the TestDatabase's `pipeline_seeding` attribute. If True, each
+                round's seed is staged in the background while the previous round's snapshot and assertions run, as
+                AcceptanceTestContext would do, and the "enrich_from_seed" stage times `seed` instead.
+        '''
+        self.spec                                               = spec
+        self.work_folder                                        = work_folder
+        self.copy_strategy                                      = copy_strategy
+        self.digest_fast_path                                   = digest_fast_path
+        self.repeats                                            = repeats
+        self.pipeline_seeding                                   = pipeline_seeding
+
+    def run(self):
+        '''
+        Returns a JSON-serializable dictionary with the outcome of the benchmark:
+
+        * "spec": the spec's attributes
+        * "stages": a dictionary from stage name to the fastest time, in seconds, summed over all seeding rounds
+        * "rounds": a list with a dictionary per seeding round, with the fastest time of each stage in that round
+          and the number of assertion failures
+        * "environment": information about the machine, since timings are only comparable on the same one
+        '''
+        _os.makedirs(self.work_folder, exist_ok=True)
+
+        start_time                                              = _time.perf_counter()
+        SyntheticScenarioGenerator(self.spec, self.work_folder).create_scenario()
+        generation_seconds                                      = _time.perf_counter() - start_time
+
+        repeats_l                                               = [self._run_rounds() for idx in range(max(self.repeats, 1))]
+
+        rounds_l                                                = []
+        for seeding_round in range(self.spec.seeding_rounds):
+            timings_l                                           = [rounds[seeding_round] for rounds in repeats_l]
+            round_dict                                          = {"seeding_round": seeding_round}
+            for stage in timings_l[0]["stages"].keys():
+                round_dict[stage]                               = min([timings["stages"][stage] for timings in timings_l])
+            round_dict["failures"]                              = timings_l[0]["failures"]
+            rounds_l.append(round_dict)
+
+        stages_dict                                             = {self.STAGE_GENERATE: generation_seconds}
+        for stage in [self.STAGE_POPULATE, self.STAGE_ENRICH, self.STAGE_SNAPSHOT, self.STAGE_GET_FILES,
+                      self.STAGE_ASSERT]:
+            stages_dict[stage]                                  = sum([round_dict.get(stage, 0.0) for round_dict in rounds_l])
+        stages_dict[self.STAGE_TOTAL]                           = min([sum([sum(timings["stages"].values()) for timings in rounds])
+                                                                       for rounds in repeats_l])
+
+        return {"spec":                 dict(vars(self.spec)),
+                "copy_strategy":        self.copy_strategy,
+                "digest_fast_path":     self.digest_fast_path,
+                "repeats":              self.repeats,
+                "pipeline_seeding":     self.pipeline_seeding,
+                "stages":               stages_dict,
+                "rounds":               rounds_l,
+                "environment":          self._environment()}
+
+    def _run_rounds(self):
+        '''
+        Goes once through all the seeding rounds of the scenario, and returns a list with a dictionary per round,
+        with the time of each stage and the number of assertion failures.
+        '''
+        manifest                                                = SyntheticScenarioManifest(self.work_folder, self.spec)
+        test_database                                           = SyntheticTestDatabase(manifest, copy_strategy=self.copy_strategy)
+        test_database.pipeline_seeding                          = self.pipeline_seeding
+
+        test_case                                               = _HarnessTestCase()
+        test_case.setUp()
+        test_case.digest_fast_path                              = self.digest_fast_path
+        # Otherwise the second repeat would find the expected frames already parsed and be faster than the first
+        test_case.cache_expected_frames                         = False
+        test_case.persist_expected_manifests                    = False
+
+        excels_to_compare                                       = ExcelsToCompare()
+        rounds_l                                                = []
+        for seeding_round in range(self.spec.seeding_rounds):
+            for hub in self.spec.hub_names():
+                for workbook in self.spec.seeded_workbooks(seeding_round):
+                    excels_to_compare.addXL(hub + "/" + workbook, [WorksheetComparisonInfo(sheet)
+                                                                   for sheet in self.spec.sheet_names()])
+
+            notes                                               = AcceptanceTestNotes("BENCHMARK", test_case.run_timestamp)
+            ctx                                                 = _HarnessContext(manifest, notes, seeding_round)
+            stages_dict                                         = {}
+
+            start_time                                          = _time.perf_counter()
+            if seeding_round == 0:
+                test_database.populate_from_seed()
+                stages_dict[self.STAGE_POPULATE]                = _time.perf_counter() - start_time
+            elif self.pipeline_seeding:
+                test_database.seed(seeding_round)
+                stages_dict[self.STAGE_ENRICH]                  = _time.perf_counter() - start_time
+            else:
+                test_database.enrich_from_seed(seeding_round)
+                stages_dict[self.STAGE_ENRICH]                  = _time.perf_counter() - start_time
+            if self.pipeline_seeding:
+                test_database.stage_seed(seeding_round + 1)
+
+            start_time                                          = _time.perf_counter()
+            test_database.create_snapshot(seeding_round + 1)
+            stages_dict[self.STAGE_SNAPSHOT]                    = _time.perf_counter() - start_time
+
+            start_time                                          = _time.perf_counter()
+            test_case._get_files(manifest.path_to_actuals())
+            stages_dict[self.STAGE_GET_FILES]                   = _time.perf_counter() - start_time
+
+            failures                                            = 0
+            start_time                                          = _time.perf_counter()
+            try:
+                test_case.assert_database_structure(ctx, excels_to_compare, snapshot_count=seeding_round + 1)
+            except AssertionError:
+                failures                                        += 1
+            stages_dict[self.STAGE_ASSERT]                      = _time.perf_counter() - start_time
+
+            rounds_l.append({"stages": stages_dict, "failures": failures})
+        return rounds_l
+
+    def _environment(self):
+        return {"python":       _platform.python_version(),
+                "platform":     _platform.platform(),
+                "cpu_count":    _os.cpu_count(),
+                "timestamp":    _datetime.datetime.now().strftime("%y%m%d.%H%M%S")}
+
+    @staticmethod
+    def compare_to_baseline(results_dict, baseline_dict, threshold=DEFAULT_THRESHOLD):
+        '''
+        Returns a list of strings, one for each stage that is slower in `results_dict` than in `baseline_dict` by
+        more than the fraction `threshold`. It is empty if there is no regression.
+
+        Stages that take less than HarnessBenchmark.MIN_BASELINE_SECONDS in the baseline, or that are missing from
+        either, are not checked.
+
+        @param results_dict A dictionary returned by `run`.
+
+        @param baseline_dict A dictionary returned by `run` in an earlier run, normally on the same machine and
+                for the same spec.
+
+        @param threshold A float, e.g. 0.2 to tolerate stages being up to 20% slower.
+        '''
+        regressions_l                                           = []
+        if baseline_dict.get("spec") != results_dict.get("spec"):
+            regressions_l.append("Baseline was measured for a different spec, so timings are not comparable: "
+                                 + _json.dumps(baseline_dict.get("spec")))
+            return regressions_l
+
+        for stage, baseline_seconds in baseline_dict.get("stages", {}).items():
+            seconds                                             = results_dict.get("stages", {}).get(stage)
+            if seconds is None or stage == HarnessBenchmark.STAGE_GENERATE \
+                    or baseline_seconds < HarnessBenchmark.MIN_BASELINE_SECONDS:
+                continue
+            if seconds > baseline_seconds * (1 + threshold):
+                regressions_l.append(stage + ": " + "{:.4f}".format(seconds) + "s vs. " + "{:.4f}".format(baseline_seconds)
+                                     + "s in baseline (+" + "{:.0%}".format(seconds / baseline_seconds - 1) + ")")
+        return regressions_l
+
+
+def main(argv=None):
+    '''
+    Command line interface to run the benchmark. Results are printed and, if `--output` is given, saved as JSON.
+    If `--baseline` is given, it exits with a non-zero status when a stage regressed, so it can be used as a
+    check in CI. For example:
+
+        python -m conway_acceptance.benchmarks.harness_benchmark --workbooks 20 --rows 2000 --output bench.json
+        python -m conway_acceptance.benchmarks.harness_benchmark --workbooks 20 --rows 2000 --baseline bench.json
+    '''
+    parser                                                      = _argparse.ArgumentParser(
+                                                                        description = "Time the acceptance test harness on a synthetic scenario")
+    parser.add_argument("--hubs", type=int, default=2, help="Number of DataHubs")
+    parser.add_argument("--workbooks", type=int, default=10, help="Number of Excel files per DataHub")
+    parser.add_argument("--sheets", type=int, default=2, help="Number of worksheets per Excel file")
+    parser.add_argument("--rows", type=int, default=1000, help="Number of rows per worksheet")
+    parser.add_argument("--columns", type=int, default=10, help="Number of columns per worksheet")
+    parser.add_argument("--mismatch-rate", type=float, default=0.0, help="Fraction of cells that differ from expectations")
+    parser.add_argument("--rounds", type=int, default=2, help="Number of seeding rounds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generated data")
+    parser.add_argument("--copy-strategy", default=TestStatics.COPY_STRATEGY_CLONE,
+                        choices=[TestStatics.COPY_STRATEGY_CLONE, TestStatics.COPY_STRATEGY_PLAIN])
+    parser.add_argument("--digest-fast-path", action="store_true", help="Skip comparing Excel files with matching digests")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of measurements")
+    parser.add_argument("--pipeline-seeding", action="store_true",
+                        help="Stage each round's seed in the background while the previous round runs")
+    parser.add_argument("--workdir", default=None, help="Folder for the generated scenario. Defaults to a temporary folder")
+    parser.add_argument("--output", default=None, help="JSON file in which to save the results")
+    parser.add_argument("--baseline", default=None, help="JSON file with results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=HarnessBenchmark.DEFAULT_THRESHOLD,
+                        help="Fraction by which a stage may be slower than in the baseline")
+    args                                                        = parser.parse_args(argv)
+
+    spec                                                        = SyntheticScenarioSpec(scenario_id         = 1,
+                                                                                        hub_count           = args.hubs,
+                                                                                        workbook_count      = args.workbooks,
+                                                                                        sheet_count         = args.sheets,
+                                                                                        row_count           = args.rows,
+                                                                                        column_count        = args.columns,
+                                                                                        mismatch_rate       = args.mismatch_rate,
+                                                                                        seeding_rounds      = args.rounds,
+                                                                                        random_seed         = args.seed)
+    work_folder                                                 = args.workdir
+    if work_folder is None:
+        work_folder                                             = _tempfile.mkdtemp(prefix="conway_acceptance_benchmark_")
+
+    results_dict                                                = HarnessBenchmark(spec, work_folder,
+                                                                                   copy_strategy       = args.copy_strategy,
+                                                                                   digest_fast_path    = args.digest_fast_path,
+                                                                                   repeats             = args.repeats,
+                                                                                   pipeline_seeding    = args.pipeline_seeding).run()
+    regressions_l                                               = []
+    if args.baseline is not None:
+        with open(args.baseline, 'r', encoding="UTF8") as reader:
+            baseline_dict                                       = _json.load(reader)
+        regressions_l                                           = HarnessBenchmark.compare_to_baseline(results_dict, baseline_dict,
+                                                                                                       threshold = args.threshold)
+        results_dict["regressions"]                             = regressions_l
+
+    print(_json.dumps(results_dict, indent=2))
+    if args.output is not None:
+        tmp_path                                                = args.output + "." + _uuid.uuid4().hex + ".tmp"
+        with open(tmp_path, 'w', encoding="UTF8") as writer:
+            _json.dump(results_dict, writer, indent=2)
+        _os.replace(tmp_path, args.output)
+
+    _sys.exit(1 if len(regressions_l) > 0 else 0)
+
+if __name__ == "__main__":
+    main()
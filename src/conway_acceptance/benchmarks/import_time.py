@@ -0,0 +1,109 @@
+import argparse                                                                 as _argparse
+import json                                                                     as _json
+import subprocess                                                               as _subprocess
+import sys                                                                      as _sys
+
+
+class ImportTimeBenchmark():
+
+    # Modules that test collection should be able to import without loading any heavy dependency
+    DEFAULT_MODULES                                             = ["conway_acceptance.test_logic.acceptance_test_case",
+                                                                   "conway_acceptance.test_logic.acceptance_test_context",
+                                                                   "conway_acceptance.util.scenarios_config"]
+
+    # Dependencies that must only be loaded when a comparison or seeding actually happens
+    DEFAULT_FORBIDDEN_MODULES                                   = ["pandas", "numpy", "openpyxl", "pyarrow",
+                                                                   "conway.application.application"]
+
+    DEFAULT_BUDGET_SECONDS                                      = 0.5
+    DEFAULT_REPEATS                                             = 5
+
+    # Run in a fresh interpreter for each measurement, so that nothing is imported yet (a "cold" import). It prints
+    # a JSON object with the import time and the forbidden modules that got loaded.
+    _PROBE                                                      = """
+import json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1].split(","):
+    __import__(name)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [name for name in sys.argv[2].split(",") if name and name in sys.modules]}))
+"""
+
+    def __init__(self, modules_l=DEFAULT_MODULES, budget_seconds=DEFAULT_BUDGET_SECONDS, repeats=DEFAULT_REPEATS,
+                 forbidden_modules_l=DEFAULT_FORBIDDEN_MODULES):
+        '''
+        Measures how long a fresh Python interpreter takes to import `modules_l`, to catch changes that make
+        test collection slow, such as a module-level import of pandas in a module that every test imports.
+
+        The import is measured `repeats` times, each in a new interpreter, and the fastest time is kept, since
+        slower ones are due to noise (other processes, cold disk caches) rather than to the code.
+
+        @param modules_l A list of strings, the names of the modules to import.
+
+        @param budget_seconds A float, the maximum acceptable import time.
+
+        @param repeats An int, the number of measurements.
+
+        @param forbidden_modules_l A list of strings, names of modules that must not be loaded as a side effect of
+                importing `modules_l`.
+        '''
+        self.modules_l                                          = modules_l
+        self.budget_seconds                                     = budget_seconds
+        self.repeats                                            = repeats
+        self.forbidden_modules_l                                = forbidden_modules_l
+
+    def run(self):
+        '''
+        Returns a dictionary with the outcome of the benchmark:
+
+        * "seconds": the fastest import time measured
+        * "budget_seconds": the budget
+        * "loaded_forbidden_modules": a list of the forbidden modules that were loaded
+        * "passed": True if the import time is within budget and no forbidden module was loaded
+        '''
+        measurements_l                                          = [self._measure() for idx in range(self.repeats)]
+        seconds                                                 = min([measurement["seconds"] for measurement in measurements_l])
+        loaded_l                                                = sorted(set([name for measurement in measurements_l
+                                                                              for name in measurement["loaded"]]))
+        return {"modules":                      self.modules_l,
+                "seconds":                      seconds,
+                "budget_seconds":               self.budget_seconds,
+                "loaded_forbidden_modules":     loaded_l,
+                "passed":                       seconds <= self.budget_seconds and len(loaded_l) == 0}
+
+    def _measure(self):
+        completed                                               = _subprocess.run([_sys.executable, "-c", self._PROBE,
+                                                                                   ",".join(self.modules_l),
+                                                                                   ",".join(self.forbidden_modules_l)],
+                                                                                  capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError("Could not import " + ", ".join(self.modules_l) + ":\n" + completed.stderr)
+        return _json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    '''
+    Command line interface to run the benchmark. It exits with a non-zero status if the import time exceeds the
+    budget or a forbidden module is loaded, so it can be used as a check in CI. For example:
+
+        python -m conway_acceptance.benchmarks.import_time --budget 0.3
+    '''
+    parser                                                      = _argparse.ArgumentParser(
+                                                                        description = "Check the cold import time of conway_acceptance")
+    parser.add_argument("--modules", nargs="*", default=ImportTimeBenchmark.DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--budget", type=float, default=ImportTimeBenchmark.DEFAULT_BUDGET_SECONDS,
+                        help="Maximum import time, in seconds")
+    parser.add_argument("--repeats", type=int, default=ImportTimeBenchmark.DEFAULT_REPEATS, help="Number of measurements")
+    parser.add_argument("--forbidden", nargs="*", default=ImportTimeBenchmark.DEFAULT_FORBIDDEN_MODULES,
+                        help="Modules that must not be loaded by the import")
+    args                                                        = parser.parse_args(argv)
+
+    outcome_dict                                                = ImportTimeBenchmark(modules_l           = args.modules,
+                                                                                      budget_seconds      = args.budget,
+                                                                                      repeats             = args.repeats,
+                                                                                      forbidden_modules_l = args.forbidden).run()
+    print(_json.dumps(outcome_dict, indent=2))
+    _sys.exit(0 if outcome_dict["passed"] else 1)
+
+if __name__ == "__main__":
+    main()
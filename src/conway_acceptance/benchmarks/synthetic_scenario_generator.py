@@ -0,0 +1,80 @@
+import os                                                                       as _os
+import random                                                                   as _random
+import shutil                                                                   as _shutil
+
+from conway_acceptance.scenario_foundry.scenario_generator                     import ScenarioGenerator
+from conway_acceptance.scenario_foundry.streaming_workbook_writer              import StreamingWorkbookWriter
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class SyntheticScenarioGenerator(ScenarioGenerator):
+
+    def __init__(self, spec, scenarios_root_folder):
+        '''
+        Generates the scenario for a SyntheticScenarioSpec under `scenarios_root_folder/<scenario_id>`, replacing
+        any previous one. The scenario looks like this, for 2 seeding rounds:
+
+            SEED@T0/hub_0/wb_0.xlsx, ..., SEED@T0/hub_1/...
+            SEED@T1/hub_0/wb_1.xlsx, ..., SEED@T1/hub_0/wb_new_T1.xlsx, ...
+            EXPECTED@T1/...         what ACTUALS@latest should contain after round 0
+            EXPECTED@T2/...         what ACTUALS@latest should contain after round 1
+
+        The benchmark's "business logic" does nothing, so ACTUALS@latest after round n is just the seeds of rounds
+        0 to n laid over each other. EXPECTED@T{n+1} contains exactly that, except for the fraction
+        `spec.mismatch_rate` of numeric cells, which are altered so that comparisons find differences.
+
+        Excel files are written with a StreamingWorkbookWriter, which needs no Excel installation or network access.
+
+        @param spec A SyntheticScenarioSpec object.
+
+        @param scenarios_root_folder A string, the absolute path of the folder under which to create the scenario.
+        '''
+        super().__init__(spec)
+
+        self.scenarios_root_folder                      = scenarios_root_folder
+
+    def create_scenario(self):
+        '''
+        Creates the scenario. Returns the absolute path of the scenario's folder.
+        '''
+        scenario_folder                                 = self.scenarios_root_folder + "/" + str(self.spec.scenario_id)
+        if _os.path.isdir(scenario_folder):
+            _shutil.rmtree(scenario_folder)
+
+        for seeding_round in range(self.spec.seeding_rounds):
+            seed_folder                                 = scenario_folder + "/" + TestStatics.SEED_FOLDER + "@" \
+                                                            + TestStatics.TEST_DB_SNAPSHOT_PREFIX + str(seeding_round)
+            expected_folder                             = scenario_folder + "/" + TestStatics.TEST_DATABASE_EXPECTED + "@" \
+                                                            + TestStatics.TEST_DB_SNAPSHOT_PREFIX + str(seeding_round + 1)
+            for hub in self.spec.hub_names():
+                for workbook in self.spec.seeded_workbooks(seeding_round):
+                    self._write_workbook(seed_folder + "/" + hub + "/" + workbook, hub, workbook, seeding_round,
+                                         mismatch_rate = 0.0)
+                for workbook, written_round in self.spec.latest_rounds(seeding_round).items():
+                    self._write_workbook(expected_folder + "/" + hub + "/" + workbook, hub, workbook, written_round,
+                                         mismatch_rate = self.spec.mismatch_rate)
+        return scenario_folder
+
+    def _write_workbook(self, path, hub, workbook, written_round, mismatch_rate):
+        '''
+        Writes an Excel file whose data is determined by the spec's random seed, the DataHub, the workbook's name
+        and the round whose seed wrote it, so that the seed and the expected output agree on it.
+        '''
+        mismatch_rng                                    = _random.Random(repr((self.spec.random_seed, hub, workbook, "mismatch")))
+
+        def _rows(data_rng):
+            for row in range(self.spec.row_count):
+                values_l                                = [row] + [round(data_rng.uniform(-1000, 1000), 4)
+                                                                   for idx in range(1, self.spec.column_count)]
+                if mismatch_rate > 0:
+                    values_l                            = [value + 1 if idx > 0 and mismatch_rng.random() < mismatch_rate
+                                                                else value
+                                                           for idx, value in enumerate(values_l)]
+                yield values_l
+
+        header_l                                        = ["id"] + ["value_" + str(idx) for idx in range(1, self.spec.column_count)]
+        with StreamingWorkbookWriter(path) as writer:
+            for sheet in self.spec.sheet_names():
+                data_rng                                = _random.Random(repr((self.spec.random_seed, hub, workbook,
+                                                                               written_round, sheet)))
+                writer.write_sheet(sheet, header_l, _rows(data_rng))
@@ -0,0 +1,76 @@
+from conway_acceptance.scenario_foundry.scenario_spec                          import ScenarioSpec
+
+
+class SyntheticScenarioSpec(ScenarioSpec):
+
+    def __init__(self, scenario_id, hub_count=2, workbook_count=10, sheet_count=2, row_count=1000, column_count=10,
+                 mismatch_rate=0.0, seeding_rounds=2, random_seed=0):
+        '''
+        Specification of a synthetic scenario, i.e., a scenario with made-up data of a configurable size, used to
+        benchmark the test harness itself rather than any application. See SyntheticScenarioGenerator for the
+        layout of the scenario it specifies.
+
+        @param scenario_id An integer that serves as the unique identifier for the scenario.
+
+        @param hub_count An int, the number of DataHubs, each of which is a folder in the test database.
+
+        @param workbook_count An int, the number of Excel files in each DataHub's seed for round 0.
+
+        @param sheet_count An int, the number of worksheets in each Excel file.
+
+        @param row_count An int, the number of data rows in each worksheet (in addition to the header row).
+
+        @param column_count An int, the number of columns in each worksheet.
+
+        @param mismatch_rate A float between 0 and 1, the fraction of numeric cells that differ between the expected
+                output and what the harness will find in ACTUALS. If 0, the scenario passes.
+
+        @param seeding_rounds An int, the number of seeding rounds (SEED@T0, SEED@T1, ...). Rounds after the first
+                modify a quarter of the Excel files and add a new one to each DataHub.
+
+        @param random_seed An int, so that the same spec always generates the same data.
+        '''
+        super().__init__(scenario_id)
+
+        self.hub_count                              = hub_count
+        self.workbook_count                         = workbook_count
+        self.sheet_count                            = sheet_count
+        self.row_count                              = row_count
+        self.column_count                           = column_count
+        self.mismatch_rate                          = mismatch_rate
+        self.seeding_rounds                         = seeding_rounds
+        self.random_seed                            = random_seed
+
+    def hub_names(self):
+        '''
+        Returns a list of strings, the names of the DataHubs' folders.
+        '''
+        return ["hub_" + str(idx) for idx in range(self.hub_count)]
+
+    def sheet_names(self):
+        '''
+        Returns a list of strings, the names of the worksheets in each Excel file.
+        '''
+        return ["Sheet" + str(idx + 1) for idx in range(self.sheet_count)]
+
+    def seeded_workbooks(self, seeding_round):
+        '''
+        Returns a list of strings, the names of the Excel files that the seed for `seeding_round` contains in
+        each DataHub.
+        '''
+        if seeding_round == 0:
+            return ["wb_" + str(idx) + ".xlsx" for idx in range(self.workbook_count)]
+        changed_l                                   = ["wb_" + str(idx) + ".xlsx" for idx in range(self.workbook_count)
+                                                        if (idx + seeding_round) % 4 == 0]
+        return changed_l + ["wb_new_T" + str(seeding_round) + ".xlsx"]
+
+    def latest_rounds(self, seeding_round):
+        '''
+        Returns a dictionary whose keys are the names of the Excel files in each DataHub of the test database after
+        seeding round `seeding_round`, and whose values are the rounds whose seed last wrote them.
+        '''
+        latest_dict                                 = {}
+        for past_round in range(seeding_round + 1):
+            for workbook in self.seeded_workbooks(past_round):
+                latest_dict[workbook]               = past_round
+        return latest_dict
@@ -0,0 +1,60 @@
+from conway_acceptance.scenario_foundry.scenario_manifest                      import ScenarioManifest
+from conway_acceptance.test_database.test_database                             import TestDatabase
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class SyntheticScenarioManifest(ScenarioManifest):
+
+    def __init__(self, scenarios_root_folder, spec):
+        '''
+        Manifest for a scenario created by a SyntheticScenarioGenerator.
+
+        @param scenarios_root_folder A string, the absolute path of the folder containing the scenario's folder.
+
+        @param spec The SyntheticScenarioSpec from which the scenario was generated.
+        '''
+        super().__init__(scenarios_root_folder, spec.scenario_id)
+
+        self.spec                                   = spec
+
+    def get_data_hubs(self):
+        '''
+        Returns an empty list, since synthetic test databases are seeded and snapshotted by copying folders rather
+        than through DataHubs.
+        '''
+        return []
+
+
+class SyntheticTestDatabase(TestDatabase):
+
+    def __init__(self, manifest, copy_strategy=TestStatics.COPY_STRATEGY_CLONE):
+        '''
+        TestDatabase for a scenario created by a SyntheticScenarioGenerator. Each DataHub is just a folder, so the
+        database is seeded and snapshotted with one of the copy strategies other than TestStatics.COPY_STRATEGY_DATAHUB.
+
+        @param manifest A SyntheticScenarioManifest object.
+
+        @param copy_strategy A string, either TestStatics.COPY_STRATEGY_CLONE or TestStatics.COPY_STRATEGY_PLAIN.
+        '''
+        super().__init__(manifest)
+
+        self.copy_strategy                          = copy_strategy
+
+    def hub_folders(self):
+        '''
+        Returns a list of strings, the names of the folders under the root of the test database where each of its
+        DataHubs resides.
+        '''
+        return self.manifest.spec.hub_names()
+
+    def populate_from_seed(self):
+        '''
+        Uses the data in seeds to initialize the contents of the database. If any prior contents exist, they will be removed.
+        '''
+        self._populate_by_copy(self.manifest.path_to_seed())
+
+    def enrich_from_seed(self, seeding_round):
+        '''
+        Uses the data in SEED@T{seeding_round} to enrich the contents of the database.
+        '''
+        self._enrich_by_copy(self.manifest.path_to_seed(seeding_round))
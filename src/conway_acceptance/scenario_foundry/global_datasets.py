@@ -0,0 +1,151 @@
+import os                                                                       as _os
+import threading                                                                as _threading
+
+from conway_acceptance.util.file_digest                                         import FileDigest
+
+
+class GlobalDatasets():
+
+    # The instance shared by all ScenarioGenerators in this process. See GlobalDatasets.install
+    _SHARED                                                     = None
+
+    def __init__(self, datasets_folder):
+        '''
+        Read-only access to the datasets that are common across all scenarios (see TestStatics.GLOBAL_DATASETS_FOLDER),
+        for ScenarioGenerators that use them as inputs.
+
+        Worksheets are parsed at most once per process and then served from memory, so generating many scenarios
+        from the same inputs doesn't parse them again for each scenario. When a ScenarioBatch preloads datasets
+        before starting its worker processes, workers started by forking inherit the parsed DataFrames without
+        parsing or copying them.
+
+        GOTCHA: the DataFrames returned are shared by every caller in the process, so they must not be modified.
+        Callers that need to modify one should work on a copy.
+
+        @param datasets_folder A string, the absolute path of the folder with the global datasets.
+        '''
+        self.datasets_folder                                    = datasets_folder
+
+        self._frames_dict                                       = {}
+        self._digests_dict                                      = {}
+        self._lock                                              = _threading.Lock()
+
+        # While recording (see `start_recording`), the relative paths of the datasets accessed
+        self._recorded_s                                        = None
+
+    @staticmethod
+    def install(datasets_folder):
+        '''
+        Makes a GlobalDatasets for `datasets_folder` the one returned by `GlobalDatasets.shared()` in this process,
+        unless it already is, and returns it.
+        '''
+        if GlobalDatasets._SHARED is None or GlobalDatasets._SHARED.datasets_folder != datasets_folder:
+            GlobalDatasets._SHARED                              = GlobalDatasets(datasets_folder)
+        return GlobalDatasets._SHARED
+
+    @staticmethod
+    def shared():
+        '''
+        Returns the GlobalDatasets installed in this process with `GlobalDatasets.install`, or None if there is none.
+        '''
+        return GlobalDatasets._SHARED
+
+    def path_to(self, relative_path):
+        '''
+        Returns the absolute path of a file in the global datasets. Raises a ValueError if there is no such file.
+
+        @param relative_path A string, the path of the file relative to `self.datasets_folder`.
+        '''
+        path                                                    = self.datasets_folder + "/" + relative_path
+        if not _os.path.isfile(path):
+            raise ValueError("There is no global dataset '" + str(relative_path) + "' in '" + str(self.datasets_folder) + "'")
+        if self._recorded_s is not None:
+            self._recorded_s.add(relative_path)
+        return path
+
+    def start_recording(self):
+        '''
+        Starts recording which datasets are accessed through this object, so that a ScenarioBatch can tell which
+        datasets a scenario was generated from. Any previous recording is discarded.
+        '''
+        self._recorded_s                                        = set()
+
+    def stop_recording(self):
+        '''
+        Stops recording, and returns a sorted list of the relative paths of the datasets accessed since
+        `start_recording` was called.
+        '''
+        recorded_s                                              = self._recorded_s or set()
+        self._recorded_s                                        = None
+        return sorted(recorded_s)
+
+    def digest(self, relative_path):
+        '''
+        Returns a string, the FileDigest of a dataset, or None if there is no such dataset. Digests are computed at most
+        once per process for each version of the file, as identified by its size and modification time.
+
+        @param relative_path A string, the path of the dataset relative to `self.datasets_folder`.
+        '''
+        path                                                    = self.datasets_folder + "/" + relative_path
+        try:
+            stat                                                = _os.stat(path)
+        except OSError:
+            return None
+        key                                                     = (relative_path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest                                              = self._digests_dict.get(key)
+        if digest is None:
+            digest                                              = FileDigest().digest(path)
+            with self._lock:
+                self._digests_dict[key]                         = digest
+        return digest
+
+    def load_worksheets(self, relative_path, sheet_names_l):
+        '''
+        Returns a dictionary whose keys are the worksheet names in `sheet_names_l` and whose values are DataFrames with
+        their content, or None for worksheets that the Excel file doesn't have.
+
+        @param relative_path A string, the path of the Excel file relative to `self.datasets_folder`.
+
+        @param sheet_names_l A list of strings, the names of the worksheets to load.
+        '''
+        path                                                    = self.path_to(relative_path)
+        stat                                                    = _os.stat(path)
+        # The file's size and modification time are part of the key, so a dataset edited while a long-lived process
+        # runs is parsed again
+        key_prefix                                              = (relative_path, stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            result_dict                                         = {sheet: self._frames_dict.get(key_prefix + (sheet,))
+                                                                        for sheet in sheet_names_l}
+            sheets_to_read_l                                    = [sheet for sheet in sheet_names_l
+                                                                        if (key_prefix + (sheet,)) not in self._frames_dict]
+        if len(sheets_to_read_l) > 0:
+            # Imported here, so that importing this module doesn't load pandas
+            from conway_acceptance.test_logic.workbook_loader              import WorkbookLoader
+            from conway_acceptance.test_logic.excels_to_compare            import WorksheetComparisonInfo
+
+            loaded_dict                                         = WorkbookLoader(path).load([WorksheetComparisonInfo(sheet)
+                                                                                             for sheet in sheets_to_read_l])
+            with self._lock:
+                for sheet, df in loaded_dict.items():
+                    self._frames_dict[key_prefix + (sheet,)]    = df
+            result_dict.update(loaded_dict)
+        return result_dict
+
+    def load_worksheet(self, relative_path, sheet_name):
+        '''
+        Returns a DataFrame with the content of a worksheet of an Excel file in the global datasets, or None if the
+        Excel file has no such worksheet.
+        '''
+        return self.load_worksheets(relative_path, [sheet_name])[sheet_name]
+
+    def preload(self, worksheets_dict):
+        '''
+        Parses worksheets ahead of time, so that they are in memory before worker processes are started.
+
+        @param worksheets_dict A dictionary whose keys are paths of Excel files relative to `self.datasets_folder`,
+                and whose values are lists of names of their worksheets to preload.
+        '''
+        for relative_path, sheet_names_l in worksheets_dict.items():
+            self.load_worksheets(relative_path, sheet_names_l)
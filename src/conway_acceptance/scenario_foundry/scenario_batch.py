@@ -0,0 +1,281 @@
+import concurrent.futures                                                       as _futures
+import multiprocessing                                                          as _multiprocessing
+import os                                                                       as _os
+import sys                                                                      as _sys
+import time                                                                     as _time
+import traceback                                                                as _traceback
+
+from conway_acceptance.scenario_foundry.global_datasets                        import GlobalDatasets
+from conway_acceptance.scenario_foundry.spec_fingerprint                       import SpecFingerprint
+
+
+class ScenarioGenerationResult():
+
+    STATUS_GENERATED                                            = "GENERATED"
+    STATUS_ERROR                                                = "ERROR"
+    STATUS_UP_TO_DATE                                           = "UP_TO_DATE"
+    # In dry runs, for scenarios that are not up to date and so would be generated
+    STATUS_STALE                                                = "STALE"
+
+    def __init__(self, scenario_id):
+        '''
+        Data structure class with the outcome of generating a scenario in a ScenarioBatch. Instances are created in
+        worker processes, so they only hold plain data.
+
+        @param scenario_id The id of the scenario's ScenarioSpec.
+        '''
+        self.scenario_id                                        = scenario_id
+        self.status                                             = self.STATUS_ERROR
+        self.seconds                                            = 0.0
+        self.problem_lines_l                                    = []
+        # Why the scenario is (or, in a dry run, would be) generated, or is up to date
+        self.reasons_l                                          = []
+
+
+class ScenarioBatch():
+
+    def __init__(self, generator_factory, global_datasets_folder=None, max_workers=None, preload_worksheets_dict=None,
+                 scenarios_root_folder=None, code_version=None, force=False):
+        '''
+        Generates the scenarios for many ScenarioSpecs across a pool of processes, instead of in a serial loop. This is
+        possible because each scenario is generated into its own folder.
+
+        Each worker process has a GlobalDatasets for `global_datasets_folder`, which ScenarioGenerators get from
+        `ScenarioGenerator.global_datasets()`, so a dataset that many scenarios read is parsed once per worker rather
+        than once per scenario. Datasets in `preload_worksheets_dict` are parsed once, in this process, before the
+        workers are started, so workers share them without parsing them at all. That requires workers to be started
+        by forking, so the "fork" start method is used where available (Linux and macOS), whatever the default is.
+        Where it isn't (Windows), preloading is skipped, since each worker would parse the datasets anyway.
+
+        If `scenarios_root_folder` is given, generation is incremental: a SpecFingerprint is saved in the folder of
+        each scenario generated, and scenarios whose fingerprint is unchanged are skipped. The fingerprint covers the
+        generator, `code_version`, the spec's `fingerprint_fields()`, and the digests of the global datasets that the
+        scenario was generated from, which are those listed by the spec's `input_datasets()` plus those the
+        generator accessed through its GlobalDatasets. A scenario whose generated SEED@T* or EXPECTED@* files were
+        removed or modified since is also regenerated.
+
+        @param generator_factory A callable that takes a ScenarioSpec and returns the ScenarioGenerator for it, such as
+                a ScenarioGenerator class or a functools.partial of one. It must be picklable, so it can't be a
+                lambda or a local function.
+
+        @param global_datasets_folder A string, the absolute path of the folder with the global datasets. It may be None
+                if the generators don't read any.
+
+        @param max_workers An int, the number of processes. If None, it is the number of CPUs. If 1, scenarios are
+                generated in this process.
+
+        @param preload_worksheets_dict A dictionary whose keys are paths of Excel files relative to
+                `global_datasets_folder`, and whose values are lists of names of their worksheets to preload.
+
+        @param scenarios_root_folder A string, the absolute path of the folder under which the generators create
+                each scenario in the subfolder `<scenario_id>`. If None, every scenario is always generated.
+
+        @param code_version A string identifying the version of the generation code (e.g., a git commit hash), so that
+                changing the code makes all scenarios stale. If None, only changes to specs and datasets do.
+
+        @param force A boolean. If True, scenarios are generated even if they are up to date, and their fingerprints
+                are saved anew.
+        '''
+        self.generator_factory                                  = generator_factory
+        self.global_datasets_folder                             = global_datasets_folder
+        self.max_workers                                        = max_workers or _os.cpu_count() or 1
+        self.preload_worksheets_dict                            = preload_worksheets_dict
+        self.scenarios_root_folder                              = scenarios_root_folder
+        self.code_version                                       = code_version
+        self.force                                              = force
+
+    def run(self, specs_l, dry_run=False):
+        '''
+        Generates the scenarios that are not up to date and returns a list of ScenarioGenerationResult objects, in the
+        order of `specs_l`. A scenario that fails to generate doesn't stop the others: its result has status
+        ScenarioGenerationResult.STATUS_ERROR and the error in its `problem_lines_l`.
+
+        @param specs_l A list of ScenarioSpec objects. They must be picklable.
+
+        @param dry_run A boolean. If True, nothing is generated, and the results tell which scenarios would be generated
+                (with status ScenarioGenerationResult.STATUS_STALE) and why. See also `summary_lines`.
+        '''
+        datasets                                                = None
+        if self.global_datasets_folder is not None:
+            datasets                                            = GlobalDatasets.install(self.global_datasets_folder)
+
+        results_l                                               = [self._plan(spec, datasets) for spec in specs_l]
+        stale_idx_l                                             = [idx for idx, result in enumerate(results_l)
+                                                                        if result.status == ScenarioGenerationResult.STATUS_STALE]
+        if dry_run or len(stale_idx_l) == 0:
+            return results_l
+
+        mp_context                                              = None
+        if "fork" in _multiprocessing.get_all_start_methods():
+            mp_context                                          = _multiprocessing.get_context("fork")
+        parallel                                                = self.max_workers > 1 and len(stale_idx_l) > 1
+        if datasets is not None and self.preload_worksheets_dict is not None:
+            if parallel and mp_context is None:
+                _sys.stderr.write("Not preloading global datasets, since worker processes can't be forked on this platform"
+                                  + " and would parse them again anyway\n")
+            else:
+                datasets.preload(self.preload_worksheets_dict)
+
+        tasks_l                                                 = [(self.generator_factory, specs_l[idx], self._fingerprint_args(specs_l[idx]))
+                                                                        for idx in stale_idx_l]
+        if not parallel:
+            generated_l                                         = [_generate_scenario(*task) for task in tasks_l]
+        else:
+            generated_dict                                      = {}
+            # GOTCHA: the default start method is not "fork" on macOS and Windows, nor on Linux as of Python 3.14, and
+            # with any other method preloaded datasets would not be shared with the workers
+            with _futures.ProcessPoolExecutor(max_workers   = min(self.max_workers, len(tasks_l)),
+                                              mp_context    = mp_context,
+                                              initializer   = _initialize_worker,
+                                              initargs      = (self.global_datasets_folder,)) as executor:
+                futures_dict                                    = {executor.submit(_generate_scenario, *task): idx
+                                                                        for idx, task in enumerate(tasks_l)}
+                for future in _futures.as_completed(futures_dict.keys()):
+                    idx                                         = futures_dict[future]
+                    try:
+                        generated_dict[idx]                     = future.result()
+                    except Exception:
+                        # E.g., a BrokenProcessPool if a worker died, or a result that couldn't be pickled. The
+                        # scenario fails, but the others are still collected
+                        generated_dict[idx]                     = _error_result(tasks_l[idx][1],
+                                                                                _traceback.format_exc())
+            generated_l                                         = [generated_dict[idx] for idx in range(len(tasks_l))]
+
+        for idx, result in zip(stale_idx_l, generated_l):
+            result.reasons_l                                    = results_l[idx].reasons_l
+            results_l[idx]                                      = result
+        return results_l
+
+    def summary_lines(self, results_l):
+        '''
+        Returns a list of strings, a report with a line per scenario and its reasons, plus totals. For a dry run, it
+        tells what would be generated.
+        '''
+        lines_l                                                 = []
+        counts_dict                                             = {}
+        for result in results_l:
+            counts_dict[result.status]                          = counts_dict.get(result.status, 0) + 1
+            lines_l.append(result.status + "\t" + "{:.1f}".format(result.seconds) + "s\t" + str(result.scenario_id)
+                           + "\t" + "; ".join(result.reasons_l))
+            lines_l.extend(["\t\t" + line for line in result.problem_lines_l])
+        lines_l.append("")
+        lines_l.append(", ".join([status + "=" + str(count) for status, count in sorted(counts_dict.items())])
+                       + " ; " + str(len(results_l)) + " scenarios")
+        return lines_l
+
+    def _plan(self, spec, datasets):
+        '''
+        Returns a ScenarioGenerationResult for `spec` with status ScenarioGenerationResult.STATUS_UP_TO_DATE or
+        ScenarioGenerationResult.STATUS_STALE, and the reasons for it.
+        '''
+        result                                                  = ScenarioGenerationResult(spec.scenario_id)
+        result.status                                           = ScenarioGenerationResult.STATUS_STALE
+        if self.scenarios_root_folder is None:
+            result.reasons_l                                    = ["not incremental"]
+            return result
+
+        fingerprint                                             = SpecFingerprint(self._scenario_folder(spec))
+        saved_dict                                              = fingerprint.load()
+        dataset_paths_s                                         = set(spec.input_datasets())
+        if saved_dict is not None:
+            dataset_paths_s.update(saved_dict.get("datasets", {}).keys())
+        current_dict                                            = SpecFingerprint.build_record(
+                                                                        generator_name          = _generator_name(self.generator_factory),
+                                                                        code_version            = self.code_version,
+                                                                        spec                    = spec,
+                                                                        dataset_digests_dict    = _dataset_digests(datasets, dataset_paths_s))
+        result.reasons_l                                        = SpecFingerprint.stale_reasons(saved_dict, current_dict,
+                                                                                                fingerprint.outputs())
+        if len(result.reasons_l) == 0:
+            result.status                                       = ScenarioGenerationResult.STATUS_UP_TO_DATE
+            result.reasons_l                                    = ["fingerprint " + current_dict["fingerprint"][:12] + " unchanged"]
+            if self.force:
+                result.status                                   = ScenarioGenerationResult.STATUS_STALE
+                result.reasons_l                                = ["forced"]
+        return result
+
+    def _fingerprint_args(self, spec):
+        if self.scenarios_root_folder is None:
+            return None
+        return (self._scenario_folder(spec), _generator_name(self.generator_factory), self.code_version)
+
+    def _scenario_folder(self, spec):
+        return self.scenarios_root_folder + "/" + str(spec.scenario_id)
+
+
+def _initialize_worker(global_datasets_folder):
+    '''
+    Runs once in each worker process of a ScenarioBatch. Forked workers already have the GlobalDatasets installed
+    by the parent process, with any preloaded datasets, and keep it.
+    '''
+    if global_datasets_folder is not None:
+        GlobalDatasets.install(global_datasets_folder)
+
+
+def _generator_name(generator_factory):
+    '''
+    Returns a string, the qualified name of the class or function that `generator_factory` calls.
+    '''
+    # Unwrap functools.partial objects
+    target                                                      = getattr(generator_factory, "func", generator_factory)
+    return str(getattr(target, "__module__", "")) + "." + str(getattr(target, "__qualname__", repr(target)))
+
+
+def _dataset_digests(datasets, dataset_paths):
+    '''
+    Returns a dictionary whose keys are the relative paths in `dataset_paths` and whose values are the digests of those
+    global datasets, or None if there is no such dataset (or no GlobalDatasets).
+    '''
+    return {path: None if datasets is None else datasets.digest(path) for path in sorted(dataset_paths)}
+
+
+def _error_result(spec, trace):
+    '''
+    Returns a ScenarioGenerationResult with status ScenarioGenerationResult.STATUS_ERROR for `spec`, for a scenario whose
+    generation failed with the traceback string `trace`.
+    '''
+    result                                                      = ScenarioGenerationResult(spec.scenario_id)
+    result.status                                               = ScenarioGenerationResult.STATUS_ERROR
+    result.problem_lines_l                                      = trace.strip().splitlines()
+    return result
+
+
+def _generate_scenario(generator_factory, spec, fingerprint_args=None):
+    '''
+    Generates the scenario for `spec` and returns a ScenarioGenerationResult. This is a module-level function so that
+    it can run in worker processes.
+
+    If `fingerprint_args` is not None, it is a tuple (scenario_folder, generator_name, code_version), and a
+    SpecFingerprint is saved in the scenario's folder once the scenario is generated.
+    '''
+    result                                                      = ScenarioGenerationResult(spec.scenario_id)
+    datasets                                                    = GlobalDatasets.shared()
+    fingerprint                                                 = None
+    if fingerprint_args is not None:
+        fingerprint                                             = SpecFingerprint(fingerprint_args[0])
+        # So that if generation fails half way, the scenario is not taken as up to date
+        fingerprint.remove()
+
+    start                                                       = _time.perf_counter()
+    try:
+        if datasets is not None:
+            datasets.start_recording()
+        try:
+            generator_factory(spec).create_scenario()
+        finally:
+            accessed_l                                          = [] if datasets is None else datasets.stop_recording()
+
+        if fingerprint is not None:
+            scenario_folder, generator_name, code_version       = fingerprint_args
+            record_dict                                         = SpecFingerprint.build_record(
+                                                                        generator_name          = generator_name,
+                                                                        code_version            = code_version,
+                                                                        spec                    = spec,
+                                                                        dataset_digests_dict    = _dataset_digests(datasets,
+                                                                                                    set(accessed_l) | set(spec.input_datasets())))
+            fingerprint.save(record_dict)
+        result.status                                           = ScenarioGenerationResult.STATUS_GENERATED
+    except Exception:
+        result.problem_lines_l                                  = _traceback.format_exc().strip().splitlines()
+    result.seconds                                              = _time.perf_counter() - start
+    return result
@@ -1,5 +1,7 @@
 import abc
 
+from conway_acceptance.scenario_foundry.global_datasets                        import GlobalDatasets
+
 class ScenarioGenerator(abc.ABC):
 
     def __init__(self, spec):
@@ -13,6 +15,13 @@ class ScenarioGenerator(abc.ABC):
         '''
         self.spec                                       = spec
 
+    def global_datasets(self):
+        '''
+        Returns the GlobalDatasets object through which this generator should read the global datasets, so that they
+        are parsed once per process rather than once per scenario, or None if none was installed (see ScenarioBatch).
+        '''
+        return GlobalDatasets.shared()
+
     @abc.abstractmethod
     def create_scenario(self):
         '''
@@ -1,8 +1,13 @@
 import abc
+import hashlib                                                     as _hashlib
+import os                                                          as _os
+import tempfile                                                    as _tempfile
 
 from conway.database.database_manifest                 import DataBaseManifest
 
 from conway_acceptance.util.test_statics                           import TestStatics
+from conway_acceptance.util.blob_store                             import BlobStore
+from conway_acceptance.util.file_copier                            import FileCopier
 
 class ScenarioManifest(DataBaseManifest):
 
@@ -27,12 +32,85 @@ class ScenarioManifest(DataBaseManifest):
         @param scenario_id An integer that serves as the unique identifier for the scenario for which this is a
             a specification. A YAML file that maps such numerical ids to the classname of the code that implements
             a test scenario can be found in `scenarios_root_folder/ScenarioIds.yaml`
+
+        If the environment variable TestStatics.IN_MEMORY_ACTUALS_ENV_VAR is set, the ACTUALS test databases are 
+        kept in memory. See `use_in_memory_actuals`.
         '''
         super().__init__()
 
         self.scenarios_root_folder                  = scenarios_root_folder
         self.scenario_id                            = scenario_id
 
+        # If not None, the folder where the ACTUALS test databases are kept instead of the scenario folder
+        self.in_memory_root_folder                  = None
+
+        # Created on the first call to `snapshot_store`
+        self._snapshot_store                        = None
+
+        in_memory                                   = _os.environ.get(TestStatics.IN_MEMORY_ACTUALS_ENV_VAR)
+        if in_memory is not None and len(in_memory) > 0 and in_memory.lower() not in ["0", "false", "no"]:
+            self.use_in_memory_actuals(None if in_memory.lower() in ["1", "true", "yes"] else in_memory)
+
+    def use_in_memory_actuals(self, scratch_root=None):
+        '''
+        Relocates ACTUALS@latest and the ACTUALS@T* snapshots of this scenario to a memory-backed folder, so that
+        seeding, snapshotting and reading them for comparisons does not pay disk latency. `path_to_actuals()` and
+        the DataHubs returned by `get_data_hubs()` point to the relocated folders, so this is transparent to test code.
+        EXPECTED test databases, seeds and notes stay in the scenario folder.
+
+        Since memory contents don't survive the machine, the relocated folders are only copied back to the scenario
+        folder by `persist_actuals`, which AcceptanceTestContext calls when a test fails (or when asked to). The
+        context then frees them with `release_in_memory_actuals` when the test fails or its last round ends.
+
+        It must be called before the TestDatabase for this manifest is created, since TestDatabases get their
+        DataHubs when constructed. Successive manifests for the same scenario, e.g. for successive seeding rounds,
+        share the same memory-backed folders.
+
+        @param scratch_root A string, the absolute path of a memory-backed folder such as a tmpfs mount. If None,
+                "/dev/shm" is used where available, and the system's temporary folder otherwise, which is logged
+                since that folder may well be on disk.
+        '''
+        if scratch_root is None:
+            scratch_root                            = "/dev/shm"
+            if not _os.path.isdir(scratch_root) or not _os.access(scratch_root, _os.W_OK):
+                scratch_root                        = _tempfile.gettempdir()
+                # Imported here, as in AcceptanceTestContext, so that importing this module doesn't load conway's Application
+                from conway.application.application            import Application
+                from conway.observability.logger               import Logger
+                Application.app().log("/dev/shm is not available, so the ACTUALS of scenario " + str(self.scenario_id) 
+                                      + " are kept in '" + scratch_root + "', which may not be memory-backed",
+                                      log_level     = Logger.LEVEL_INFO)
+        # Scenario ids are only unique within a scenarios root folder, so it is part of the path
+        root_digest                                 = _hashlib.sha256(_os.path.abspath(self.scenarios_root_folder).encode("UTF8")).hexdigest()
+        self.in_memory_root_folder                  = scratch_root + "/" + TestStatics.IN_MEMORY_FOLDER + "/" \
+                                                        + root_digest[:16] + "/" + str(self.scenario_id)
+
+    def persist_actuals(self):
+        '''
+        If the ACTUALS test databases are kept in memory, copies them to the scenario folder, replacing whatever 
+        ACTUALS folders with the same names were there. Otherwise it does nothing.
+
+        Returns a sorted list of strings, the names of the folders copied, like "ACTUALS@latest".
+        '''
+        if self.in_memory_root_folder is None or not _os.path.isdir(self.in_memory_root_folder):
+            return []
+        copier                                      = FileCopier(TestStatics.COPY_STRATEGY_CLONE)
+        with _os.scandir(self.in_memory_root_folder) as scanner:
+            # Other folders, like staged seeds, are just scratch space
+            folder_names_l                          = sorted([entry.name for entry in scanner if entry.is_dir()
+                                                                and entry.name.startswith(TestStatics.TEST_DATABASE_ACTUALS + "@")])
+        for name in folder_names_l:
+            copier.replace_tree(self.in_memory_root_folder + "/" + name, self.path_to_scenario() + "/" + name)
+        return folder_names_l
+
+    def release_in_memory_actuals(self):
+        '''
+        Frees the memory used by the ACTUALS test databases of this scenario, if they are kept in memory, by removing 
+        them. Anything not previously saved with `persist_actuals` is lost.
+        '''
+        if self.in_memory_root_folder is not None:
+            FileCopier.remove_tree(self.in_memory_root_folder)
+
     def path_to_seed(self, seeding_round=0):
         '''
         Returns the full path to the folder where the "seed" for the scenario resides, i.e., the content with which
@@ -74,12 +152,69 @@ class ScenarioManifest(DataBaseManifest):
         '''
         return self._path_to_test_db(db_type=TestStatics.TEST_DATABASE_EXPECTED, snapshot_count=snapshot_count)
     
+    def path_to_staging(self, seeding_round):
+        '''
+        Returns the absolute path of the folder where the seed for `seeding_round` is staged ahead of time when
+        seeding is pipelined (see TestDatabase.stage_seed), like ".../STAGING@T2". It is next to ACTUALS@latest, so
+        it is on the same filesystem and staged files can be moved into ACTUALS@latest just by renaming them.
+
+        @param seeding_round An int, designating the round of seeding whose seed is staged.
+        '''
+        return _os.path.dirname(self.path_to_actuals()) + "/" + TestStatics.STAGING_FOLDER + "@" \
+                + TestStatics.TEST_DB_SNAPSHOT_PREFIX + str(seeding_round)
+
     def path_to_notes(self):
         '''
         '''
         notes_folder                                            = self.path_to_scenario() + "/" + TestStatics.RUN_NOTES
         return notes_folder
 
+    def path_to_shared_cache(self):
+        '''
+        Returns the absolute path to the folder where the test harness caches data across runs, shared by all
+        the scenarios under `self.scenarios_root_folder`.
+        '''
+        cache_folder                                            = self.scenarios_root_folder + "/" + TestStatics.CACHE_FOLDER
+        return cache_folder
+
+    def snapshot_store(self):
+        '''
+        Returns the BlobStore in which ACTUALS@T* snapshots are stored by TestDatabases that use one. It is shared by 
+        all the scenarios under `self.scenarios_root_folder`, so that identical files are only stored once.
+        '''
+        if self._snapshot_store is None:
+            self._snapshot_store                    = BlobStore(self.path_to_shared_cache() + "/" + TestStatics.SNAPSHOT_STORE_CACHE)
+        return self._snapshot_store
+
+    def snapshot_name(self, db_type, snapshot_count):
+        '''
+        Returns a string, the name under which the test database snapshot is kept in `self.snapshot_store()`, 
+        like "1001/ACTUALS@T2".
+        '''
+        return str(self.scenario_id) + "/" + db_type + "@" + TestStatics.TEST_DB_SNAPSHOT_PREFIX + str(snapshot_count)
+
+    def materialize_snapshot(self, db_type, snapshot_count):
+        '''
+        Makes sure that the test database snapshot for `snapshot_count` exists as a folder, creating it from 
+        `self.snapshot_store()` if it is kept there (see TestDatabase.use_snapshot_store) and not materialized yet.
+        Returns the absolute path of the snapshot's folder, as `path_to_actuals` or `path_to_expected` would.
+
+        TestDatabase.create_snapshot already materializes the snapshots it stores, so this is only needed if the
+        snapshot's folder may have been removed since, e.g., to save disk space.
+
+        @param db_type A string, which must be either TestStatics.TEST_DATABASE_ACTUALS or 
+                    TestStatics.TEST_DATABASE_EXPECTED
+
+        @param snapshot_count An int, designating the snapshot, like 2 for "ACTUALS@T2".
+        '''
+        db_root                                     = self._path_to_test_db(db_type=db_type, snapshot_count=snapshot_count)
+        if not _os.path.isdir(db_root):
+            store                                   = self.snapshot_store()
+            snapshot_name                           = self.snapshot_name(db_type, snapshot_count)
+            if store.has_snapshot(snapshot_name):
+                store.materialize(snapshot_name, db_root)
+        return db_root
+
     def _path_to_test_db(self, db_type, snapshot_count=None):
         '''
 
@@ -99,7 +234,10 @@ class ScenarioManifest(DataBaseManifest):
         else:
             snapshot_timestamp                      = TestStatics.TEST_DB_SNAPSHOT_PREFIX + str(snapshot_count)
 
-        db_root                                     = self.path_to_scenario() + "/" + db_type + "@" + snapshot_timestamp
+        if db_type == TestStatics.TEST_DATABASE_ACTUALS and self.in_memory_root_folder is not None:
+            db_root                                 = self.in_memory_root_folder + "/" + db_type + "@" + snapshot_timestamp
+        else:
+            db_root                                 = self.path_to_scenario() + "/" + db_type + "@" + snapshot_timestamp
         return db_root
     
     def path_to_scenario(self):
@@ -14,5 +14,23 @@ class ScenarioSpec(abc.ABC):
         '''
         self.scenario_id                            = scenario_id
 
-    
-    
\ No newline at end of file
+    def fingerprint_fields(self):
+        '''
+        Returns a dictionary with the fields of this spec that determine the scenario generated from it, which are
+        part of the spec's fingerprint (see SpecFingerprint). By default it is all the attributes of this object.
+        Derived classes may override it to leave out attributes that don't affect the outcome.
+
+        Values that are not JSON-serializable are fingerprinted by their `str`, so they should have a `__str__` that
+        reflects their content. Otherwise the scenario will just be regenerated more often than needed.
+        '''
+        return dict(vars(self))
+
+    def input_datasets(self):
+        '''
+        Returns a list of strings, the paths relative to the global datasets folder (see TestStatics.GLOBAL_DATASETS_FOLDER)
+        of the datasets from which the scenario is generated, whose content is part of the spec's fingerprint.
+
+        Datasets that the ScenarioGenerator reads through `ScenarioGenerator.global_datasets()` are recorded
+        automatically by ScenarioBatch, so only datasets read in other ways need to be listed. By default it is empty.
+        '''
+        return []
@@ -0,0 +1,173 @@
+import datetime                                                                 as _datetime
+import hashlib                                                                  as _hashlib
+import json                                                                     as _json
+import os                                                                       as _os
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.directory_manifest                                  import DirectoryManifest
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class SpecFingerprint():
+
+    def __init__(self, scenario_folder):
+        '''
+        Records, in a scenario's folder, what the scenario was generated from, so that generating it again can be
+        skipped while that doesn't change, like a build system skips up-to-date targets. Skipping also keeps the
+        modification times of the SEED@T* and EXPECTED@T* files, which the test harness's caches are keyed on.
+
+        The record is a JSON file (see TestStatics.SPEC_FINGERPRINT_FILE) with:
+
+        * "fingerprint": a digest of all the other entries, except the timestamp
+        * "generator": the name of the ScenarioGenerator class
+        * "code_version": the version of the generation code, as supplied by the caller (e.g., a git commit hash)
+        * "spec": the ScenarioSpec's `fingerprint_fields()`
+        * "datasets": a dictionary with the FileDigest of each global dataset the scenario was generated from
+        * "outputs": the SEED@T* and EXPECTED@* folders generated, with the size and modification time of their
+          files (see `outputs`). It is not part of the fingerprint, but a scenario whose outputs were removed or
+          modified since is not up to date
+        * "timestamp": when the scenario was generated
+
+        @param scenario_folder A string, the absolute path of the scenario's folder.
+        '''
+        self.scenario_folder                                    = scenario_folder
+
+    @staticmethod
+    def build_record(generator_name, code_version, spec, dataset_digests_dict):
+        '''
+        Returns a dictionary with the record for a scenario generated by `generator_name` from `spec` and from the
+        global datasets in `dataset_digests_dict`.
+
+        @param generator_name A string, the name of the ScenarioGenerator class.
+
+        @param code_version A string identifying the version of the generation code, or None.
+
+        @param spec A ScenarioSpec object.
+
+        @param dataset_digests_dict A dictionary whose keys are paths of global datasets, relative to the global
+                datasets folder, and whose values are their digests (None for datasets that don't exist).
+        '''
+        # A JSON round trip, so that the record compares equal to one loaded from a file. `default=str` because fields
+        # might not be JSON-serializable
+        spec_fields_dict                                        = _json.loads(_json.dumps(spec.fingerprint_fields(),
+                                                                                          sort_keys=True, default=str))
+        record_dict                                             = {"generator":       generator_name,
+                                                                   "code_version":    None if code_version is None else str(code_version),
+                                                                   "spec":            spec_fields_dict,
+                                                                   "datasets":        dict(sorted(dataset_digests_dict.items()))}
+        record_dict["fingerprint"]                              = _hashlib.sha256(_json.dumps(record_dict, sort_keys=True)
+                                                                                  .encode("UTF8")).hexdigest()
+        return record_dict
+
+    @staticmethod
+    def stale_reasons(saved_dict, current_dict, current_outputs_dict=None):
+        '''
+        Returns a list of strings explaining why a scenario recorded with `saved_dict` is not up to date with respect
+        to `current_dict`. It is empty if the scenario is up to date.
+
+        @param saved_dict A dictionary loaded with `load`, or None if the scenario has no record.
+
+        @param current_dict A dictionary returned by `build_record`.
+
+        @param current_outputs_dict A dictionary returned by `outputs` for the scenario as it is now. If None, the
+                outputs are not checked.
+        '''
+        if saved_dict is None:
+            return ["no fingerprint (never generated, or generation failed)"]
+
+        outputs_reasons_l                                       = []
+        if current_outputs_dict is not None:
+            saved_outputs_dict                                  = saved_dict.get("outputs")
+            if saved_outputs_dict is None:
+                outputs_reasons_l.append("outputs not recorded")
+            else:
+                missing_l                                       = sorted(set(saved_outputs_dict.keys())
+                                                                            - set(current_outputs_dict.keys()))
+                changed_l                                       = sorted([name for name in set(saved_outputs_dict.keys())
+                                                                                        | set(current_outputs_dict.keys())
+                                                                          if name not in missing_l
+                                                                                and saved_outputs_dict.get(name) != current_outputs_dict.get(name)])
+                if len(missing_l) > 0:
+                    outputs_reasons_l.append("outputs missing: " + ", ".join(missing_l))
+                if len(changed_l) > 0:
+                    outputs_reasons_l.append("outputs changed: " + ", ".join(changed_l))
+        if saved_dict.get("fingerprint") == current_dict["fingerprint"]:
+            return outputs_reasons_l
+
+        reasons_l                                               = []
+        if saved_dict.get("generator") != current_dict["generator"]:
+            reasons_l.append("generator changed from " + str(saved_dict.get("generator")))
+        if saved_dict.get("code_version") != current_dict["code_version"]:
+            reasons_l.append("code version changed from " + str(saved_dict.get("code_version")))
+        saved_spec_dict                                         = saved_dict.get("spec", {})
+        changed_fields_l                                        = sorted([field for field in set(saved_spec_dict.keys())
+                                                                                    | set(current_dict["spec"].keys())
+                                                                          if saved_spec_dict.get(field) != current_dict["spec"].get(field)])
+        if len(changed_fields_l) > 0:
+            reasons_l.append("spec fields changed: " + ", ".join(changed_fields_l))
+        saved_datasets_dict                                     = saved_dict.get("datasets", {})
+        changed_datasets_l                                      = sorted([path for path in set(saved_datasets_dict.keys())
+                                                                                    | set(current_dict["datasets"].keys())
+                                                                          if saved_datasets_dict.get(path) != current_dict["datasets"].get(path)])
+        if len(changed_datasets_l) > 0:
+            reasons_l.append("datasets changed: " + ", ".join(changed_datasets_l))
+        if len(reasons_l) == 0:
+            reasons_l.append("fingerprint changed")
+        return reasons_l + outputs_reasons_l
+
+    def outputs(self):
+        '''
+        Returns a dictionary whose keys are the names of the SEED@T* and EXPECTED@* folders in the scenario's folder,
+        and whose values are dictionaries mapping the relative path of each file in them to a list
+        [size, mtime_ns].
+        '''
+        outputs_dict                                            = {}
+        if not _os.path.isdir(self.scenario_folder):
+            return outputs_dict
+        with _os.scandir(self.scenario_folder) as scanner:
+            folder_names_l                                      = sorted([entry.name for entry in scanner if entry.is_dir()])
+        for folder_name in folder_names_l:
+            if not (folder_name.startswith(TestStatics.SEED_FOLDER + "@")
+                    or folder_name.startswith(TestStatics.TEST_DATABASE_EXPECTED + "@")):
+                continue
+            manifest                                            = DirectoryManifest.build(self.scenario_folder + "/" + folder_name)
+            # Lists rather than tuples, so that this compares equal to a dictionary loaded with `load`
+            outputs_dict[folder_name]                           = {relative_path: list(stat)
+                                                                        for relative_path, stat in sorted(manifest.files_dict.items())}
+        return outputs_dict
+
+    def load(self):
+        '''
+        Returns the dictionary saved with `save`, or None if there is none.
+        '''
+        try:
+            with open(self._path(), 'r', encoding="UTF8") as reader:
+                return _json.load(reader)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, record_dict):
+        '''
+        Saves `record_dict`, as returned by `build_record`, adding the time at which it is saved and the scenario's
+        current `outputs`. It should therefore be called once the scenario is generated.
+        '''
+        path                                                    = self._path()
+        _os.makedirs(self.scenario_folder, exist_ok=True)
+        tmp_path                                                = path + "." + _uuid.uuid4().hex + ".tmp"
+        with open(tmp_path, 'w', encoding="UTF8") as writer:
+            _json.dump(dict(record_dict, outputs     = self.outputs(),
+                                         timestamp   = _datetime.datetime.now().strftime("%y%m%d.%H%M%S")),
+                       writer, indent=2)
+        _os.replace(tmp_path, path)
+
+    def remove(self):
+        '''
+        Removes the saved record, if any, so that the scenario is considered stale until it is saved again.
+        '''
+        try:
+            _os.remove(self._path())
+        except FileNotFoundError:
+            pass
+
+    def _path(self):
+        return self.scenario_folder + "/" + TestStatics.SPEC_FINGERPRINT_FILE
@@ -0,0 +1,114 @@
+import datetime                                                                 as _datetime
+import numbers                                                                  as _numbers
+import os                                                                       as _os
+import uuid                                                                     as _uuid
+
+
+class StreamingWorkbookWriter():
+
+    # Excel number format for cells with dates or datetimes
+    DATETIME_FORMAT                                             = "yyyy-mm-dd hh:mm:ss"
+
+    def __init__(self, path):
+        '''
+        Context manager to write an Excel file for a scenario's SEED or EXPECTED folders with a memory footprint that
+        doesn't depend on the size of the data. It uses xlsxwriter's "constant memory" mode, in which each row is
+        flushed to disk as soon as the next one is written, so rows can come from an iterator that is never
+        materialized as a whole. For example:
+
+            with StreamingWorkbookWriter(path) as writer:
+                writer.write_sheet("Sheet1", ["id", "value"], ((idx, idx * 2) for idx in range(1000000)))
+                writer.write_dataframe("Sheet2", df)
+
+        GOTCHA: in constant memory mode, rows must be written in order and each worksheet must be completely written
+        before the next one is started, which is why there is a single call per worksheet.
+
+        The file is written to a temporary file next to `path` and renamed to `path` when the context exits without
+        an exception, so a partially written file never appears at `path`.
+
+        @param path A string, the absolute path of the Excel file to write. Missing parent folders are created.
+        '''
+        self.path                                               = path
+        self.rows_written                                       = 0
+
+        self._tmp_path                                          = None
+        self._workbook                                          = None
+        self._datetime_format                                   = None
+
+    def __enter__(self):
+        # Imported here, so that importing this module doesn't require xlsxwriter
+        import xlsxwriter                                                   as _xlsxwriter
+
+        _os.makedirs(_os.path.dirname(self.path), exist_ok=True)
+        self._tmp_path                                          = self.path + "." + _uuid.uuid4().hex + ".tmp"
+        self._workbook                                          = _xlsxwriter.Workbook(self._tmp_path, {"constant_memory":    True,
+                                                                                                 "remove_timezone":    True})
+        self._datetime_format                                   = self._workbook.add_format({"num_format": self.DATETIME_FORMAT})
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            self._workbook.close()
+        except Exception:
+            if exc_type is None:
+                raise
+        if exc_type is None:
+            _os.replace(self._tmp_path, self.path)
+        elif _os.path.exists(self._tmp_path):
+            _os.remove(self._tmp_path)
+
+    def write_sheet(self, sheet_name, header_l, rows_iterable):
+        '''
+        Adds a worksheet with a header row followed by the rows in `rows_iterable`. Returns the number of rows written,
+        not counting the header.
+
+        @param sheet_name A string, the name of the worksheet.
+
+        @param header_l A list of strings, the column names. If None, there is no header row.
+
+        @param rows_iterable An iterable of sequences of cell values, consumed lazily. Missing values (None, NaN, NaT
+                or NA) are left as blank cells.
+        '''
+        worksheet                                               = self._workbook.add_worksheet(sheet_name)
+        row_idx                                                 = 0
+        if header_l is not None:
+            worksheet.write_row(row_idx, 0, [str(column) for column in header_l])
+            row_idx                                             += 1
+        count                                                   = 0
+        for row in rows_iterable:
+            for col_idx, value in enumerate(row):
+                value                                           = self._cell_value(value)
+                if isinstance(value, (_datetime.datetime, _datetime.date)):
+                    # Otherwise Excel would show the date as a number
+                    worksheet.write_datetime(row_idx, col_idx, value, self._datetime_format)
+                elif value is not None:
+                    worksheet.write(row_idx, col_idx, value)
+            row_idx                                             += 1
+            count                                               += 1
+        self.rows_written                                       += count
+        return count
+
+    def write_dataframe(self, sheet_name, df):
+        '''
+        Adds a worksheet with the columns and rows of the DataFrame `df`, without its index. Rows are converted one at a
+        time, so no copy of the DataFrame is made. Returns the number of rows written.
+        '''
+        return self.write_sheet(sheet_name, list(df.columns), df.itertuples(index=False, name=None))
+
+    def _cell_value(self, value):
+        '''
+        Returns `value` in a form that xlsxwriter can write, or None for a blank cell.
+        '''
+        if value is None:
+            return None
+        # GOTCHA: NaN and pandas' NaT are the only values not equal to themselves, and pandas' NA can't even be
+        # compared
+        try:
+            if value != value:
+                return None
+        except TypeError:
+            return None
+        if isinstance(value, _numbers.Number) and hasattr(value, "item"):
+            # numpy scalars
+            return value.item()
+        return value
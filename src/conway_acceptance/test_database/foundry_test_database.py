@@ -1,3 +1,5 @@
+import functools                                                                                as _functools
+
 from conway.database.single_root_data_hub                                      import RelativeDataHubHandle
 
 from conway_acceptance.test_database.test_database                                         import TestDatabase
@@ -19,6 +21,19 @@ class Foundry_TestDatabase(TestDatabase):
 
         self.fake_global_datasets_hub                                   = fake_global_datasets_hub
         self.fake_scenario_hub                                          = fake_scenario_hub
+
+    def hub_folders(self):
+        '''
+        Returns a list of strings, the names of the folders under the root of the test database where each of its
+        DataHubs resides.
+        '''
+        return [TestStatics.GLOBAL_DATASETS_FOLDER, str(self.manifest.fake_scenario_id)]
+
+    def read_only_hub_folders(self):
+        '''
+        Global datasets are inputs to the scenario generation logic under test, which never modifies them.
+        '''
+        return [TestStatics.GLOBAL_DATASETS_FOLDER]
     
     def populate_from_seed(self):
         '''
@@ -26,15 +41,20 @@ class Foundry_TestDatabase(TestDatabase):
         '''
         seed_folder                                                     = self.manifest.path_to_seed()
 
-        self.fake_global_datasets_hub.populate_from_seed(GlobalDatasetsDataHub(
+        if self.copy_strategy != TestStatics.COPY_STRATEGY_DATAHUB:
+            self._populate_by_copy(seed_folder)
+            return
+
+        # The two DataHubs are seeded concurrently only if `self.concurrent_datahubs` is set
+        self.run_datahub_tasks([
+            _functools.partial(self.fake_global_datasets_hub.populate_from_seed, GlobalDatasetsDataHub(
                                                             name        = TestStatics.GLOBAL_DATASETS_FOLDER,
                                                             hub_handle  = RelativeDataHubHandle(seed_folder, 
-                                                                                                TestStatics.GLOBAL_DATASETS_FOLDER)))
-        
-        self.fake_scenario_hub.populate_from_seed(GeneratedScenarioDataHub(
+                                                                                                TestStatics.GLOBAL_DATASETS_FOLDER))),
+            _functools.partial(self.fake_scenario_hub.populate_from_seed, GeneratedScenarioDataHub(
                                                             name        = self.manifest.fake_scenario_id, 
                                                             hub_handle  = RelativeDataHubHandle(seed_folder, 
-                                                                                                self.manifest.fake_scenario_id)))
+                                                                                                self.manifest.fake_scenario_id)))])
 
     def enrich_from_seed(self, seeding_round):
         '''
@@ -53,15 +73,16 @@ class Foundry_TestDatabase(TestDatabase):
         '''
         seed_folder                                                     = self.manifest.path_to_seed(seeding_round)
 
-        self.fake_global_datasets_hub.enrich_from_seed(GlobalDatasetsDataHub(
+        if self.copy_strategy != TestStatics.COPY_STRATEGY_DATAHUB:
+            self._enrich_by_copy(seed_folder)
+            return
+
+        self.run_datahub_tasks([
+            _functools.partial(self.fake_global_datasets_hub.enrich_from_seed, GlobalDatasetsDataHub(
                                                             name        = TestStatics.GLOBAL_DATASETS_FOLDER,
                                                             hub_handle  = RelativeDataHubHandle(seed_folder, 
-                                                                                                TestStatics.GLOBAL_DATASETS_FOLDER)))
-        
-        self.fake_scenario_hub.enrich_from_seed(GeneratedScenarioDataHub(
+                                                                                                TestStatics.GLOBAL_DATASETS_FOLDER))),
+            _functools.partial(self.fake_scenario_hub.enrich_from_seed, GeneratedScenarioDataHub(
                                                             name        = self.manifest.fake_scenario_id, 
                                                             hub_handle  = RelativeDataHubHandle(seed_folder, 
-                                                                                                self.manifest.fake_scenario_id)))
-
-
-        
\ No newline at end of file
+                                                                                                self.manifest.fake_scenario_id)))])
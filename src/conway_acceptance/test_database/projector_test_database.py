@@ -17,6 +17,13 @@ class ProjectorTestDatabase(TestDatabase):
         [input_db_hub]                                              = manifest.get_data_hubs()
 
         self.input_db_hub                                           = input_db_hub
+
+    def hub_folders(self):
+        '''
+        Returns a list of strings, the names of the folders under the root of the test database where each of its
+        DataHubs resides.
+        '''
+        return [TestStatics.PROJECTOR_INPUT_DB_FOLDER]
     
     def populate_from_seed(self):
         '''
@@ -24,6 +31,10 @@ class ProjectorTestDatabase(TestDatabase):
         '''
         seed_folder                                                     = self.manifest.path_to_seed()
 
+        if self.copy_strategy != TestStatics.COPY_STRATEGY_DATAHUB:
+            self._populate_by_copy(seed_folder)
+            return
+
         self.input_db_hub.populate_from_seed(Projector_DataHub(
                                                             name        = TestStatics.PROJECTOR_INPUT_DB_FOLDER,
                                                             hub_handle  = RelativeDataHubHandle(seed_folder, 
@@ -47,6 +58,10 @@ class ProjectorTestDatabase(TestDatabase):
         '''
         seed_folder                                                     = self.manifest.path_to_seed(seeding_round)
 
+        if self.copy_strategy != TestStatics.COPY_STRATEGY_DATAHUB:
+            self._enrich_by_copy(seed_folder)
+            return
+
         self.input_db_hub.enrich_from_seed(Projector_DataHub(
                                                             name        = TestStatics.PROJECTOR_INPUT_DB_FOLDER,
                                                             hub_handle  = RelativeDataHubHandle(seed_folder, 
@@ -1,9 +1,25 @@
 import abc
+import atexit                                                                   as _atexit
+import os                                                                       as _os
+import shutil                                                                   as _shutil
+import functools                                                                as _functools
+import concurrent.futures                                                       as _futures
+import threading                                                                as _threading
+import time                                                                     as _time
 
 from conway_acceptance.util.test_statics                           import TestStatics
+from conway_acceptance.util.file_copier                            import FileCopier
+from conway_acceptance.util.golden_image_cache                     import GoldenImageCache
+from conway_acceptance.util.directory_manifest                     import DirectoryManifest
+from conway_acceptance.util.file_digest                            import FileDigest
 
 class TestDatabase(abc.ABC):
 
+    # Futures for the seeds being staged in the background by `stage_seed`, by the absolute path of their staging
+    # folder. They are kept at class level because each round of a test case creates its own TestDatabase
+    _STAGED_SEEDS_DICT                                = {}
+    _STAGED_SEEDS_LOCK                                = _threading.Lock()
+
     def __init__(self, manifest):
       '''
       The explanation of this class assumes you are familiar with the purpose of the `conway` and
@@ -32,8 +48,78 @@ class TestDatabase(abc.ABC):
       @param manifest A ScenarioManifest object that has connection strings to access the test database that should be used
           by the test case using this TestDatabase.
 
+      The `copy_strategy` attribute determines how files are copied when seeding and snapshotting the database. It is
+      TestStatics.COPY_STRATEGY_DATAHUB by default, so copies are done by the DataHubs. Test contexts may set it to 
+      TestStatics.COPY_STRATEGY_CLONE to seed large scenarios in seconds, and to make ACTUALS@T* snapshots share disk
+      space with ACTUALS@latest, or to TestStatics.COPY_STRATEGY_PLAIN. Those two strategies require that the
+      concrete class implements `hub_folders`.
+
+      If the `use_golden_image` attribute is set to True, the first time that `seed(0)` is called for a given
+      SEED@T0 it populates ACTUALS@latest as usual and caches a "golden image" of the result. Later calls, e.g. in
+      later runs of the same scenario, restore ACTUALS@latest from that image, copying only the files that differ
+      from it. This is intended for scenarios that are run many times in a row, such as when hunting flaky tests.
+      Files are restored by copy (or reflink), unless the `golden_image_hardlinks` attribute is also set to True, in
+      which case the files of `read_only_hub_folders` are hard-linked to the image. That is faster, but if the
+      business logic does modify one of those files in place, the image is corrupted for all later runs.
+
+      If the `delta_enrich` attribute is set to True, `seed(n)` for rounds n > 0 compares SEED@T{n} against
+      ACTUALS@latest and only copies the files that are new or changed, instead of calling `enrich_from_seed`.
+      This requires that the concrete class implements `hub_folders`, and a copy strategy other than 
+      TestStatics.COPY_STRATEGY_DATAHUB (`seed` raises a ValueError otherwise).
+
+      If the `use_snapshot_store` attribute is set to True, `create_snapshot` keeps ACTUALS@T* snapshots in the 
+      content-addressable store returned by `self.manifest.snapshot_store()` instead of as full copies. Each file 
+      content is stored once, however many snapshots contain it. The ACTUALS@T* folder is still created, as 
+      hard-links to the store's read-only blobs, so code that reads it via `self.manifest.path_to_actuals` works as
+      usual.
+
+      If the `pipeline_seeding` attribute is set to True, AcceptanceTestContext calls `stage_seed(n + 1)` once round
+      n is seeded, so that SEED@T{n+1} is copied to a staging folder in the background while the business logic of
+      round n runs. `seed(n + 1)` then just moves the staged files into ACTUALS@latest. This requires that the
+      concrete class implements `hub_folders`, and that `enrich_from_seed` has the semantics of `_enrich_by_copy`, 
+      as is the case for copy strategies other than TestStatics.COPY_STRATEGY_DATAHUB. Staged seeds that won't be
+      merged are discarded: when a round fails, when round 0 is seeded again, and when the process exits.
       '''
       self.manifest                                   = manifest
+      self.copy_strategy                              = TestStatics.COPY_STRATEGY_DATAHUB
+
+      # Number of threads used to copy DataHubs (and, for copy strategies other than the DataHub one, subfolders
+      # of DataHubs) concurrently when seeding and snapshotting. If 1, copies are done serially.
+      self.max_copy_workers                           = 1
+
+      # GOTCHA: with TestStatics.COPY_STRATEGY_DATAHUB, copies are done by DataHub methods that may not be thread-safe
+      # (e.g., they may log through, or cache in, objects shared by all DataHubs). So they are called one after the
+      # other, even if `self.max_copy_workers` is bigger than 1, unless a concrete class whose DataHubs are known to
+      # be independent sets this to True.
+      self.concurrent_datahubs                        = False
+
+      self.use_golden_image                           = False
+      self.golden_image_hardlinks                     = False
+      self.delta_enrich                               = False
+      self.use_snapshot_store                         = False
+      self.pipeline_seeding                           = False
+
+      # Lines describing how the last call to `self.seed` seeded the database, for the notes of the test case
+      self.seeding_notes_l                            = []
+
+    def hub_folders(self):
+      '''
+      Returns a list of strings, the names of the folders under the root of the test database (e.g., under 
+      ACTUALS@latest) where each of its DataHubs resides. The same names are used for the DataHubs' folders under 
+      each SEED@T* folder.
+
+      Concrete classes must implement it to support copy strategies other than TestStatics.COPY_STRATEGY_DATAHUB.
+      '''
+      raise NotImplementedError("Class '" + type(self).__name__ + "' does not support copy strategy '" 
+                                + str(self.copy_strategy) + "'")
+
+    def read_only_hub_folders(self):
+      '''
+      Returns a list of strings, a subset of `self.hub_folders()` for DataHubs whose files are never modified by the
+      business logic under test, such as global datasets. With TestStatics.COPY_STRATEGY_CLONE these files are
+      hard-linked instead of copied.
+      '''
+      return []
 
     @abc.abstractmethod
     def populate_from_seed(self):
@@ -58,6 +144,35 @@ class TestDatabase(abc.ABC):
 
       '''
 
+    def seed(self, seeding_round=0):
+      '''
+      Seeds the database for the given round: for round 0 it populates it from SEED@T0 (possibly by restoring
+      a golden image, if `self.use_golden_image` is True), and for other rounds it enriches it from SEED@T{round}.
+
+      After it returns, `self.seeding_notes_l` describes how the database was seeded.
+
+      @param seeding_round An int, designating the round of seeding. See `enrich_from_seed` for an explanation.
+      '''
+      # Checked for every round, including 0, so that a misconfigured test case fails before doing any work
+      if self.delta_enrich and self.copy_strategy == TestStatics.COPY_STRATEGY_DATAHUB:
+        raise ValueError("Delta enrichment can't be used with copy strategy '" + TestStatics.COPY_STRATEGY_DATAHUB 
+                         + "', since DataHubs may do more than copy the seed's files. Use another copy strategy, or "
+                         + "set `delta_enrich` to False")
+      self.seeding_notes_l                            = []
+      if seeding_round == 0:
+        # Anything staged was staged by an earlier run of this scenario, and must not be merged into this one
+        self.discard_staged_seeds()
+      if seeding_round != 0 and self.pipeline_seeding and self._merge_staged_seed(seeding_round):
+        return
+      if seeding_round != 0 and self.delta_enrich:
+        self._enrich_by_delta(seeding_round)
+      elif seeding_round != 0:
+        self.enrich_from_seed(seeding_round)
+      elif self.use_golden_image:
+        self._populate_from_golden_image()
+      else:
+        self.populate_from_seed()
+
     def create_snapshot(self, snapshot_count):
       '''
       This method creates a copy of the content of this TestDatabase's "live content", i.e., what normally
@@ -82,12 +197,335 @@ class TestDatabase(abc.ABC):
       if snapshot_count is None or snapshot_count <= 0:
         raise ValueError("Invalid snapshot count '" + str(snapshot_count) + "'. Should be an integer at least equal to 1")
       
-      snapshot_path                                   = self.manifest._path_to_test_db( 
-                                                                          db_type         = TestStatics.TEST_DATABASE_ACTUALS, 
-                                                                          snapshot_count  = snapshot_count)
-      for hub in self.manifest.get_data_hubs():
-              hub.create_snapshot(snapshot_path)
+      snapshot_path                                   = self.manifest.path_to_actuals(snapshot_count)
+      if self.use_snapshot_store:
+        store                                         = self.manifest.snapshot_store()
+        snapshot_name                                 = self.manifest.snapshot_name(TestStatics.TEST_DATABASE_ACTUALS, snapshot_count)
+        store.put_tree(snapshot_name, self.manifest.path_to_actuals())
+        # Materialized right away, replacing any folder left by a previous run, so that the snapshot's folder always
+        # exists for callers of `path_to_actuals`. It takes little time or space, since files are hard-linked
+        store.materialize(snapshot_name, snapshot_path)
+        return
+
+      if self.copy_strategy != TestStatics.COPY_STRATEGY_DATAHUB:
+        self._copy_hub_folders(self.manifest.path_to_actuals(), snapshot_path, replace=True)
+        return
+
+      self.run_datahub_tasks([_functools.partial(hub.create_snapshot, snapshot_path) 
+                                for hub in self.manifest.get_data_hubs()])
+
+    def stage_seed(self, seeding_round):
+      '''
+      Starts copying SEED@T{seeding_round} to the staging folder given by `self.manifest.path_to_staging`, in a 
+      background thread, and returns without waiting. If `self.delta_enrich` is True the seed files are also hashed,
+      so that computing the delta against ACTUALS@latest later doesn't need to read them. A later call to
+      `seed(seeding_round)`, from this or another TestDatabase for the same scenario, moves the staged files
+      into ACTUALS@latest instead of copying them from the seed.
+
+      Returns True if the seed is being staged (or already was), and False if there is nothing to stage because 
+      there is no such seed, or because `self.copy_strategy` is TestStatics.COPY_STRATEGY_DATAHUB.
+
+      @param seeding_round An int, bigger than 0, designating the round of seeding whose seed to stage.
+      '''
+      seed_folder                                     = self.manifest.path_to_seed(seeding_round)
+      if seeding_round <= 0 or self.copy_strategy == TestStatics.COPY_STRATEGY_DATAHUB or not _os.path.isdir(seed_folder):
+        return False
+
+      staging_folder                                  = self.manifest.path_to_staging(seeding_round)
+      with TestDatabase._STAGED_SEEDS_LOCK:
+        if staging_folder in TestDatabase._STAGED_SEEDS_DICT:
+          return True
+        executor                                      = _futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="seed-staging")
+        TestDatabase._STAGED_SEEDS_DICT[staging_folder] = executor.submit(self._stage_seed_files, seed_folder, staging_folder)
+        # The thread keeps running until the staging is done, but it is the only task for this executor
+        executor.shutdown(wait=False)
+        # So that seeds staged for rounds that never run don't stay on disk. Unregistered first, so it is registered
+        # only once
+        _atexit.unregister(TestDatabase._discard_staged_folders)
+        _atexit.register(TestDatabase._discard_staged_folders)
+      return True
+
+    def discard_staged_seed(self, seeding_round):
+      '''
+      Waits for the background staging of SEED@T{seeding_round} started by `stage_seed`, if any, to finish and
+      removes the staged files.
+      '''
+      TestDatabase._discard_staged_folders([self.manifest.path_to_staging(seeding_round)])
+
+    def discard_staged_seeds(self, except_round=None):
+      '''
+      Like `discard_staged_seed`, for every seed of this scenario that was staged and not merged yet, except the one
+      for `except_round`, if not None. AcceptanceTestContext calls it when exiting, keeping only the seed that the
+      next round will merge, if it runs.
+      '''
+      staging_parent                                  = _os.path.dirname(self.manifest.path_to_staging(1))
+      keep_folder                                     = None if except_round is None else self.manifest.path_to_staging(except_round)
+      with TestDatabase._STAGED_SEEDS_LOCK:
+        staging_folders_l                             = [folder for folder in TestDatabase._STAGED_SEEDS_DICT.keys()
+                                                            if _os.path.dirname(folder) == staging_parent and folder != keep_folder]
+      TestDatabase._discard_staged_folders(staging_folders_l)
+
+    @staticmethod
+    def _discard_staged_folders(staging_folders_l=None):
+      '''
+      Discards the seeds staged in the folders in `staging_folders_l`, or all of them if it is None: waits for their
+      staging to finish and removes the staged files. Seeds not staged (or already merged) are ignored.
+      '''
+      with TestDatabase._STAGED_SEEDS_LOCK:
+        if staging_folders_l is None:
+          staging_folders_l                           = list(TestDatabase._STAGED_SEEDS_DICT.keys())
+        futures_dict                                  = {folder: TestDatabase._STAGED_SEEDS_DICT.pop(folder)
+                                                            for folder in staging_folders_l if folder in TestDatabase._STAGED_SEEDS_DICT}
+      for staging_folder, future in futures_dict.items():
+        _futures.wait([future])
+        _shutil.rmtree(staging_folder, ignore_errors=True)
+
+    def _stage_seed_files(self, seed_folder, staging_folder):
+      '''
+      Runs in a background thread for `stage_seed`. It copies each DataHub's folder in `seed_folder` to the same
+      folder under `staging_folder`, and returns a dictionary whose keys are the names of the DataHubs' folders that
+      were staged, and whose values are tuples (manifest, digests_dict) where `manifest` is the DirectoryManifest of
+      the DataHub's folder in the seed and `digests_dict` has the raw digests of its files (or is None if 
+      `self.delta_enrich` is False).
+      '''
+      strategy                                        = TestStatics.COPY_STRATEGY_PLAIN \
+                                                          if self.copy_strategy == TestStatics.COPY_STRATEGY_PLAIN \
+                                                          else TestStatics.COPY_STRATEGY_CLONE
+      copier                                          = FileCopier(strategy)
+      digester                                        = FileDigest()
+      if _os.path.isdir(staging_folder):
+        # Left by a run that was interrupted
+        _shutil.rmtree(staging_folder)
 
+      staged_dict                                     = {}
+      for folder in self.hub_folders():
+        src_folder                                    = seed_folder + "/" + folder
+        if not _os.path.isdir(src_folder):
+          continue
+        manifest                                      = DirectoryManifest.build(src_folder)
+        digests_dict                                  = None
+        if self.delta_enrich:
+          digests_dict                                = {relative_path: digester.raw_digest(src_folder + relative_path)
+                                                            for relative_path in manifest.relative_paths()}
+        copier.copy_tree(src_folder, staging_folder + "/" + folder, read_only = folder in self.read_only_hub_folders())
+        staged_dict[folder]                           = (manifest, digests_dict)
+      return staged_dict
 
+    def _merge_staged_seed(self, seeding_round):
+      '''
+      Implements `seed(seeding_round)` when `self.pipeline_seeding` is True and the seed was staged with `stage_seed`:
+      it waits for the staging to finish, if it hasn't yet, and moves the staged files into ACTUALS@latest. If
+      `self.delta_enrich` is True, only the files that are new or changed with respect to ACTUALS@latest are moved.
+
+      Returns True if the database was seeded, and False if there was no staged seed or if staging it failed, in
+      which case the caller should seed the database as usual.
+      '''
+      staging_folder                                  = self.manifest.path_to_staging(seeding_round)
+      with TestDatabase._STAGED_SEEDS_LOCK:
+        future                                        = TestDatabase._STAGED_SEEDS_DICT.pop(staging_folder, None)
+      if future is None:
+        return False
+
+      start                                           = _time.perf_counter()
+      try:
+        staged_dict                                   = future.result()
+      except Exception as ex:
+        _shutil.rmtree(staging_folder, ignore_errors=True)
+        self.seeding_notes_l.append("Staging SEED@T" + str(seeding_round) + " in the background failed, so it is seeded as"
+                                    + " usual. " + type(ex).__name__ + ": " + str(ex))
+        return False
+      wait_seconds                                    = _time.perf_counter() - start
+
+      actuals_path                                    = self.manifest.path_to_actuals()
+      moved_count                                     = 0
+      unchanged_count                                 = 0
+      delta_lines_l                                   = []
+      for folder, (manifest, digests_dict) in staged_dict.items():
+        src_folder                                    = staging_folder + "/" + folder
+        dst_folder                                    = actuals_path + "/" + folder
+        if self.delta_enrich:
+          new_l, changed_l, hub_unchanged_count       = manifest.delta(DirectoryManifest.build(dst_folder), digests_dict)
+          unchanged_count                             += hub_unchanged_count
+          delta_lines_l.extend(["\tNEW: " + folder + relative_path for relative_path in new_l])
+          delta_lines_l.extend(["\tCHANGED: " + folder + relative_path for relative_path in changed_l])
+          relative_paths_l                            = new_l + changed_l
+        else:
+          relative_paths_l                            = manifest.relative_paths()
+        for relative_path in relative_paths_l:
+          _os.makedirs(_os.path.dirname(dst_folder + relative_path), exist_ok=True)
+          # GOTCHA: a rename replaces the directory entry, so if the file it replaces is a hard-link to a read-only
+          # file (e.g., from a previous seeding) the original is not modified
+          _os.replace(src_folder + relative_path, dst_folder + relative_path)
+        moved_count                                   += len(relative_paths_l)
+      _shutil.rmtree(staging_folder, ignore_errors=True)
+
+      self.seeding_notes_l.append("Enriched ACTUALS@latest from SEED@T" + str(seeding_round) + ", staged in the background: "
+                                  + str(moved_count) + " files moved into place, " + str(unchanged_count) + " unchanged"
+                                  + " (waited " + "{:.2f}".format(wait_seconds) + "s for staging to finish)")
+      self.seeding_notes_l.extend(delta_lines_l)
+      return True
 
+    def run_concurrently(self, tasks_l):
+      '''
+      Calls each of the callables in `tasks_l`, which must be independent of each other, such as copies to 
+      different folders. If `self.max_copy_workers` is bigger than 1 they are called concurrently by a pool of 
+      that many threads; otherwise they are called in order in the current thread.
+
+      If any of them raises an exception, the ones that haven't started yet are cancelled, and once the ones
+      already running are done, the exception is re-raised. If several raise, the one re-raised is that of the 
+      earliest callable in `tasks_l`.
+
+      Returns a list with the values returned by the callables, in the order of `tasks_l`.
+
+      @param tasks_l A list of callables that take no arguments.
+      '''
+      if self.max_copy_workers is None or self.max_copy_workers <= 1 or len(tasks_l) <= 1:
+        return [task() for task in tasks_l]
 
+      with _futures.ThreadPoolExecutor(max_workers = min(self.max_copy_workers, len(tasks_l))) as executor:
+        futures_l                                     = [executor.submit(task) for task in tasks_l]
+        _futures.wait(futures_l, return_when=_futures.FIRST_EXCEPTION)
+        failed_l                                      = [future for future in futures_l 
+                                                            if future.done() and future.exception() is not None]
+        if len(failed_l) > 0:
+          for future in futures_l:
+            future.cancel()
+          _futures.wait(futures_l)
+          failed_l                                    = [future for future in futures_l 
+                                                            if not future.cancelled() and future.exception() is not None]
+          raise failed_l[0].exception()
+        return [future.result() for future in futures_l]
+
+    def run_datahub_tasks(self, tasks_l):
+      '''
+      Calls each of the callables in `tasks_l`, which are calls to DataHub methods, one per DataHub. They are called
+      as by `self.run_concurrently` if `self.concurrent_datahubs` is True, and in order in the current thread 
+      otherwise. Returns a list with the values they return, in the order of `tasks_l`.
+
+      @param tasks_l A list of callables that take no arguments.
+      '''
+      if not self.concurrent_datahubs:
+        return [task() for task in tasks_l]
+      return self.run_concurrently(tasks_l)
+
+    def _copy_hub_folders(self, src_root, dst_root, replace):
+      '''
+      Copies each DataHub's folder under `src_root` to the same folder under `dst_root`, using `self.copy_strategy`.
+      The copy is split by subfolder, and subfolders are copied concurrently if `self.max_copy_workers` is 
+      bigger than 1.
+
+      @param src_root A string, the absolute path of the root of the test database (or seed) to copy from.
+
+      @param dst_root A string, the absolute path of the root of the test database to copy into.
+
+      @param replace A boolean. If True, each DataHub's folder under `dst_root` is removed before copying. 
+              If False, files are copied over whatever is already there, and DataHubs without a folder under 
+              `src_root` are skipped.
+      '''
+      copier                                          = FileCopier(self.copy_strategy)
+      tasks_l                                         = []
+      for folder in self.hub_folders():
+        src_folder                                    = src_root + "/" + folder
+        dst_folder                                    = dst_root + "/" + folder
+        if replace:
+          copier.clear_tree(dst_folder)
+        elif not _os.path.isdir(src_folder):
+          continue
+        tasks_l.extend(copier.subtree_tasks(src_folder, dst_folder, read_only = folder in self.read_only_hub_folders()))
+      self.run_concurrently(tasks_l)
+
+    def _populate_from_golden_image(self):
+      '''
+      Implements `seed(0)` when `self.use_golden_image` is True. If there is a golden image for the current SEED@T0,
+      ACTUALS@latest is restored from it. Otherwise ACTUALS@latest is populated with `populate_from_seed` and then
+      captured as the golden image for the current SEED@T0.
+      '''
+      if self.copy_strategy == TestStatics.COPY_STRATEGY_PLAIN:
+        image_strategy                                = TestStatics.COPY_STRATEGY_PLAIN
+      else:
+        image_strategy                                = TestStatics.COPY_STRATEGY_CLONE
+      read_only_folders_l                             = None
+      if self.golden_image_hardlinks and image_strategy == TestStatics.COPY_STRATEGY_CLONE:
+        read_only_folders_l                           = self.read_only_hub_folders()
+
+      images                                          = GoldenImageCache(self.manifest.path_to_shared_cache() + "/" 
+                                                                          + TestStatics.GOLDEN_IMAGES_CACHE + "/" 
+                                                                          + str(self.manifest.scenario_id),
+                                                                         strategy = image_strategy)
+      fingerprint                                     = GoldenImageCache.fingerprint(self.manifest.path_to_seed(), 
+                                                                                     salt_l = [type(self).__name__, 
+                                                                                               self.copy_strategy,
+                                                                                               str(read_only_folders_l)])
+      actuals_path                                    = self.manifest.path_to_actuals()
+      _os.makedirs(actuals_path, exist_ok=True)
+
+      counts                                          = images.restore(fingerprint, actuals_path, read_only_folders_l)
+      if counts is not None:
+        copied_count, removed_count, kept_count       = counts
+        self.seeding_notes_l.append("Restored ACTUALS@latest from golden image " + fingerprint[:12] + ": " 
+                                    + str(copied_count) + " files copied, " + str(removed_count) + " removed, "
+                                    + str(kept_count) + " unchanged")
+        return
+
+      self.populate_from_seed()
+      images.capture(fingerprint, actuals_path, read_only_folders_l)
+      self.seeding_notes_l.append("Populated ACTUALS@latest from SEED@T0 and saved it as golden image " + fingerprint[:12])
+
+    def _enrich_by_delta(self, seeding_round):
+      '''
+      Implements `seed(seeding_round)` when `self.delta_enrich` is True: for each DataHub, the files in its folder in 
+      SEED@T{seeding_round} that are new or changed with respect to its folder in ACTUALS@latest are copied into the 
+      latter. The delta is listed in `self.seeding_notes_l`.
+
+      @param seeding_round An int, bigger than 0, designating the round of seeding.
+      '''
+      seed_folder                                     = self.manifest.path_to_seed(seeding_round)
+      actuals_path                                    = self.manifest.path_to_actuals()
+      strategy                                        = TestStatics.COPY_STRATEGY_PLAIN \
+                                                          if self.copy_strategy == TestStatics.COPY_STRATEGY_PLAIN \
+                                                          else TestStatics.COPY_STRATEGY_CLONE
+      copier                                          = FileCopier(strategy)
+      tasks_l                                         = []
+      delta_lines_l                                   = []
+      unchanged_count                                 = 0
+      for folder in self.hub_folders():
+        src_folder                                    = seed_folder + "/" + folder
+        dst_folder                                    = actuals_path + "/" + folder
+        if not _os.path.isdir(src_folder):
+          continue
+        new_l, changed_l, hub_unchanged_count         = DirectoryManifest.build(src_folder).delta(DirectoryManifest.build(dst_folder))
+        unchanged_count                               += hub_unchanged_count
+        read_only                                     = folder in self.read_only_hub_folders()
+        for tag, relative_paths_l in [("NEW", new_l), ("CHANGED", changed_l)]:
+          for relative_path in relative_paths_l:
+            delta_lines_l.append("\t" + tag + ": " + folder + relative_path)
+            tasks_l.append(_functools.partial(self._copy_seed_file, copier, src_folder + relative_path, 
+                                              dst_folder + relative_path, read_only))
+      self.run_concurrently(tasks_l)
+
+      self.seeding_notes_l.append("Enriched ACTUALS@latest from SEED@T" + str(seeding_round) + ": " + str(len(tasks_l))
+                                  + " files copied, " + str(unchanged_count) + " unchanged")
+      self.seeding_notes_l.extend(delta_lines_l)
+
+    def _copy_seed_file(self, copier, src, dst, read_only):
+      _os.makedirs(_os.path.dirname(dst), exist_ok=True)
+      copier.copy_file(src, dst, read_only=read_only)
+
+    def _populate_by_copy(self, seed_folder):
+      '''
+      Implements `populate_from_seed` for copy strategies other than TestStatics.COPY_STRATEGY_DATAHUB: each
+      DataHub's folder in ACTUALS@latest is replaced by a copy of the same folder in `seed_folder`.
+
+      @param seed_folder A string, the absolute path of a SEED@T* folder.
+      '''
+      self._copy_hub_folders(seed_folder, self.manifest.path_to_actuals(), replace=True)
+
+    def _enrich_by_copy(self, seed_folder):
+      '''
+      Implements `enrich_from_seed` for copy strategies other than TestStatics.COPY_STRATEGY_DATAHUB: the files in 
+      each DataHub's folder in `seed_folder` are copied over the same folder in ACTUALS@latest. DataHubs that have
+      no folder in `seed_folder` are left as they are.
+
+      @param seed_folder A string, the absolute path of a SEED@T* folder.
+      '''
+      self._copy_hub_folders(seed_folder, self.manifest.path_to_actuals(), replace=False)
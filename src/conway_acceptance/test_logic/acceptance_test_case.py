@@ -1,18 +1,27 @@
 import abc
 import os                                                                       as _os
-from pathlib                                                                    import Path
-import pandas                                                                   as _pd
 import datetime                                                                 as _datetime
-import re                                                                       as _re
+import concurrent.futures                                                       as _futures
+import time                                                                     as _time
 
 import unittest
 
-from conway.database.data_accessor                                 import DataAccessor
-from conway.util.path_utils                                        import PathUtils
-from conway.application.application                                import Application
-from conway.observability.logger                                   import Logger
+from conway_acceptance.util.test_statics                           import TestStatics
+from conway_acceptance.util.parsed_frame_cache                     import ParsedFrameCache
+from conway_acceptance.util.directory_manifest                     import DirectoryManifest
+from conway_acceptance.util.file_digest                            import FileDigest
+from conway_acceptance.util.scenario_result_cache                  import ScenarioResultCache
+from conway_acceptance.test_logic.differences_writer               import DifferencesWriter
+from conway_acceptance.test_logic.comparison_metrics               import ComparisonMetrics
 
 
+# GOTCHA
+#
+# This module is imported by every acceptance test module, so just collecting or listing tests would pay for whatever
+# it imports. Therefore modules that are slow to import, like pandas (via the comparators) and conway's Application,
+# are imported inside the methods that need them, so they only load when a comparison or some logging happens.
+# The benchmark in conway_acceptance.benchmarks.import_time checks that this stays so.
+#
 # GOTCHA
 #
 # Multiple inheritance is not ideal, and here we use it only in a "soft way". The "real parent class" for us is
@@ -41,12 +50,147 @@ class AcceptanceTestCase(unittest.TestCase, abc.ABC):
         #               "230409.070219" means: April 9, 2023 at 7:02 am and 19 seconds
         self.run_timestamp                                          = _datetime.datetime.now().strftime("%y%m%d.%H%M%S")
 
+        # If True, Excel files in ACTUALS and EXPECTED are first compared by digest, and those with matching digests
+        # are not loaded into DataFrames. Derived classes may set it to False to force a cell-by-cell comparison.
+        self.digest_fast_path                                       = True
+
+        # Number of processes used to compare Excel files in parallel. If 1, they are compared serially in this process.
+        # Derived classes may set it to a higher number for scenarios with many Excel files to compare.
+        self.comparison_workers                                     = 1
+
+        # If True, DataFrames loaded from EXPECTED Excel files are cached on disk, under the scenarios root folder, 
+        # so that later runs don't have to parse them again until EXPECTED is re-baselined. Off by default, since it
+        # only pays off when the same EXPECTED files are compared across many runs.
+        self.cache_expected_frames                                  = False
+        self.expected_cache_max_bytes                               = ParsedFrameCache.DEFAULT_MAX_BYTES
+
+        # How to save the DIFFERENCES artifacts of worksheets that don't match. A format of None means Parquet if 
+        # available, else CSV (Excel is supported but slow). If `differences_in_background` is True, the assertion 
+        # failure is raised without waiting for the artifact to be written.
+        self.differences_format                                     = None
+        self.differences_max_rows                                   = DifferencesWriter.DEFAULT_MAX_ROWS
+        self.differences_in_background                              = False
+
+        # If True, the list of files in EXPECTED databases is saved in the scenarios' shared cache folder, and reused 
+        # in later runs without walking the EXPECTED folders again, unless any of them is modified. Off by default,
+        # since it trusts folders' modification times, which some file systems (e.g., network shares) don't keep.
+        self.persist_expected_manifests                             = False
+
+        # If True, successive calls to `assert_database_structure` in a test method (e.g., one per snapshot in 
+        # multi-round scenarios) only compare Excel files whose ACTUALS or EXPECTED content changed since the last
+        # snapshot at which they were verified.
+        self.incremental_comparison                                 = False
+        self._verified_excels_dict                                  = {}
+
+        # If True, the time and memory spent comparing each worksheet is recorded as a table in the notes and as
+        # a JSON file in the RUN_NOTES folder
+        self.comparison_metrics_enabled                             = False
+
+        # Version of the code under test, such as a git commit hash. If set, `is_result_cached` lets test methods
+        # skip scenarios that already passed with the same seeds, expectations and code version, unless 
+        # `force_rerun` is True (which can also be set with an environment variable, e.g. for nightly runs).
+        self.code_version                                           = None
+        self.force_rerun                                            = _os.environ.get(TestStatics.FORCE_RERUN_ENV_VAR, "") \
+                                                                        .lower() in ["1", "true", "yes"]
+        self._pending_result_record                                 = None
+        # Registered first, so it runs last, once tearDown and any other cleanups are done
+        self.addCleanup(self._record_result_if_passed)
+
 
     def tearDown(self):
         '''
         '''
         super().tearDown()
 
+    def _record_result_if_passed(self):
+        '''
+        Cleanup that, if `is_result_cached` was called by the test method and the test passed, records the pass in
+        the result cache.
+        '''
+        pending                                                     = self._pending_result_record
+        if pending is None or not self._passed_so_far():
+            return
+        cache, fingerprint, record_dict                             = pending
+        try:
+            cache.put(fingerprint, record_dict)
+        except OSError:
+            # Caching is just an optimization for the next run
+            pass
+
+    def is_result_cached(self, manifest, excels_to_compare_l):
+        '''
+        Returns True if this test method already passed for a scenario with the same fingerprint, i.e., with the same
+        SEED@T* and EXPECTED@* content, the same Excel comparisons and the same `self.code_version`. In that case
+        there is no need to run it again, and a note pointing to the notes of the run that passed is saved in the
+        scenario's RUN_NOTES folder. Intended to be called at the start of a test method, before creating any
+        AcceptanceTestContext:
+
+                if self.is_result_cached(manifest, [excels_to_compare]):
+                    return
+
+        It always returns False if `self.code_version` is None or `self.force_rerun` is True. If it returns False
+        and the test method then passes, the pass is recorded for later runs.
+
+        @param manifest A ScenarioManifest object for the scenario of this test method.
+
+        @param excels_to_compare_l A list of ExcelsToCompare objects, for all the calls that this test method makes to
+                `assert_database_structure`.
+        '''
+        if self.code_version is None:
+            return False
+
+        cache                                                       = ScenarioResultCache(manifest.path_to_shared_cache() + "/" 
+                                                                                          + TestStatics.SCENARIO_RESULTS_CACHE)
+        fingerprint                                                 = cache.fingerprint(manifest.path_to_scenario(), self.id(),
+                                                                                        excels_to_compare_l, self.code_version)
+        record_dict                                                 = None if self.force_rerun else cache.get(fingerprint)
+        if record_dict is None:
+            self._pending_result_record                             = (cache, fingerprint, 
+                                                                       {"test_name":       self.id(),
+                                                                        "scenario_id":     manifest.scenario_id,
+                                                                        "code_version":    str(self.code_version),
+                                                                        "run_timestamp":   self.run_timestamp,
+                                                                        "notes_folder":    manifest.path_to_notes()})
+            return False
+
+        message                                                     = "Scenario " + str(manifest.scenario_id) + " already passed with the " \
+                                                                        + "same seeds, expectations and code version in run " \
+                                                                        + str(record_dict["run_timestamp"]) + ": see the notes prefixed by '" \
+                                                                        + str(record_dict["run_timestamp"]) + "' in " + str(record_dict["notes_folder"])
+        from conway.application.application                         import Application
+        from conway.observability.logger                            import Logger
+        Application.app().log(message, log_level=Logger.LEVEL_INFO)
+
+        notes_folder                                                = manifest.path_to_notes()
+        _os.makedirs(notes_folder, exist_ok=True)
+        with open(notes_folder + "/" + self.run_timestamp + " RESULT CACHE HIT.txt", 'w', encoding="UTF8") as writer:
+            writer.write(message + "\n")
+            writer.write("Fingerprint: " + fingerprint + "\n")
+        return True
+
+    def _passed_so_far(self):
+        '''
+        Returns True if nothing that ran so far for this test (setUp, the test method, its subtests, tearDown and the
+        cleanups that already ran) failed, raised or skipped, according to the unittest.TestResult of this run.
+
+        GOTCHA: `self._outcome.success` can't tell, since unittest resets it while running each part of a test, so
+        this looks for this test in the result's lists instead. The result is the one unittest creates when
+        `run` is called without one, so this works either way.
+        '''
+        outcome                                                     = getattr(self, "_outcome", None)
+        if outcome is None or outcome.result is None:
+            return False
+        test_method                                                 = getattr(self, self._testMethodName, None)
+        if getattr(outcome, "expectedFailure", None) is not None \
+                or getattr(test_method, "__unittest_expecting_failure__", False):
+            return False
+        for name in ["failures", "errors", "skipped"]:
+            for test, trace in getattr(outcome.result, name, []):
+                # Failed subtests are recorded as _SubTest objects, whose `test_case` is this test
+                if test is self or getattr(test, "test_case", None) is self:
+                    return False
+        return True
+
     def round_msg(self, ctx):
         '''
         '''
@@ -69,11 +213,14 @@ class AcceptanceTestCase(unittest.TestCase, abc.ABC):
         actuals_root                                                = ctx.manifest.path_to_actuals()
         expected_root                                               = ctx.manifest.path_to_expected(snapshot_count)
 
-        actuals_files                                               = self._get_files(root_folder = actuals_root)
-        expected_files                                              = self._get_files(root_folder = expected_root)
+        actuals_files                                               = self._get_manifest(ctx, actuals_root, persist=False).relative_paths()
+        expected_files                                              = self._get_manifest(ctx, expected_root, 
+                                                                                         persist=self.persist_expected_manifests).relative_paths()
 
-        extra_files                                                 = [f for f in actuals_files if not f in expected_files]
-        missing_files                                               = [f for f in expected_files if not f in actuals_files]
+        actuals_files_s                                             = set(actuals_files)
+        expected_files_s                                            = set(expected_files)
+        extra_files                                                 = [f for f in actuals_files if not f in expected_files_s]
+        missing_files                                               = [f for f in expected_files if not f in actuals_files_s]
         difference_message                                          = "Database contents don't match expectations."  \
                                                                         + "\n\nNOT EXPECTED:\n\t" + "\n\t".join(extra_files) \
                                                                         + "\n\nMISSING:\n\t" + "\n\t".join(missing_files) 
@@ -85,7 +232,9 @@ class AcceptanceTestCase(unittest.TestCase, abc.ABC):
         ctx.notes.add_line("\n---------------- EXPECTED ; snapshot = " + str(snapshot_count) + "--------------\n")
         ctx.notes.add_multiple_lines(expected_files)
 
-        self.assertEqual(actuals_files, expected_files, msg=difference_message)
+        # GOTCHA: don't use assertEqual on the lists, since on failure it computes a diff that is quadratic in 
+        # the number of files
+        self.assertTrue(len(extra_files) == 0 and len(missing_files) == 0, msg=difference_message)
 
         self._compare_dataframes(ctx, excels_to_compare, snapshot_count)
 
@@ -94,6 +243,11 @@ class AcceptanceTestCase(unittest.TestCase, abc.ABC):
 
         Verifies (i.e., asserts) equality of each database in the list `files_to_compare`
 
+        If `self.comparison_workers` is bigger than 1, the Excel files are compared in parallel by a pool of
+        that many processes. Either way, results are reported (to the notes, to the DIFFERENCES artifacts, and as
+        assertion failures) in the order of `excels_to_compare.relative_paths()`, so the outcome is the same as 
+        in a serial comparison.
+
         @param ctx An AcceptanceTestContext object corresponding to the context manager object within which
                 this test case is running at the time that this method is invoked.
 
@@ -105,77 +259,169 @@ class AcceptanceTestCase(unittest.TestCase, abc.ABC):
         actuals_root                                                = ctx.manifest.path_to_actuals()
         expected_root                                               = ctx.manifest.path_to_expected(snapshot_count)
 
+        from conway_acceptance.test_logic.workbook_comparator      import WorkbookComparator
+
+        expected_cache_folder                                       = None
+        if self.cache_expected_frames:
+            expected_cache_folder                                   = ctx.manifest.path_to_shared_cache() + "/" \
+                                                                        + TestStatics.PARSED_FRAMES_CACHE
+
+        comparator                                                  = WorkbookComparator(actuals_root, expected_root,
+                                                                                digest_fast_path            = self.digest_fast_path,
+                                                                                expected_cache_folder       = expected_cache_folder,
+                                                                                expected_cache_max_bytes    = self.expected_cache_max_bytes)
+        relative_paths_l                                            = list(excels_to_compare.relative_paths())
+        worksheets_info_l                                           = [list(excels_to_compare.worksheets_info(relative_excel_path))
+                                                                        for relative_excel_path in relative_paths_l]
+
+        digests_dict                                                = None
+        if self.incremental_comparison:
+            relative_paths_l, worksheets_info_l, digests_dict       = self._skip_unchanged_excels(ctx, relative_paths_l, 
+                                                                                                  worksheets_info_l,
+                                                                                                  actuals_root, expected_root)
+
+        # The digests computed for the incremental check are passed on, so the digest fast path doesn't compute them again
+        digests_l                                                   = [None if digests_dict is None else digests_dict[relative_excel_path]
+                                                                        for relative_excel_path in relative_paths_l]
+
+        metrics                                                     = ComparisonMetrics() if self.comparison_metrics_enabled else None
+
+        def _report(relative_excel_path, worksheets_info, results_l):
+            self._report_comparison_results(ctx, results_l, metrics)
+            if digests_dict is not None:
+                # If we got here, all worksheets matched, so remember it for the next snapshot
+                self._verified_excels_dict[relative_excel_path]     = (digests_dict[relative_excel_path], 
+                                                                       self._worksheets_signature(worksheets_info),
+                                                                       snapshot_count)
+
+        try:
+            if self.comparison_workers is None or self.comparison_workers <= 1 or len(relative_paths_l) <= 1:
+                # Lazy, so that we stop comparing as soon as a failure is reported
+                for relative_excel_path, worksheets_info, digests in zip(relative_paths_l, worksheets_info_l, digests_l):
+                    _report(relative_excel_path, worksheets_info, comparator.compare(relative_excel_path, worksheets_info,
+                                                                                     digests))
+            else:
+                executor                                            = _futures.ProcessPoolExecutor(
+                                                                                max_workers = min(self.comparison_workers, 
+                                                                                                  len(relative_paths_l)))
+                try:
+                    # GOTCHA: `map` yields results in the order of submission, not of completion, which is what keeps
+                    # the reporting deterministic
+                    results_iterable                                = executor.map(comparator.compare, relative_paths_l, 
+                                                                                   worksheets_info_l, digests_l)
+                    for relative_excel_path, worksheets_info, results_l in zip(relative_paths_l, worksheets_info_l,
+                                                                               results_iterable):
+                        _report(relative_excel_path, worksheets_info, results_l)
+                finally:
+                    # If we are here because of an assertion failure, don't waste time on the rest of the comparisons
+                    executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            # Metrics are most useful when the assertion fails, so they are saved either way
+            if metrics is not None:
+                self._save_comparison_metrics(ctx, metrics, snapshot_count)
+
+    def _skip_unchanged_excels(self, ctx, relative_paths_l, worksheets_info_l, actuals_root, expected_root):
+        '''
+        Used in incremental mode, to avoid re-comparing Excel files that were already verified by a previous 
+        call to `self.assert_database_structure` in this test method (i.e., at a previous snapshot), if neither
+        their ACTUALS nor their EXPECTED content has changed since then.
+
+        Returns a tuple of 3 elements:
+
+        * A sublist of `relative_paths_l`, for the Excel files that must be compared
+        * The corresponding sublist of `worksheets_info_l`
+        * A dictionary whose keys are all the paths in `relative_paths_l`, and whose values are tuples 
+          (actual_digest, expected_digest) with the current digests of the Excel files.
+
+        @param relative_paths_l A list of strings, the relative paths of the Excel files to compare.
 
-        for relative_excel_path in excels_to_compare.relative_paths():
-            for sheet_info in excels_to_compare.worksheets_info(relative_excel_path):
-                sheet                                               = sheet_info.worksheet_name
-    
-                with DataAccessor(actuals_root + "/" + relative_excel_path, subpath = sheet) as ax:
-                    actual_df                                       = ax.retrieve()
-                with DataAccessor(expected_root + "/" + relative_excel_path, subpath = sheet) as ax:
-                    expected_df                                     = ax.retrieve()
-
-                if actual_df is None or expected_df is None:
-                    if sheet_info.is_optional == True:
-                        # In this case, the worksheet is missing but it is optional, so that's OK. 
-                        # Just skip it and move on to the next sheet
-                        continue
-                    else:
-                        raise ValueError("Worksheet '" + sheet + "' missing in '" + relative_excel_path + "'")
-
-
-                # We do 3 rounds to compare the two DataFrames, and each of them would be an assertion failure
-                #   1. do they contain the same row indices? 
-                #   2. do they contain the same columns?
-                #   3. if they are of the same shape & labels, are the cells actually equal?
-                FILE_EXTENSION                                      = ".xlsx"
-                relative_path_no_file_extension                     = relative_excel_path.replace(FILE_EXTENSION, "")
-                df_description                                      = relative_path_no_file_extension + "[" + sheet + "]" + FILE_EXTENSION
-
-                def _add_note_on_differences(actual_labels, expected_labels):
-                    missing_s                                       =set(expected_labels).difference(set(actual_labels))
-                    unexpected_s                                    =set(actual_labels).difference(set(expected_labels))
-                    ctx.notes.add_line("\t\tMISSING in ACTUAL: [" + ", ".join([str(label) for label in missing_s]) + "]")
-                    ctx.notes.add_line("\t\tUNEXPECTED in ACTUAL: [" + ", ".join([str(label) for label in unexpected_s]) + "]")
-                def _compare_labels(label_type, actual_labels, expected_labels):
-                    failure_message                                 = ''
-                    if list(actual_labels) != list(expected_labels): # GOTCHA: Convert to list or comparator fails saying its ambiguous
-                        failure_message                             = "ACTUAL " + label_type + " don't match EXPECTED's:" + df_description
-                        ctx.notes.add_line("\t" + failure_message)
-                        _add_note_on_differences(actual_labels, expected_labels)
-                    # GOTCHA: Convert to list or comparator fails saying its ambiguous
-                    actual_sorted                                   = list(actual_labels)
-                    expected_sorted                                 = list(expected_labels)
-                    self.assertEqual(actual_sorted, expected_sorted, failure_message) 
-                    
-
-                # Check 1: are the row indices the same?
-                _compare_labels("row labels", actual_df.index, expected_df.index)
-
-                # Check #2: are the columns the same?
-                _compare_labels("columns", actual_df.columns, expected_df.columns)
-
-                # Check #3: are the cell values the same?
-                differences_df                                      = actual_df.compare(expected_df)
-
-                expected_size                                       = len(expected_df.index)
-                difference_size                                     = len(differences_df.index)
-
-                ctx.notes.add_line("\t" + str(difference_size) + "/" + str(expected_size) + " ERRORS in " + df_description)
-
-                difference_message                                  = "ACTUAL doesn't match EXPECTED:" + df_description
-
-                if difference_size!=0:
-                    # Save the differences, to support debugging
-                    notes_folder                                    = ctx.manifest.path_to_notes()
-                    
-                    DIFF_FILENAME                                   = self.run_timestamp + " DIFFERENCES/" + df_description
-                    DIFF_FILENAME                                   = PathUtils().clean_path(DIFF_FILENAME)
-                    DIFF_FOLDER                                     = _os.path.dirname(DIFF_FILENAME)
-                    Path(notes_folder + "/" +DIFF_FOLDER).mkdir(parents=True, exist_ok=True)
-                    differences_df.to_excel(notes_folder + "/" + DIFF_FILENAME)
-
-                self.assertTrue(difference_size==0, difference_message)
+        @param worksheets_info_l A list of the same length as `relative_paths_l`, whose elements are lists of 
+                WorksheetComparisonInfo objects for the corresponding Excel file.
+        '''
+        digester                                                    = FileDigest()
+        def _digest(path):
+            return digester.digest(path) if _os.path.isfile(path) else None
+
+        remaining_paths_l                                           = []
+        remaining_infos_l                                           = []
+        digests_dict                                                = {}
+        for relative_excel_path, worksheets_info in zip(relative_paths_l, worksheets_info_l):
+            digests                                                 = (_digest(actuals_root + "/" + relative_excel_path),
+                                                                       _digest(expected_root + "/" + relative_excel_path))
+            digests_dict[relative_excel_path]                       = digests
+
+            if relative_excel_path in self._verified_excels_dict.keys():
+                verified_digests, verified_signature, verified_snapshot = self._verified_excels_dict[relative_excel_path]
+                if verified_digests == digests and not None in digests \
+                        and verified_signature == self._worksheets_signature(worksheets_info):
+                    ctx.notes.add_line("\tUNCHANGED since snapshot " + str(verified_snapshot) + ": " + relative_excel_path)
+                    continue
+
+            remaining_paths_l.append(relative_excel_path)
+            remaining_infos_l.append(worksheets_info)
+
+        return remaining_paths_l, remaining_infos_l, digests_dict
+
+    def _worksheets_signature(self, worksheets_info):
+        '''
+        Returns a string that changes if any setting that affects the comparison of the worksheets in 
+        `worksheets_info` changes, such as which worksheets are compared or with what tolerances.
+        '''
+        return repr([sorted(vars(sheet_info).items()) for sheet_info in worksheets_info])
+
+    def _save_comparison_metrics(self, ctx, metrics, snapshot_count):
+        '''
+        Adds the comparison metrics as a table to the notes, and saves them as a JSON file in the RUN_NOTES folder.
+
+        @param metrics A ComparisonMetrics object with the metrics collected by `self._compare_dataframes`
+        '''
+        snapshot_timestamp                                          = TestStatics.TEST_DB_SNAPSHOT_LATEST if snapshot_count is None \
+                                                                        else TestStatics.TEST_DB_SNAPSHOT_PREFIX + str(snapshot_count)
+
+        ctx.notes.add_line("\n---------------- Comparison metrics ; snapshot = " + str(snapshot_count) + "--------------\n")
+        ctx.notes.add_multiple_lines(metrics.table_lines())
+
+        METRICS_FILENAME                                            = self.run_timestamp + " COMPARISON METRICS@" + snapshot_timestamp + ".json"
+        metrics.save(ctx.manifest.path_to_notes() + "/" + METRICS_FILENAME)
+
+    def _report_comparison_results(self, ctx, results_l, metrics=None):
+        '''
+        Records in the notes the outcome of comparing the worksheets of an Excel file, saves the DIFFERENCES artifact
+        for each worksheet that has differing cells, and raises an assertion failure (or a ValueError, if a mandatory
+        worksheet is missing) for the first worksheet that did not match.
+
+        @param ctx An AcceptanceTestContext object corresponding to the context manager object within which
+                this test case is running at the time that this method is invoked.
+
+        @param results_l A list of WorksheetComparisonResult objects, for the worksheets of a single Excel file.
+
+        @param metrics An optional ComparisonMetrics object, to which the metrics of each result are added.
+        '''
+        for result in results_l:
+            ctx.notes.add_multiple_lines(result.notes_l)
+
+            if result.error_message is not None:
+                raise ValueError(result.error_message)
+
+            if result.differences_df is not None:
+                # Save the differences, to support debugging
+                notes_folder                                        = ctx.manifest.path_to_notes()
+                
+                DIFF_FOLDER                                         = notes_folder + "/" + self.run_timestamp + " DIFFERENCES"
+                writer                                              = DifferencesWriter(DIFF_FOLDER,
+                                                                                artifact_format = self.differences_format,
+                                                                                max_rows        = self.differences_max_rows,
+                                                                                background      = self.differences_in_background)
+                start_time                                          = _time.perf_counter()
+                from conway.util.path_utils                         import PathUtils
+                writer.write(PathUtils().clean_path(result.df_description), result.differences_df)
+                result.metrics_dict[ComparisonMetrics.ARTIFACT_SECONDS] = _time.perf_counter() - start_time
+
+            if metrics is not None:
+                metrics.add(result)
+
+            if result.failure_message is not None:
+                self.fail(result.failure_message)
 
     def _get_files(self, root_folder):
         '''
@@ -184,19 +430,19 @@ class AcceptanceTestCase(unittest.TestCase, abc.ABC):
 
         @param root_folder A string representing the root of a folder structure
         '''
-        files_l                                                     = []
-        walker                                                      = _os.walk(root_folder)
-        for path, folders, files in walker:
-            relative_path                                           = path.replace(root_folder, "")
-            for f in files:
-                # Cleanup a bit some "pollution" in the paths with the delimeters "\" and "/", so that we get Unix-style paths
-                relative_filename                                   = relative_path + "/" + f
-                #relative_filename                                   = relative_filename.replace("\\", "/").replace("//", "/")
-                relative_filename                                   = PathUtils().clean_path(relative_filename)
-                files_l.append(relative_filename)
-        files_l                                                     = sorted(files_l)
-        
-        return files_l
+        return DirectoryManifest.build(root_folder).relative_paths()
 
+    def _get_manifest(self, ctx, root_folder, persist):
+        '''
+        Returns a DirectoryManifest listing all the files under `root_folder`, with their sizes and modification times.
 
+        @param root_folder A string representing the root of a folder structure
 
+        @param persist A boolean. If True, the manifest is saved under the scenarios' shared cache folder, and reused
+                in later runs as long as no folder under `root_folder` is modified. 
+        '''
+        if persist:
+            manifests_folder                                        = ctx.manifest.path_to_shared_cache() + "/" \
+                                                                        + TestStatics.DIRECTORY_MANIFESTS_CACHE
+            return DirectoryManifest.load_or_build(root_folder, manifests_folder)
+        return DirectoryManifest.build(root_folder)
@@ -1,7 +1,5 @@
 import abc
-
-from conway.application.application                        import Application
-from conway.observability.logger                           import Logger
+import os                                                                       as _os
 
 class AcceptanceTestContext(abc.ABC):
 
@@ -41,11 +39,26 @@ class AcceptanceTestContext(abc.ABC):
 
         # Notes will be aggregated throughout the test case
         self.notes                                                  = notes
+        self.notes.start_streaming(manifest.path_to_scenario())
 
         # This will be set by self.initialize_database(-)
         self.seeding_round                                          = seeding_round
         self.test_database                                          = None
 
+        # If the ACTUALS test databases are kept in memory (see ScenarioManifest.use_in_memory_actuals), they are 
+        # copied to the scenario folder when exiting this context with an exception. Set this to True to always 
+        # copy them.
+        self.persist_actuals                                        = False
+
+        # Whether to free the memory used by in-memory ACTUALS test databases when exiting this context, once they are
+        # persisted if need be. If None, they are freed when exiting with an exception, or if this is the scenario's 
+        # last round (i.e., there is no SEED@T* for a next round), since later rounds seed on top of them.
+        self.release_actuals                                        = None
+
+        # Imported here, so that importing this module (e.g., while collecting tests) doesn't load conway
+        from conway.application.application                        import Application
+        from conway.observability.logger                           import Logger
+
         Application.app().log("--------- Starting Test Scenario " + str(scenario_id) 
                               + " [round=" + str(seeding_round) + "] ---------", 
                               log_level                             = Logger.LEVEL_INFO,
@@ -70,15 +83,36 @@ class AcceptanceTestContext(abc.ABC):
         test case method to surround the business logic it runs, and that business logic should be run against
         the TestDatabase returned by this method.
         '''
-        if self.seeding_round == 0:
-            self.test_database.populate_from_seed()
-        else:
-            self.test_database.enrich_from_seed(self.seeding_round)
+        self.test_database.seed(self.seeding_round)
+        self.notes.add_multiple_lines(self.test_database.seeding_notes_l)
+
+        # Stage the next round's seed while this round's business logic runs, so the next round is seeded faster
+        if self.test_database.pipeline_seeding and self.test_database.stage_seed(self.seeding_round + 1):
+            self.notes.add_line("Staging SEED@T" + str(self.seeding_round + 1) + " in the background")
 
         return                                                      self
 
     def __exit__(self, exc_type, exc_value, exc_tb):
 
+        # Only the seed staged for the next round is kept, and only if that round may run. The rest would never be merged
+        keep_round                                                  = None if exc_type is not None else self.seeding_round + 1
+        self.test_database.discard_staged_seeds(except_round=keep_round)
+
+        if exc_type is not None or self.persist_actuals:
+            persisted_l                                             = self.manifest.persist_actuals()
+            if len(persisted_l) > 0:
+                self.notes.add_line("Copied " + ", ".join(persisted_l) + " from " + self.manifest.in_memory_root_folder 
+                                    + " to the scenario folder")
+
+        if self.manifest.in_memory_root_folder is not None:
+            release                                                 = self.release_actuals
+            if release is None:
+                release                                             = exc_type is not None \
+                                                                        or not _os.path.isdir(self.manifest.path_to_seed(self.seeding_round + 1))
+            if release:
+                self.manifest.release_in_memory_actuals()
+                self.notes.add_line("Released the in-memory ACTUALS in " + self.manifest.in_memory_root_folder)
+
         # Save the notes
         self.notes.save_notes(path_to_scenario=self.manifest.path_to_scenario())
 
@@ -1,41 +1,142 @@
+import gzip                                                                 as _gzip
 import os                                                                   as _os
+import time                                                                 as _time
 
 from conway_acceptance.util.test_statics                                   import TestStatics
 
 class AcceptanceTestNotes():
 
-    def __init__(self, notes_filename, notes_timestamp):
+    # Defaults for when lines are written in streaming mode
+    DEFAULT_FLUSH_BYTES                                         = 1024 * 1024
+    DEFAULT_FLUSH_SECONDS                                       = 5.0
+
+    def __init__(self, notes_filename, notes_timestamp, streaming=False, flush_bytes=DEFAULT_FLUSH_BYTES,
+                 flush_seconds=DEFAULT_FLUSH_SECONDS, compress=False):
         '''
         Helper class that represents observations that the test case makes in the course of its execution.
         There normally is an instance of this object for each run of each test case, and they are saved in the
         in the test case's scenario folder, in a subfolder whose name is given by the static variable
         TestStatics.RUN_NOTES
+
+        By default all lines are kept in memory until `save_notes` is called. In streaming mode, lines are instead
+        appended to the notes file as they are added, in batches: pending lines are written once they add up to
+        `flush_bytes` characters, or once `flush_seconds` have passed since the last write (as checked when a line 
+        is added), and whenever `save_notes` is called. That keeps memory bounded for long scenarios, and keeps
+        the notes written so far if the test process crashes. 
+        
+        Streaming requires that the scenario folder is known early, via `start_streaming`, which 
+        AcceptanceTestContext does when it is created.
+
+        @param notes_filename A string, the name of the notes file, without timestamp or extension.
+
+        @param notes_timestamp A string, prefixed to the name of the notes file.
+
+        @param streaming A boolean, to select streaming mode.
+
+        @param flush_bytes An int, the number of characters of pending lines that triggers a write in streaming mode.
+
+        @param flush_seconds A float, the number of seconds after which pending lines are written in streaming mode.
+
+        @param compress A boolean. If True, the notes file is gzip-compressed and gets an additional ".gz" extension.
         '''
         self.notes_filename                                     = notes_filename
         self.notes_timestamp                                    = notes_timestamp
+        self.streaming                                          = streaming
+        self.flush_bytes                                        = flush_bytes
+        self.flush_seconds                                      = flush_seconds
+        self.compress                                           = compress
+
+        # In streaming mode, only the lines not written yet
         self.notes_l                                            = []
 
+        self._pending_bytes                                     = 0
+        self._last_flush_time                                   = _time.monotonic()
+        self._notes_path                                        = None
+        self._notes_started                                     = False
+
     def add_line(self, line):
         '''
         @param line A string, that should be added as a new line to this notes object.
         '''
         self.notes_l.append(line)
+        self._after_adding([line])
 
     def add_multiple_lines(self, multiple_lines):
         '''
         @param multiple_lines A list of strings, each of which should be added as a separate line to this notes object.
+                It may also be any other iterable of strings, such as a generator.
         '''
-        self.notes_l.extend(multiple_lines)
+        # GOTCHA: materialize it first, since a generator would be exhausted by `extend` and then count as 0 bytes
+        lines_l                                                 = list(multiple_lines)
+        self.notes_l.extend(lines_l)
+        self._after_adding(lines_l)
 
+    def start_streaming(self, path_to_scenario):
+        '''
+        In streaming mode, sets the scenario folder under which the notes file is written as lines are added. It 
+        does nothing if not in streaming mode, or if it was already called.
+
+        @param path_to_scenario A string, the absolute path of the scenario folder.
+        '''
+        if self.streaming and self._notes_path is None:
+            self._notes_path                                    = self._path_to_notes_file(path_to_scenario)
 
     def save_notes(self, path_to_scenario):
         '''
+        Writes the notes to the file `<timestamp> <notes_filename>.txt` in the RUN_NOTES subfolder of 
+        `path_to_scenario`. In streaming mode, it only writes the pending lines, and lines added afterwards are 
+        appended to the same file.
+
+        @param path_to_scenario A string, the absolute path of the scenario folder.
         '''
-        notes_folder                                            = path_to_scenario + "/" + TestStatics.RUN_NOTES
+        if self.streaming:
+            self.start_streaming(path_to_scenario)
+            self.flush()
+            return
 
-        FILE                                                    = self.notes_timestamp + " " + self.notes_filename + ".txt"
+        path                                                    = self._path_to_notes_file(path_to_scenario)
+        _os.makedirs(_os.path.dirname(path), exist_ok=True)
+        with self._open(path, 'w') as writer:
+            for line in self.notes_l:
+                writer.write(line + "\n")
 
-        _os.makedirs(notes_folder, exist_ok=True)
-        with open(notes_folder + "/" + FILE, 'w') as writer:
+    def flush(self):
+        '''
+        In streaming mode, writes the pending lines to the notes file. It does nothing if not in streaming mode, or
+        if the scenario folder is not known yet.
+        '''
+        if not self.streaming or self._notes_path is None:
+            return
+
+        # The first write truncates whatever a previous run with the same timestamp may have left
+        mode                                                    = 'a' if self._notes_started else 'w'
+        _os.makedirs(_os.path.dirname(self._notes_path), exist_ok=True)
+        with self._open(self._notes_path, mode) as writer:
             for line in self.notes_l:
                 writer.write(line + "\n")
+        self._notes_started                                     = True
+        self.notes_l                                            = []
+        self._pending_bytes                                     = 0
+        self._last_flush_time                                   = _time.monotonic()
+
+    def _after_adding(self, lines_l):
+        if not self.streaming:
+            return
+        self._pending_bytes                                     += sum([len(line) + 1 for line in lines_l])
+        if self._pending_bytes >= self.flush_bytes or _time.monotonic() - self._last_flush_time >= self.flush_seconds:
+            self.flush()
+
+    def _path_to_notes_file(self, path_to_scenario):
+        notes_folder                                            = path_to_scenario + "/" + TestStatics.RUN_NOTES
+
+        FILE                                                    = self.notes_timestamp + " " + self.notes_filename + ".txt"
+        if self.compress:
+            FILE                                                += ".gz"
+
+        return notes_folder + "/" + FILE
+
+    def _open(self, path, mode):
+        if self.compress:
+            # In append mode, each write adds a gzip member, and readers like gzip.open read them all in sequence
+            return _gzip.open(path, mode + 't', encoding="UTF8")
+        return open(path, mode)
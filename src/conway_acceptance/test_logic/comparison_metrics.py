@@ -0,0 +1,99 @@
+import json                                                                     as _json
+import os                                                                       as _os
+
+
+class ComparisonMetrics():
+
+    LOAD_SECONDS                                                = "load_seconds"
+    LABELS_SECONDS                                              = "labels_seconds"
+    CELLS_SECONDS                                               = "cells_seconds"
+    ARTIFACT_SECONDS                                            = "artifact_seconds"
+    ROWS                                                        = "rows"
+    COLUMNS                                                     = "columns"
+    RSS_KB                                                      = "rss_kb"
+
+    # Where Linux reports the memory of the current process, as a number of pages. Elsewhere, memory is not reported
+    STATM_PATH                                                  = "/proc/self/statm"
+
+    # Order in which the metrics are listed in tables and JSON files, after the file and worksheet
+    METRIC_NAMES                                                = [LOAD_SECONDS, LABELS_SECONDS, CELLS_SECONDS, ARTIFACT_SECONDS,
+                                                                   ROWS, COLUMNS, RSS_KB]
+
+    def __init__(self):
+        '''
+        Collects timing and memory metrics for the comparison of each worksheet in an invocation of
+        AcceptanceTestCase.assert_database_structure, so that one can find which Excel files make assertions slow.
+
+        For each (file, worksheet) pair it records:
+
+        * the wall time spent loading, checking labels, comparing cells and writing the DIFFERENCES artifact.
+          Since a workbook is loaded once for all its worksheets, its load time is split evenly among them.
+          For Excel files skipped thanks to a matching digest, the time to compute the digests counts as load time.
+          For worksheets compared in streaming mode, loading happens while comparing, so it counts as cell time.
+        * the number of rows and columns in the EXPECTED worksheet
+        * the resident memory of the process right after comparing the worksheet, while its DataFrames are still
+          loaded. This is measured in whichever process did the comparison, which is a worker process in parallel
+          comparisons. It is the current resident memory rather than the growth of the peak, since the peak is a
+          high-water mark that stops growing once an earlier, bigger worksheet has raised it.
+        '''
+        self.records_l                                          = []
+
+    @staticmethod
+    def rss_kb():
+        '''
+        Returns an int, the resident memory currently used by the current process, in kilobytes. Returns None
+        if that can't be determined on this platform.
+        '''
+        try:
+            with open(ComparisonMetrics.STATM_PATH, 'r') as reader:
+                # The second field is the number of resident pages
+                resident_pages                                  = int(reader.read().split()[1])
+            return resident_pages * _os.sysconf("SC_PAGE_SIZE") // 1024
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    def add(self, result):
+        '''
+        Records the metrics of a comparison.
+
+        @param result A WorksheetComparisonResult object, whose `metrics_dict` has been populated.
+        '''
+        record                                                  = {"file": result.relative_excel_path, "worksheet": result.worksheet_name}
+        for name in self.METRIC_NAMES:
+            record[name]                                        = result.metrics_dict.get(name)
+        self.records_l.append(record)
+
+    def table_lines(self):
+        '''
+        Returns a list of strings, with the metrics formatted as a text table, one line per worksheet, sorted with
+        the slowest worksheets first.
+        '''
+        def _total_seconds(record):
+            return sum([record[name] or 0 for name in [self.LOAD_SECONDS, self.LABELS_SECONDS, self.CELLS_SECONDS,
+                                                       self.ARTIFACT_SECONDS]])
+        def _fmt(value):
+            if value is None:
+                return "-"
+            if isinstance(value, float):
+                return "{:.3f}".format(value)
+            return str(value)
+
+        header_l                                                = ["total_seconds"] + self.METRIC_NAMES + ["worksheet"]
+        lines_l                                                 = ["\t" + "\t".join(header_l)]
+        for record in sorted(self.records_l, key=_total_seconds, reverse=True):
+            worksheet                                           = record["file"] + "[" + str(record["worksheet"] or "*") + "]"
+            values_l                                            = [_fmt(_total_seconds(record))] \
+                                                                    + [_fmt(record[name]) for name in self.METRIC_NAMES] \
+                                                                    + [worksheet]
+            lines_l.append("\t" + "\t".join(values_l))
+        return lines_l
+
+    def save(self, path):
+        '''
+        Saves the metrics as a JSON file at `path`, so that they can be trended across runs.
+
+        @param path A string, the absolute path of the JSON file to create.
+        '''
+        _os.makedirs(_os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding="UTF8") as writer:
+            _json.dump(self.records_l, writer, indent=2)
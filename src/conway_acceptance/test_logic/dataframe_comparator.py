@@ -0,0 +1,129 @@
+import numpy                                                                    as _np
+import pandas                                                                   as _pd
+
+
+class DataFrameComparator():
+
+    # Labels for the two sides of a differences DataFrame, same as the defaults of pandas.DataFrame.compare
+    ACTUAL_LABEL                                                = "self"
+    EXPECTED_LABEL                                              = "other"
+
+    def __init__(self, sheet_info):
+        '''
+        Compares the cells of two DataFrames with the same row and column labels, column by column, using
+        vectorized NumPy operations.
+
+        Unlike pandas.DataFrame.compare, it does not materialize all the differences: it counts the rows that differ
+        and only builds a DataFrame for the first `sheet_info.max_diff_rows` of them, to be saved for debugging.
+
+        Numeric columns are compared with the absolute and relative tolerances given by `sheet_info`, so that
+        floating point noise (like 0.1 + 0.2 vs 0.3) is not reported as a difference if the test case allows for it.
+        Other columns are compared with Python equality. Either way, two missing values (NaN, None) count as equal.
+
+        @param sheet_info A WorksheetComparisonInfo object, for the worksheet whose DataFrames are to be compared.
+        '''
+        self.sheet_info                                         = sheet_info
+
+    def compare(self, actual_df, expected_df, max_diff_rows=-1):
+        '''
+        Returns a tuple of 2 elements:
+
+        * an int, the number of rows in which `actual_df` differs from `expected_df`
+        * a DataFrame with a sample of the differences, or None if there are none. It has the same layout as the
+          result of `actual_df.compare(expected_df)`, but has at most `max_diff_rows` rows.
+
+        @param actual_df A DataFrame, as loaded from ACTUALS.
+
+        @param expected_df A DataFrame, as loaded from EXPECTED. It must have the same row and column labels as
+                `actual_df`.
+
+        @param max_diff_rows An int, the maximum number of rows in the sample of differences, or None for no limit.
+                By default it is `self.sheet_info.max_diff_rows`.
+        '''
+        if max_diff_rows == -1:
+            max_diff_rows                                       = self.sheet_info.max_diff_rows
+        row_count                                               = len(expected_df.index)
+        differing_rows                                          = _np.zeros(row_count, dtype=bool)
+        differing_columns_l                                     = []
+
+        # GOTCHA: access columns by position, since labels may not be unique
+        for idx in range(len(expected_df.columns)):
+            column_mismatches                                   = self._column_mismatches(expected_df.columns[idx],
+                                                                                          actual_df.iloc[:, idx],
+                                                                                          expected_df.iloc[:, idx])
+            if column_mismatches.any():
+                differing_rows                                  |= column_mismatches
+                differing_columns_l.append(idx)
+
+        difference_size                                         = int(differing_rows.sum())
+        if difference_size == 0:
+            return difference_size, None
+
+        if max_diff_rows is not None and max_diff_rows <= 0:
+            return difference_size, None
+
+        return difference_size, self._differences_sample(actual_df, expected_df, differing_rows, differing_columns_l,
+                                                         max_diff_rows)
+
+    def _differences_sample(self, actual_df, expected_df, differing_rows, differing_columns_l, max_diff_rows):
+        '''
+        Returns a DataFrame with the differences in the first `max_diff_rows` differing rows, laid out
+        like the result of pandas.DataFrame.compare: for each differing column there is a pair of columns with the
+        ACTUAL and EXPECTED values, and cells that are equal are left empty.
+        '''
+        row_positions                                           = _np.flatnonzero(differing_rows)
+        if max_diff_rows is not None:
+            row_positions                                       = row_positions[:max_diff_rows]
+
+        actual_sample_df                                        = actual_df.iloc[row_positions]
+        expected_sample_df                                      = expected_df.iloc[row_positions]
+
+        sample_columns_l                                        = []
+        sample_labels_l                                         = []
+        for idx in differing_columns_l:
+            label                                               = expected_df.columns[idx]
+            actual_values                                       = actual_sample_df.iloc[:, idx]
+            expected_values                                     = expected_sample_df.iloc[:, idx]
+            mismatches                                          = self._column_mismatches(label, actual_values, expected_values)
+            if not mismatches.any():
+                # This column only differs in rows beyond the cap
+                continue
+            sample_columns_l.append(actual_values.where(mismatches).reset_index(drop=True))
+            sample_columns_l.append(expected_values.where(mismatches).reset_index(drop=True))
+            sample_labels_l.append((label, self.ACTUAL_LABEL))
+            sample_labels_l.append((label, self.EXPECTED_LABEL))
+
+        differences_df                                          = _pd.concat(sample_columns_l, axis=1)
+        differences_df.columns                                  = _pd.MultiIndex.from_tuples(sample_labels_l)
+        differences_df.index                                    = expected_sample_df.index
+        return differences_df
+
+    def _column_mismatches(self, label, actual_values, expected_values):
+        '''
+        Returns a boolean NumPy array, which is True for each row in which `actual_values` differs from
+        `expected_values`.
+
+        @param label The label of the column being compared, used to look up its tolerances.
+
+        @param actual_values A pandas Series, a column of the ACTUAL DataFrame.
+
+        @param expected_values A pandas Series, the same column of the EXPECTED DataFrame.
+        '''
+        if _pd.api.types.is_numeric_dtype(actual_values.dtype) and _pd.api.types.is_numeric_dtype(expected_values.dtype) \
+                and not _pd.api.types.is_bool_dtype(actual_values.dtype) \
+                and not _pd.api.types.is_bool_dtype(expected_values.dtype):
+            abs_tolerance, rel_tolerance                        = self.sheet_info.tolerances(label)
+            if abs_tolerance == 0 and rel_tolerance == 0 \
+                    and _pd.api.types.is_integer_dtype(actual_values.dtype) \
+                    and _pd.api.types.is_integer_dtype(expected_values.dtype):
+                # Exact comparison, without converting to floats that would lose precision on very large integers
+                return actual_values.to_numpy() != expected_values.to_numpy()
+
+            actual_array                                        = actual_values.to_numpy(dtype=float, na_value=_np.nan)
+            expected_array                                      = expected_values.to_numpy(dtype=float, na_value=_np.nan)
+            return ~_np.isclose(actual_array, expected_array, rtol=rel_tolerance, atol=abs_tolerance, equal_nan=True)
+
+        actual_array                                            = actual_values.to_numpy(dtype=object)
+        expected_array                                          = expected_values.to_numpy(dtype=object)
+        both_missing                                            = _pd.isna(actual_array) & _pd.isna(expected_array)
+        return (actual_array != expected_array) & ~both_missing
@@ -0,0 +1,138 @@
+import atexit                                                                   as _atexit
+import concurrent.futures                                                       as _futures
+import importlib.util                                                           as _importlib_util
+import os                                                                       as _os
+import traceback                                                                as _traceback
+from pathlib                                                                    import Path
+
+
+class DifferencesWriter():
+
+    FORMAT_CSV                                                  = "csv"
+    FORMAT_PARQUET                                              = "parquet"
+    FORMAT_EXCEL                                                = "xlsx"
+
+    # Default cap on the rows saved per artifact. Differences beyond it are still counted in the notes.
+    DEFAULT_MAX_ROWS                                            = 10000
+
+    # Extension of the `df_description` strings that identify worksheets, like "reports/summary[Sheet1].xlsx"
+    EXCEL_EXTENSION                                             = ".xlsx"
+
+    # Shared by all instances, so that artifacts written in the background by one test case are not lost when
+    # the next test case starts. Pending writes are completed before the Python interpreter exits, since
+    # DifferencesWriter.wait_all is registered with atexit when the executor is created.
+    _BACKGROUND_EXECUTOR                                        = None
+
+    def __init__(self, differences_folder, artifact_format=None, max_rows=DEFAULT_MAX_ROWS, background=False):
+        '''
+        Saves the DataFrames with the differences between ACTUAL and EXPECTED worksheets, to support debugging
+        failed test cases. This is the "DIFFERENCES artifact" of a worksheet.
+
+        Writing Excel files is slow, so by default artifacts are written in Parquet format if pyarrow is available,
+        and in CSV format otherwise. Artifacts are capped at `max_rows` rows, and may be written in a background
+        thread so that the assertion that detected the differences is raised without waiting for the write.
+
+        @param differences_folder A string, the absolute path of the folder in which to save the artifacts,
+                such as "<scenario>/RUN_NOTES/<timestamp> DIFFERENCES".
+
+        @param artifact_format A string, one of DifferencesWriter.FORMAT_CSV, DifferencesWriter.FORMAT_PARQUET or
+                DifferencesWriter.FORMAT_EXCEL. If None, the default described above is used.
+
+        @param max_rows An int, the maximum number of rows saved per artifact, or None for no limit.
+
+        @param background A boolean. If True, artifacts are written in a background thread. If a background write
+                fails, the error is saved in a text file next to where the artifact would have been.
+        '''
+        if artifact_format is None:
+            artifact_format                                     = self.FORMAT_PARQUET if _importlib_util.find_spec("pyarrow") is not None \
+                                                                    else self.FORMAT_CSV
+        if not artifact_format in [self.FORMAT_CSV, self.FORMAT_PARQUET, self.FORMAT_EXCEL]:
+            raise ValueError("Invalid artifact format '" + str(artifact_format) + "': should be one of '"
+                             + self.FORMAT_CSV + "', '" + self.FORMAT_PARQUET + "' or '" + self.FORMAT_EXCEL + "'")
+
+        self.differences_folder                                 = differences_folder
+        self.artifact_format                                    = artifact_format
+        self.max_rows                                           = max_rows
+        self.background                                         = background
+
+    def write(self, df_description, differences_df):
+        '''
+        Saves `differences_df` (or its first `self.max_rows` rows) as the artifact for the worksheet identified by
+        `df_description`. Returns the absolute path of the artifact, which has a ".csv" extension instead if it
+        couldn't be saved as Parquet.
+
+        GOTCHA: when writing in the background, the path returned is the one for `self.artifact_format`, since
+        whether the CSV fallback is needed is not known yet.
+
+        @param df_description A string identifying a worksheet, like "reports/summary[Sheet1].xlsx". It is used
+                as the path of the artifact relative to `self.differences_folder`, with the extension
+                changed to match the artifact's format.
+
+        @param differences_df A DataFrame with the differences, as created by a DataFrameComparator.
+        '''
+        if df_description.endswith(self.EXCEL_EXTENSION):
+            df_description                                      = df_description[:-len(self.EXCEL_EXTENSION)]
+        artifact_path                                           = self.differences_folder + "/" + df_description + "." + self.artifact_format
+
+        if self.max_rows is not None and len(differences_df.index) > self.max_rows:
+            differences_df                                      = differences_df.head(self.max_rows)
+
+        if self.background:
+            DifferencesWriter._executor().submit(self._write_or_record_error, artifact_path, differences_df)
+        else:
+            artifact_path                                       = self._write(artifact_path, differences_df)
+        return artifact_path
+
+    @staticmethod
+    def wait_all():
+        '''
+        Blocks until all artifacts being written in the background, by any DifferencesWriter, are saved.
+        '''
+        if DifferencesWriter._BACKGROUND_EXECUTOR is not None:
+            DifferencesWriter._BACKGROUND_EXECUTOR.shutdown(wait=True)
+            DifferencesWriter._BACKGROUND_EXECUTOR              = None
+
+    @staticmethod
+    def _executor():
+        if DifferencesWriter._BACKGROUND_EXECUTOR is None:
+            DifferencesWriter._BACKGROUND_EXECUTOR              = _futures.ThreadPoolExecutor(max_workers          = 1,
+                                                                                              thread_name_prefix   = "DifferencesWriter")
+            # Unregistered first, so that it is registered only once even if executors are created again after
+            # `wait_all` shuts them down
+            _atexit.unregister(DifferencesWriter.wait_all)
+            _atexit.register(DifferencesWriter.wait_all)
+        return DifferencesWriter._BACKGROUND_EXECUTOR
+
+    def _write_or_record_error(self, artifact_path, differences_df):
+        try:
+            self._write(artifact_path, differences_df)
+        except Exception:
+            with open(artifact_path + ".ERROR.txt", 'w') as writer:
+                writer.write(_traceback.format_exc())
+
+    def _write(self, artifact_path, differences_df):
+        '''
+        Saves `differences_df` at `artifact_path`, or next to it as CSV if it can't be saved as Parquet. Returns the
+        absolute path of the file saved.
+        '''
+        Path(_os.path.dirname(artifact_path)).mkdir(parents=True, exist_ok=True)
+
+        if self.artifact_format == self.FORMAT_EXCEL:
+            differences_df.to_excel(artifact_path)
+        elif self.artifact_format == self.FORMAT_CSV:
+            differences_df.to_csv(artifact_path)
+        else:
+            # Parquet requires string column labels, so the (column, "self"/"other") pairs are flattened
+            flat_df                                             = differences_df.copy(deep=False)
+            flat_df.columns                                     = [" | ".join([str(level) for level in label])
+                                                                        if isinstance(label, tuple) else str(label)
+                                                                    for label in differences_df.columns]
+            try:
+                flat_df.to_parquet(artifact_path)
+            except Exception:
+                # Typically, columns with values of mixed types that Parquet can't store. CSV can store anything
+                if _os.path.exists(artifact_path):
+                    _os.remove(artifact_path)
+                artifact_path                                   = artifact_path[:-len(self.FORMAT_PARQUET)] + self.FORMAT_CSV
+                differences_df.to_csv(artifact_path)
+        return artifact_path
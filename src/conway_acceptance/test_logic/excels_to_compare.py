@@ -47,13 +47,55 @@ class ExcelsToCompare(abc.ABC):
 
 class WorksheetComparisonInfo():
 
-    def __init__(self, worksheet_name, is_optional=False):
+    # Default for the maximum number of differing rows saved to the DIFFERENCES artifact of a worksheet
+    DEFAULT_MAX_DIFF_ROWS                                           = 1000
+
+    # Default for the number of rows read at a time from each side, when comparing a worksheet in streaming mode
+    DEFAULT_CHUNK_ROWS                                              = 10000
+
+    def __init__(self, worksheet_name, is_optional=False, abs_tolerance=0.0, rel_tolerance=0.0, column_tolerances=None,
+                 max_diff_rows=DEFAULT_MAX_DIFF_ROWS, streaming=False, chunk_rows=DEFAULT_CHUNK_ROWS):
         '''
         Helper data structure class that holds some information about a worksheet in an Excel spreadsheet pertinent
         to the business logic of comparing if a test case's actual Excel files output matches the expected output.
 
         @param is_optional A boolean, which is False by default. If True, it indicates that the worksheet represented
             by this object may exist in the Excel spreadsheet in question, but is not mandatory.
+
+        @param abs_tolerance A float, which is 0 by default. Numeric cells are considered equal if their absolute
+            difference is at most `abs_tolerance` plus `rel_tolerance` times the absolute value of the expected cell.
+
+        @param rel_tolerance A float, which is 0 by default. See `abs_tolerance`.
+
+        @param column_tolerances An optional dictionary, whose keys are column labels and whose values are tuples
+            (abs_tolerance, rel_tolerance), to override the worksheet-wide tolerances for specific columns.
+
+        @param max_diff_rows An int, the maximum number of differing rows to save for debugging when the worksheet
+            does not match. All differing rows are counted regardless. If None, all of them are saved.
+
+        @param streaming A boolean, which is False by default. If True, the worksheet is compared by reading 
+            `chunk_rows` rows at a time from ACTUALS and EXPECTED, instead of loading both worksheets in memory. 
+            Intended for worksheets with millions of cells. Rows are then labeled by position, as pandas.read_excel
+            does by default.
+
+        @param chunk_rows An int, the number of rows read at a time from each side in streaming mode.
         '''
         self.worksheet_name                                         = worksheet_name
         self.is_optional                                            = is_optional
+        self.abs_tolerance                                          = abs_tolerance
+        self.rel_tolerance                                          = rel_tolerance
+        self.column_tolerances                                      = column_tolerances if column_tolerances is not None else {}
+        self.max_diff_rows                                          = max_diff_rows
+        self.streaming                                              = streaming
+        self.chunk_rows                                             = chunk_rows
+
+    def tolerances(self, column):
+        '''
+        Returns a tuple (abs_tolerance, rel_tolerance) with the tolerances to use when comparing numeric cells in
+        the given column.
+
+        @param column The label of a column in the worksheet.
+        '''
+        if column in self.column_tolerances.keys():
+            return self.column_tolerances[column]
+        return self.abs_tolerance, self.rel_tolerance
@@ -0,0 +1,296 @@
+import argparse                                                                 as _argparse
+import concurrent.futures                                                       as _futures
+import contextlib                                                               as _contextlib
+import datetime                                                                 as _datetime
+import json                                                                     as _json
+import os                                                                       as _os
+import sys                                                                      as _sys
+import time                                                                     as _time
+import traceback                                                                as _traceback
+import unittest
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.test_statics                                        import TestStatics
+from conway_acceptance.util.scenarios_config                                    import ScenariosConfig
+
+
+class ScenarioRunResult():
+
+    STATUS_PASSED                                               = "PASSED"
+    STATUS_FAILED                                               = "FAILED"
+    STATUS_ERROR                                                = "ERROR"
+
+    def __init__(self, scenario_id, test_name):
+        '''
+        Data structure class with the outcome of running the test case of a scenario in a ScenarioScheduler.
+        Instances are created in worker processes, so they only hold plain data.
+
+        @param scenario_id An int, the scenario id.
+
+        @param test_name A string, the dotted name of the test case, as loaded by unittest.
+        '''
+        self.scenario_id                                        = scenario_id
+        self.test_name                                          = test_name
+        self.status                                             = self.STATUS_ERROR
+        self.seconds                                            = 0.0
+        self.tests_run                                          = 0
+        self.problem_lines_l                                    = []
+        self.log_path                                           = None
+
+
+class ScenarioScheduler():
+
+    # Default name of the log file for each scenario, under the scenario's RUN_NOTES folder (after the run timestamp)
+    LOG_FILENAME                                                = "SCHEDULER LOG.txt"
+
+    # Name of the merged summary, under the RUN_NOTES folder of the scenarios root folder (after the run timestamp)
+    SUMMARY_FILENAME                                            = "SCHEDULER SUMMARY"
+
+    def __init__(self, scenarios_repo, scenarios_root_folder, test_name_prefix="", max_workers=None):
+        '''
+        Runs the test cases listed in a ScenarioIds.yaml file across a pool of processes, instead of serially as
+        unittest does. This is possible because each scenario works in its own folder
+        `scenarios_root_folder/<scenario_id>`.
+
+        To finish as early as possible, scenarios are started longest-first, using the durations recorded in
+        previous runs (in TestStatics.SCENARIO_DURATIONS_FILE under the scenarios' cache folder). Scenarios with no
+        recorded duration are started first, since they might be the longest.
+
+        Each scenario's output (unittest's report, and anything printed) is saved to its own log file in the
+        scenario's RUN_NOTES folder, next to its notes. Once all scenarios are done, a merged summary is saved in the
+        RUN_NOTES folder of `scenarios_root_folder`.
+
+        @param scenarios_repo A string, the absolute path of the folder containing the ScenarioIds.yaml file.
+
+        @param scenarios_root_folder A string, the absolute path of the folder containing the scenarios' folders.
+
+        @param test_name_prefix A string prepended to the test case names in ScenarioIds.yaml to get names that
+                unittest can load, like "my_app_tests." so that "services.post_reports_governance" is loaded as
+                "my_app_tests.services.post_reports_governance". The modules must be importable in worker processes.
+
+        @param max_workers An int, the number of processes. If None, it is the number of CPUs.
+        '''
+        self.scenarios_repo                                     = scenarios_repo
+        self.scenarios_root_folder                              = scenarios_root_folder
+        self.test_name_prefix                                   = test_name_prefix
+        self.max_workers                                        = max_workers or _os.cpu_count() or 1
+        self.run_timestamp                                      = _datetime.datetime.now().strftime("%y%m%d.%H%M%S")
+
+    def run(self, scenario_ids_l=None):
+        '''
+        Runs the scenarios and returns a list of ScenarioRunResult objects, sorted by scenario id. It also records
+        their durations for the next run, and saves the merged summary.
+
+        @param scenario_ids_l A list of ints, the ids of the scenarios to run. If None, all the scenarios in
+                ScenarioIds.yaml are run.
+        '''
+        registry                                                = ScenariosConfig(self.scenarios_repo,
+                                                                                  cache_folder = self.scenarios_root_folder + "/"
+                                                                                                    + TestStatics.CACHE_FOLDER).registry
+        durations_dict                                          = self._load_durations()
+
+        tasks_l                                                 = []
+        # GOTCHA: two test cases with the same scenario id would clobber each other's scenario folder, and results and
+        # durations are keyed by scenario id. So only the first test case listed for an id is run, and the others are
+        # reported as errors without failing the whole run
+        duplicate_results_l                                     = []
+        for test_case_name, scenario_id in registry.ids_by_name_dict.items():
+            if scenario_ids_l is not None and not scenario_id in scenario_ids_l:
+                continue
+            test_name                                           = self.test_name_prefix + test_case_name
+            first_name                                          = registry.get_test_case_name(scenario_id)
+            if first_name != test_case_name:
+                duplicate_results_l.append(self._duplicate_result(scenario_id, test_name, first_name))
+                continue
+            tasks_l.append((scenario_id, test_name))
+
+        # Longest first, and unknown durations before all others
+        tasks_l.sort(key=lambda task: (task[0] in durations_dict.keys(), -durations_dict.get(task[0], 0), task[0]))
+
+        start                                                   = _time.perf_counter()
+        results_l                                               = []
+        if self.max_workers <= 1:
+            for scenario_id, test_name in tasks_l:
+                results_l.append(self._run_one(scenario_id, test_name))
+        else:
+            with _futures.ProcessPoolExecutor(max_workers=min(self.max_workers, max(len(tasks_l), 1))) as executor:
+                futures_dict                                    = {executor.submit(_run_scenario, scenario_id, test_name,
+                                                                                   self._log_path(scenario_id)): (scenario_id, test_name)
+                                                                    for scenario_id, test_name in tasks_l}
+                for future in _futures.as_completed(futures_dict.keys()):
+                    scenario_id, test_name                      = futures_dict[future]
+                    try:
+                        results_l.append(future.result())
+                    except Exception as ex:
+                        # Typically a BrokenProcessPool, if a worker died (e.g., killed for using too much memory). That
+                        # fails all the scenarios not finished yet, which are reported as errors rather than losing the
+                        # results of the others
+                        results_l.append(self._error_result(scenario_id, test_name, ex))
+        wall_seconds                                            = _time.perf_counter() - start
+
+        results_l.extend(duplicate_results_l)
+        results_l.sort(key=lambda result: result.scenario_id)
+        for result in results_l:
+            # Results for scenarios that didn't run (e.g., whose worker was killed) have no duration, and the previous
+            # one, if any, is kept. Otherwise a scenario killed for using too much memory, typically a long one, would
+            # be scheduled last next time
+            if result.seconds > 0:
+                durations_dict[result.scenario_id]              = result.seconds
+        self._save_durations(durations_dict)
+        self.save_summary(results_l, wall_seconds)
+        return results_l
+
+    def summary_lines(self, results_l, wall_seconds):
+        '''
+        Returns a list of strings, a summary of the outcome of the run, one line per scenario plus totals.
+        '''
+        lines_l                                                 = []
+        for result in results_l:
+            lines_l.append(result.status + "\t" + "{:.1f}".format(result.seconds) + "s\t" + str(result.scenario_id)
+                           + "\t" + result.test_name + "\t" + str(result.log_path))
+            lines_l.extend(["\t\t" + line for line in result.problem_lines_l])
+
+        counts_dict                                             = {}
+        for result in results_l:
+            counts_dict[result.status]                          = counts_dict.get(result.status, 0) + 1
+        serial_seconds                                          = sum([result.seconds for result in results_l])
+        lines_l.append("")
+        lines_l.append(", ".join([status + "=" + str(count) for status, count in sorted(counts_dict.items())])
+                       + " ; " + str(len(results_l)) + " scenarios in " + "{:.1f}".format(wall_seconds) + "s with "
+                       + str(self.max_workers) + " workers (" + "{:.1f}".format(serial_seconds) + "s if run serially)")
+        return lines_l
+
+    def save_summary(self, results_l, wall_seconds):
+        '''
+        Saves the merged summary of the run as a text file and as a JSON file in the RUN_NOTES folder of the scenarios
+        root folder. Returns the absolute path of the text file.
+        '''
+        notes_folder                                            = self.scenarios_root_folder + "/" + TestStatics.RUN_NOTES
+        _os.makedirs(notes_folder, exist_ok=True)
+        path                                                    = notes_folder + "/" + self.run_timestamp + " " + self.SUMMARY_FILENAME
+        with open(path + ".txt", 'w', encoding="UTF8") as writer:
+            for line in self.summary_lines(results_l, wall_seconds):
+                writer.write(line + "\n")
+        with open(path + ".json", 'w', encoding="UTF8") as writer:
+            _json.dump({"wall_seconds": wall_seconds, "results": [vars(result) for result in results_l]}, writer, indent=2)
+        return path + ".txt"
+
+    def _error_result(self, scenario_id, test_name, ex):
+        '''
+        Returns a ScenarioRunResult with status ScenarioRunResult.STATUS_ERROR for a scenario whose worker process
+        failed with the exception `ex`.
+        '''
+        result                                                  = ScenarioRunResult(scenario_id, test_name)
+        result.log_path                                         = self._log_path(scenario_id)
+        result.problem_lines_l                                  = ["Worker process failed: " + type(ex).__name__ + ": " + str(ex)]
+        return result
+
+    def _duplicate_result(self, scenario_id, test_name, first_name):
+        '''
+        Returns a ScenarioRunResult with status ScenarioRunResult.STATUS_ERROR for a test case that is not run because
+        its scenario id is already used by the test case called `first_name`.
+        '''
+        result                                                  = ScenarioRunResult(scenario_id, test_name)
+        result.problem_lines_l                                  = ["Not run: scenario id " + str(scenario_id) + " is also used by "
+                                                                   + self.test_name_prefix + str(first_name)
+                                                                   + " in ScenarioIds.yaml"]
+        return result
+
+    def _run_one(self, scenario_id, test_name):
+        return _run_scenario(scenario_id, test_name, self._log_path(scenario_id))
+
+    def _log_path(self, scenario_id):
+        return self.scenarios_root_folder + "/" + str(scenario_id) + "/" + TestStatics.RUN_NOTES + "/" \
+                + self.run_timestamp + " " + self.LOG_FILENAME
+
+    def _durations_path(self):
+        return self.scenarios_root_folder + "/" + TestStatics.CACHE_FOLDER + "/" + TestStatics.SCENARIO_DURATIONS_FILE
+
+    def _load_durations(self):
+        '''
+        Returns a dictionary of the durations of scenarios in previous runs, in seconds, by scenario id.
+        '''
+        try:
+            with open(self._durations_path(), 'r', encoding="UTF8") as reader:
+                # JSON keys are strings, but scenario ids are ints
+                return {int(scenario_id): seconds for scenario_id, seconds in _json.load(reader).items()}
+        except FileNotFoundError:
+            # First run
+            return {}
+        except (OSError, ValueError, AttributeError) as ex:
+            # The scenarios still run, just not longest first, and the file is overwritten at the end of the run
+            _sys.stderr.write("Ignoring scenario durations in '" + self._durations_path() + "', which can't be read: " 
+                              + type(ex).__name__ + ": " + str(ex) + "\n")
+            return {}
+
+    def _save_durations(self, durations_dict):
+        path                                                    = self._durations_path()
+        _os.makedirs(_os.path.dirname(path), exist_ok=True)
+        tmp_path                                                = path + "." + _uuid.uuid4().hex + ".tmp"
+        with open(tmp_path, 'w', encoding="UTF8") as writer:
+            _json.dump({str(scenario_id): seconds for scenario_id, seconds in sorted(durations_dict.items())}, writer, indent=2)
+        _os.replace(tmp_path, path)
+
+
+def _run_scenario(scenario_id, test_name, log_path):
+    '''
+    Runs the unittest test case called `test_name` and returns a ScenarioRunResult. This is a module-level function
+    so that it can run in worker processes. Everything the test case prints is saved to the file at `log_path`.
+    '''
+    result                                                      = ScenarioRunResult(scenario_id, test_name)
+    result.log_path                                             = log_path
+    _os.makedirs(_os.path.dirname(log_path), exist_ok=True)
+
+    start                                                       = _time.perf_counter()
+    with open(log_path, 'w', encoding="UTF8") as log:
+        try:
+            with _contextlib.redirect_stdout(log), _contextlib.redirect_stderr(log):
+                suite                                           = unittest.defaultTestLoader.loadTestsFromName(test_name)
+                test_result                                     = unittest.TextTestRunner(stream=log, verbosity=2).run(suite)
+            result.tests_run                                    = test_result.testsRun
+            for test, trace in test_result.errors + test_result.failures:
+                result.problem_lines_l.append(str(test) + ": " + trace.strip().splitlines()[-1])
+            if len(test_result.errors) > 0:
+                result.status                                   = ScenarioRunResult.STATUS_ERROR
+            elif len(test_result.failures) > 0 or test_result.testsRun == 0:
+                result.status                                   = ScenarioRunResult.STATUS_FAILED
+            else:
+                result.status                                   = ScenarioRunResult.STATUS_PASSED
+        except Exception as ex:
+            log.write(_traceback.format_exc())
+            result.status                                       = ScenarioRunResult.STATUS_ERROR
+            result.problem_lines_l.append(type(ex).__name__ + ": " + str(ex))
+    result.seconds                                              = _time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    '''
+    Command line interface to run scenarios in parallel. For example:
+
+        python -m conway_acceptance.test_logic.scenario_scheduler <scenarios_repo> <scenarios_root_folder> \
+                --prefix my_app_tests. --workers 16
+
+    Exits with a non-zero status if any scenario did not pass.
+    '''
+    parser                                                      = _argparse.ArgumentParser(
+                                                                        description = "Run acceptance test scenarios in parallel")
+    parser.add_argument("scenarios_repo", help="Folder containing " + ScenariosConfig.SCENARIOS_CONFIG_FILE)
+    parser.add_argument("scenarios_root_folder", help="Folder containing the scenarios' folders")
+    parser.add_argument("--prefix", default="", help="Prefix to turn test case names into names that unittest can load")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: number of CPUs)")
+    parser.add_argument("--ids", type=int, nargs="*", default=None, help="Ids of the scenarios to run (default: all)")
+    args                                                        = parser.parse_args(argv)
+
+    scheduler                                                   = ScenarioScheduler(args.scenarios_repo, args.scenarios_root_folder,
+                                                                                    test_name_prefix    = args.prefix,
+                                                                                    max_workers         = args.workers)
+    results_l                                                   = scheduler.run(args.ids)
+    all_passed                                                  = True
+    for result in results_l:
+        all_passed                                              = all_passed and result.status == ScenarioRunResult.STATUS_PASSED
+        print(result.status + "\t" + str(result.scenario_id) + "\t" + result.test_name)
+    _sys.exit(0 if all_passed else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import itertools                                                                as _itertools
+import openpyxl                                                                 as _openpyxl
+import pandas                                                                   as _pd
+
+from conway_acceptance.test_logic.dataframe_comparator                          import DataFrameComparator
+from conway_acceptance.test_logic.comparison_metrics                            import ComparisonMetrics
+
+
+class StreamingWorksheetComparator():
+
+    def __init__(self, sheet_info):
+        '''
+        Compares a worksheet in ACTUALS against the same worksheet in EXPECTED without loading either of them
+        fully in memory. Both worksheets are read row by row with openpyxl's read-only mode, and compared in chunks
+        of `sheet_info.chunk_rows` rows with a DataFrameComparator, so memory stays bounded by the chunk size
+        regardless of the size of the worksheets.
+
+        Labels are interpreted the same way that pandas.read_excel does by default: the first row holds the
+        column labels, and rows are labeled by their position (starting at 0) after that header row.
+
+        @param sheet_info A WorksheetComparisonInfo object, for the worksheet to compare.
+        '''
+        self.sheet_info                                         = sheet_info
+
+    def compare(self, actual_path, expected_path, result):
+        '''
+        Compares the worksheet in the two Excel files, recording the outcome in `result`.
+
+        Returns a boolean, which is False if the worksheet is missing in either Excel file (in which case
+        nothing is recorded in `result`) and True otherwise.
+
+        @param actual_path A string, the absolute path of the Excel file in ACTUALS.
+
+        @param expected_path A string, the absolute path of the Excel file in EXPECTED.
+
+        @param result A WorksheetComparisonResult object, whose `df_description` is already set, where to record
+                the notes and the outcome of the comparison.
+        '''
+        sheet                                                   = self.sheet_info.worksheet_name
+        actual_wb                                               = None
+        expected_wb                                             = None
+        try:
+            actual_wb                                           = self._open(actual_path)
+            expected_wb                                         = self._open(expected_path)
+            if actual_wb is None or expected_wb is None or not sheet in actual_wb.sheetnames \
+                    or not sheet in expected_wb.sheetnames:
+                return False
+
+            actual_rows                                         = self._rows(actual_wb[sheet])
+            expected_rows                                       = self._rows(expected_wb[sheet])
+
+            # Check #2 (columns) before #1 (rows), since we only know the row count after reading everything
+            actual_columns                                      = self._column_labels(next(actual_rows, []))
+            expected_columns                                    = self._column_labels(next(expected_rows, []))
+            if actual_columns != expected_columns:
+                self._record_label_failure(result, "columns", actual_columns, expected_columns)
+                return True
+
+            comparator                                          = DataFrameComparator(self.sheet_info)
+            max_diff_rows                                       = self.sheet_info.max_diff_rows
+            difference_size                                     = 0
+            samples_l                                           = []
+            sample_size                                         = 0
+            actual_count                                        = 0
+            expected_count                                      = 0
+            while True:
+                actual_chunk                                    = list(_itertools.islice(actual_rows, self.sheet_info.chunk_rows))
+                expected_chunk                                  = list(_itertools.islice(expected_rows, self.sheet_info.chunk_rows))
+                common_size                                     = min(len(actual_chunk), len(expected_chunk))
+                if common_size > 0:
+                    actual_chunk_df, expected_chunk_df          = self._chunk_dfs(actual_chunk[:common_size],
+                                                                                  expected_chunk[:common_size],
+                                                                                  expected_columns, expected_count)
+                    remaining                                   = None if max_diff_rows is None else max_diff_rows - sample_size
+                    chunk_difference_size, chunk_sample_df      = comparator.compare(actual_chunk_df, expected_chunk_df,
+                                                                                     max_diff_rows = remaining)
+                    difference_size                             += chunk_difference_size
+                    if chunk_sample_df is not None and len(chunk_sample_df.index) > 0:
+                        samples_l.append(chunk_sample_df)
+                        sample_size                             += len(chunk_sample_df.index)
+                actual_count                                    += len(actual_chunk)
+                expected_count                                  += len(expected_chunk)
+                if len(actual_chunk) < self.sheet_info.chunk_rows or len(expected_chunk) < self.sheet_info.chunk_rows:
+                    break
+
+            # Whichever side is longer, count the rest of its rows
+            actual_count                                        += sum(1 for row in actual_rows)
+            expected_count                                      += sum(1 for row in expected_rows)
+        finally:
+            for wb in [actual_wb, expected_wb]:
+                if wb is not None:
+                    wb.close()
+
+        result.metrics_dict[ComparisonMetrics.ROWS]             = expected_count
+        result.metrics_dict[ComparisonMetrics.COLUMNS]          = len(expected_columns)
+
+        if actual_count != expected_count:
+            self._record_label_failure(result, "row labels", range(actual_count), range(expected_count))
+            return True
+
+        result.notes_l.append("\t" + str(difference_size) + "/" + str(expected_count) + " ERRORS in " + result.df_description)
+        if difference_size != 0:
+            result.differences_df                               = _pd.concat(samples_l) if len(samples_l) > 0 else None
+            result.failure_message                              = "ACTUAL doesn't match EXPECTED:" + result.df_description
+        return True
+
+    def _open(self, path):
+        '''
+        Returns an openpyxl Workbook in read-only mode for the Excel file at `path`, or None if it can't be opened.
+        '''
+        try:
+            return _openpyxl.load_workbook(path, read_only=True, data_only=True)
+        except (FileNotFoundError, _openpyxl.utils.exceptions.InvalidFileException):
+            return None
+
+    def _rows(self, worksheet):
+        '''
+        Generator of the rows of `worksheet`, as lists of cell values.
+
+        Like pandas.read_excel, it drops trailing empty cells in each row and trailing empty rows in the worksheet.
+        Empty rows in the middle of the worksheet are kept, so they are buffered until a non-empty row shows up.
+        '''
+        empty_rows_pending                                      = 0
+        for row in worksheet.iter_rows(values_only=True):
+            values                                              = list(row)
+            while len(values) > 0 and values[-1] is None:
+                values.pop()
+            if len(values) == 0:
+                empty_rows_pending                              += 1
+                continue
+            for idx in range(empty_rows_pending):
+                yield []
+            empty_rows_pending                                  = 0
+            yield values
+
+    def _column_labels(self, header_row):
+        '''
+        Returns a list of column labels from the values in the first row of a worksheet, mangled the same way that
+        pandas.read_excel does: empty labels become "Unnamed: {position}" and duplicates get a ".{n}" suffix.
+        '''
+        labels_l                                                = []
+        seen_dict                                               = {}
+        for idx, value in enumerate(header_row):
+            label                                               = "Unnamed: " + str(idx) if value is None else value
+            if label in seen_dict.keys():
+                seen_dict[label]                                += 1
+                label                                           = str(label) + "." + str(seen_dict[label] - 1)
+            else:
+                seen_dict[label]                                = 1
+            labels_l.append(label)
+        return labels_l
+
+    def _chunk_dfs(self, actual_chunk, expected_chunk, columns, row_offset):
+        '''
+        Returns a tuple of two DataFrames with the same labels, built from a chunk of rows of each side.
+
+        Rows are padded to a common width. If some row is wider than the header, the extra columns get
+        "Unnamed: {position}" labels, as pandas.read_excel would do.
+        '''
+        width                                                   = max([len(columns)] + [len(row) for row in actual_chunk]
+                                                                        + [len(row) for row in expected_chunk])
+        labels_l                                                = list(columns) + ["Unnamed: " + str(idx)
+                                                                                    for idx in range(len(columns), width)]
+        index                                                   = _pd.RangeIndex(row_offset, row_offset + len(expected_chunk))
+
+        def _to_df(chunk):
+            padded_rows                                         = [row + [None] * (width - len(row)) for row in chunk]
+            df                                                  = _pd.DataFrame(padded_rows, index=index)
+            df.columns                                          = _pd.Index(labels_l, dtype=object)
+            return df
+
+        return _to_df(actual_chunk), _to_df(expected_chunk)
+
+    def _record_label_failure(self, result, label_type, actual_labels, expected_labels):
+        '''
+        Records in `result` that the row or column labels don't match. Row labels are ranges of positions, so
+        they are summarized as ranges rather than listed one by one.
+        '''
+        header                                                  = "ACTUAL " + label_type + " don't match EXPECTED's:" + result.df_description
+        if isinstance(actual_labels, range):
+            missing_s                                           = range(len(actual_labels), len(expected_labels))
+            unexpected_s                                        = range(len(expected_labels), len(actual_labels))
+            missing_txt                                         = "" if len(missing_s) == 0 else str(missing_s.start) + " ... " + str(missing_s.stop - 1)
+            unexpected_txt                                      = "" if len(unexpected_s) == 0 else str(unexpected_s.start) + " ... " + str(unexpected_s.stop - 1)
+        else:
+            missing_txt                                         = ", ".join([str(label) for label in set(expected_labels).difference(set(actual_labels))])
+            unexpected_txt                                      = ", ".join([str(label) for label in set(actual_labels).difference(set(expected_labels))])
+        differences_l                                           = ["\t\tMISSING in ACTUAL: [" + missing_txt + "]",
+                                                                   "\t\tUNEXPECTED in ACTUAL: [" + unexpected_txt + "]"]
+        result.notes_l.append("\t" + header)
+        result.notes_l.extend(differences_l)
+        # As in WorkbookComparator, the labels go in the failure message too
+        result.failure_message                                  = "\n".join([header] + differences_l)
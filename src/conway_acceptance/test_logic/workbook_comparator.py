@@ -0,0 +1,259 @@
+import os                                                                       as _os
+import time                                                                     as _time
+
+from conway_acceptance.util.file_digest                                         import FileDigest
+from conway_acceptance.util.parsed_frame_cache                                  import ParsedFrameCache
+from conway_acceptance.test_logic.workbook_loader                               import WorkbookLoader
+from conway_acceptance.test_logic.dataframe_comparator                          import DataFrameComparator
+from conway_acceptance.test_logic.streaming_worksheet_comparator                import StreamingWorksheetComparator
+from conway_acceptance.test_logic.comparison_metrics                            import ComparisonMetrics
+
+
+class WorksheetComparisonResult():
+
+    def __init__(self, relative_excel_path, worksheet_name):
+        '''
+        Data structure class holding the outcome of comparing a worksheet of an Excel file in ACTUALS against
+        the same worksheet in EXPECTED.
+
+        It holds everything the AcceptanceTestCase needs to report on the comparison, so that the comparison itself
+        can happen in a different process than the one in which the test case runs:
+
+        * `notes_l` is a list of strings to add to the test case's AcceptanceTestNotes
+        * `error_message` is set if the comparison could not be done (e.g., a mandatory worksheet is missing)
+        * `failure_message` is set if ACTUALS did not match EXPECTED
+        * `differences_df` is set to a DataFrame with the differing cells, if there were any
+        * `metrics_dict` holds timing and memory metrics, keyed by the ComparisonMetrics metric names
+
+        @param relative_excel_path A string, the path of the Excel file relative to the root of the test database.
+
+        @param worksheet_name A string, the name of the worksheet compared. It is None if the result applies to the
+                whole Excel file, e.g., because the file was found to be identical without looking at any worksheet.
+        '''
+        self.relative_excel_path                                = relative_excel_path
+        self.worksheet_name                                     = worksheet_name
+
+        self.df_description                                     = None
+        self.notes_l                                            = []
+        self.error_message                                      = None
+        self.failure_message                                    = None
+        self.differences_df                                     = None
+        self.metrics_dict                                       = {}
+
+    def passed(self):
+        '''
+        Returns a boolean, stating whether the worksheet in ACTUALS matched EXPECTED.
+        '''
+        return self.error_message is None and self.failure_message is None
+
+
+class WorkbookComparator():
+
+    # Excel file extension, used to build user-friendly descriptions like "reports/summary[Sheet1].xlsx"
+    FILE_EXTENSION                                              = ".xlsx"
+
+    def __init__(self, actuals_root, expected_root, digest_fast_path=True, expected_cache_folder=None,
+                 expected_cache_max_bytes=ParsedFrameCache.DEFAULT_MAX_BYTES):
+        '''
+        Compares Excel files in an ACTUALS test database against the same Excel files in an EXPECTED test database.
+
+        This class holds no reference to the test case or to the notes, and its results are plain data, so
+        that instances can be shipped to worker processes to compare multiple Excel files in parallel.
+
+        @param actuals_root A string, the absolute path to the root of the ACTUALS test database.
+
+        @param expected_root A string, the absolute path to the root of the EXPECTED test database.
+
+        @param digest_fast_path A boolean. If True, Excel files whose digests match are considered equal without
+                loading any of their worksheets.
+
+        @param expected_cache_folder A string, the absolute path of the folder of a ParsedFrameCache in which to
+                cache the DataFrames loaded from EXPECTED. If None, EXPECTED worksheets are always read from Excel.
+
+        @param expected_cache_max_bytes An int, the maximum number of bytes the cache at `expected_cache_folder` 
+                may use on disk.
+        '''
+        self.actuals_root                                       = actuals_root
+        self.expected_root                                      = expected_root
+        self.digest_fast_path                                   = digest_fast_path
+        self.expected_cache_folder                              = expected_cache_folder
+        self.expected_cache_max_bytes                           = expected_cache_max_bytes
+
+    def compare(self, relative_excel_path, worksheets_info, digests=None):
+        '''
+        Returns a list of WorksheetComparisonResult objects, one for each worksheet compared, in the order given by
+        `worksheets_info`.
+
+        Comparison stops at the first worksheet that fails, since the AcceptanceTestCase will raise an
+        assertion failure for it anyway. Optional worksheets that are missing produce no result.
+
+        @param relative_excel_path A string, the path of the Excel file relative to the root of the test databases.
+
+        @param worksheets_info A list of WorksheetComparisonInfo objects, for the worksheets to compare.
+
+        @param digests An optional tuple (actual_digest, expected_digest) with the FileDigests of the Excel file in
+                ACTUALS and in EXPECTED (None for a missing file), if the caller already computed them. Otherwise, they
+                are computed if `self.digest_fast_path` is True.
+        '''
+        actual_path                                             = self.actuals_root + "/" + relative_excel_path
+        expected_path                                           = self.expected_root + "/" + relative_excel_path
+
+        if self.digest_fast_path:
+            start_time                                          = _time.perf_counter()
+            identical_result                                    = self._compare_digests(relative_excel_path, worksheets_info,
+                                                                                        actual_path, expected_path, digests)
+            if identical_result is not None:
+                identical_result.metrics_dict[ComparisonMetrics.LOAD_SECONDS]       = _time.perf_counter() - start_time
+                identical_result.metrics_dict[ComparisonMetrics.RSS_KB]             = ComparisonMetrics.rss_kb()
+                return [identical_result]
+
+        # Each workbook is loaded once per side, with all the worksheets we need from it, except for the worksheets
+        # that are to be compared in streaming mode, which are never loaded in full
+        loaded_sheets_info                                      = [sheet_info for sheet_info in worksheets_info
+                                                                        if not sheet_info.streaming]
+        start_time                                              = _time.perf_counter()
+        actual_dfs_dict                                         = WorkbookLoader(actual_path).load(loaded_sheets_info)
+        expected_cache                                          = None
+        if self.expected_cache_folder is not None:
+            expected_cache                                      = ParsedFrameCache.shared(self.expected_cache_folder,
+                                                                                          max_bytes = self.expected_cache_max_bytes)
+        expected_dfs_dict                                       = WorkbookLoader(expected_path).load(loaded_sheets_info,
+                                                                                                 cache = expected_cache)
+        load_seconds_per_sheet                                  = (_time.perf_counter() - start_time) / max(len(loaded_sheets_info), 1)
+
+        results_l                                               = []
+        for sheet_info in worksheets_info:
+            sheet                                               = sheet_info.worksheet_name
+            if sheet_info.streaming:
+                result                                          = WorksheetComparisonResult(relative_excel_path, sheet)
+                result.df_description                           = self._df_description(relative_excel_path, sheet)
+                start_time                                      = _time.perf_counter()
+                found                                           = StreamingWorksheetComparator(sheet_info).compare(
+                                                                                        actual_path, expected_path, result)
+                result.metrics_dict[ComparisonMetrics.CELLS_SECONDS]    = _time.perf_counter() - start_time
+            else:
+                actual_df                                       = actual_dfs_dict[sheet]
+                expected_df                                     = expected_dfs_dict[sheet]
+                found                                           = actual_df is not None and expected_df is not None
+                if found:
+                    result                                      = self._compare_worksheet(relative_excel_path, sheet_info,
+                                                                                          actual_df, expected_df)
+                    result.metrics_dict[ComparisonMetrics.LOAD_SECONDS] = load_seconds_per_sheet
+
+            if not found:
+                if sheet_info.is_optional == True:
+                    # In this case, the worksheet is missing but it is optional, so that's OK.
+                    # Just skip it and move on to the next sheet
+                    continue
+                result                                          = WorksheetComparisonResult(relative_excel_path, sheet)
+                result.error_message                            = "Worksheet '" + sheet + "' missing in '" + relative_excel_path + "'"
+            result.metrics_dict[ComparisonMetrics.RSS_KB]               = ComparisonMetrics.rss_kb()
+            results_l.append(result)
+            if not result.passed():
+                break
+
+        return results_l
+
+    def _compare_worksheet(self, relative_excel_path, sheet_info, actual_df, expected_df):
+        '''
+        Returns a WorksheetComparisonResult for the comparison of `actual_df` against `expected_df`.
+        '''
+        sheet                                                   = sheet_info.worksheet_name
+        result                                                  = WorksheetComparisonResult(relative_excel_path, sheet)
+
+        # We do 3 rounds to compare the two DataFrames, and each of them would be an assertion failure
+        #   1. do they contain the same row indices?
+        #   2. do they contain the same columns?
+        #   3. if they are of the same shape & labels, are the cells actually equal?
+        df_description                                          = self._df_description(relative_excel_path, sheet)
+        result.df_description                                   = df_description
+
+        def _lines_on_differences(actual_labels, expected_labels):
+            missing_s                                           =set(expected_labels).difference(set(actual_labels))
+            unexpected_s                                        =set(actual_labels).difference(set(expected_labels))
+            return ["\t\tMISSING in ACTUAL: [" + ", ".join([str(label) for label in missing_s]) + "]",
+                    "\t\tUNEXPECTED in ACTUAL: [" + ", ".join([str(label) for label in unexpected_s]) + "]"]
+        def _compare_labels(label_type, actual_labels, expected_labels):
+            # GOTCHA: Convert to list or comparator fails saying its ambiguous
+            if list(actual_labels) != list(expected_labels):
+                header                                          = "ACTUAL " + label_type + " don't match EXPECTED's:" + df_description
+                differences_l                                   = _lines_on_differences(actual_labels, expected_labels)
+                result.notes_l.append("\t" + header)
+                result.notes_l.extend(differences_l)
+                # The labels go in the failure message too, as the assertion on the lists of labels used to show them
+                result.failure_message                          = "\n".join([header] + differences_l)
+                return False
+            return True
+
+        result.metrics_dict[ComparisonMetrics.ROWS]             = len(expected_df.index)
+        result.metrics_dict[ComparisonMetrics.COLUMNS]          = len(expected_df.columns)
+
+        start_time                                              = _time.perf_counter()
+        # Check 1: are the row indices the same?
+        labels_match                                            = _compare_labels("row labels", actual_df.index, expected_df.index)
+
+        # Check #2: are the columns the same?
+        labels_match                                            = labels_match and _compare_labels("columns", actual_df.columns,
+                                                                                                   expected_df.columns)
+        result.metrics_dict[ComparisonMetrics.LABELS_SECONDS]   = _time.perf_counter() - start_time
+        if not labels_match:
+            return result
+
+        # Check #3: are the cell values the same? (within the tolerances configured for the worksheet)
+        start_time                                              = _time.perf_counter()
+        difference_size, differences_df                         = DataFrameComparator(sheet_info).compare(actual_df, expected_df)
+        result.metrics_dict[ComparisonMetrics.CELLS_SECONDS]    = _time.perf_counter() - start_time
+
+        expected_size                                           = len(expected_df.index)
+
+        result.notes_l.append("\t" + str(difference_size) + "/" + str(expected_size) + " ERRORS in " + df_description)
+
+        if difference_size!=0:
+            result.differences_df                               = differences_df
+            result.failure_message                              = "ACTUAL doesn't match EXPECTED:" + df_description
+
+        return result
+
+    def _df_description(self, relative_excel_path, sheet):
+        '''
+        Returns a string that identifies a worksheet in notes and artifacts, like "reports/summary[Sheet1].xlsx"
+        '''
+        relative_path_no_file_extension                         = relative_excel_path.replace(self.FILE_EXTENSION, "")
+        return relative_path_no_file_extension + "[" + sheet + "]" + self.FILE_EXTENSION
+
+    def _compare_digests(self, relative_excel_path, worksheets_info, actual_path, expected_path, digests=None):
+        '''
+        Returns a WorksheetComparisonResult for the whole Excel file if it has the same digest in ACTUALS as in
+        EXPECTED, in which case there is no need to load and compare its worksheets as DataFrames.
+        Returns None otherwise.
+
+        The digest ignores zip timestamps and the workbook's `docProps` metadata, so a workbook re-generated with
+        the same data counts as identical.
+
+        Even when the digests match, mandatory worksheets must still exist, so the result carries an error
+        if one of them is missing, just like the DataFrame comparison would.
+        '''
+        digester                                                = FileDigest()
+        if digests is not None:
+            if None in digests or digests[0] != digests[1]:
+                return None
+        elif not _os.path.isfile(actual_path) or not _os.path.isfile(expected_path):
+            return None
+        elif digester.digest(actual_path) != digester.digest(expected_path):
+            return None
+
+        sheet_names                                             = digester.worksheet_names(actual_path)
+        if sheet_names is None:
+            # Not a real xlsx, so we can't cheaply check the worksheets. Let the DataFrame comparison deal with it
+            return None
+
+        result                                                  = WorksheetComparisonResult(relative_excel_path, None)
+        for sheet_info in worksheets_info:
+            sheet                                               = sheet_info.worksheet_name
+            if not sheet in sheet_names and sheet_info.is_optional != True:
+                result.error_message                            = "Worksheet '" + sheet + "' missing in '" + relative_excel_path + "'"
+                return result
+
+        result.notes_l.append("\tIDENTICAL (digest match): " + relative_excel_path)
+        return result
+
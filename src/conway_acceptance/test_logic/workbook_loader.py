@@ -0,0 +1,60 @@
+import os                                                                       as _os
+import pandas                                                                   as _pd
+
+
+class WorkbookLoader():
+
+    def __init__(self, path):
+        '''
+        Helper class to load multiple worksheets of an Excel file into DataFrames, opening and parsing the
+        workbook only once.
+
+        Loading worksheets one at a time (e.g., with one DataAccessor per worksheet) unzips the workbook and parses its
+        shared strings and styles once for each worksheet, which dominates the cost of comparing multi-sheet reports.
+
+        @param path A string, the absolute path of the Excel file to load.
+        '''
+        self.path                                               = path
+
+    def load(self, worksheets_info, cache=None):
+        '''
+        Returns a dictionary whose keys are worksheet names and whose values are DataFrames with the content of the
+        corresponding worksheet.
+
+        There is a key for each worksheet in `worksheets_info`. If a worksheet does not exist in the Excel file, or
+        if the Excel file itself does not exist, then the value for that worksheet is None. It is up to the caller
+        to decide whether that is an error, based on the worksheet's `is_optional` flag.
+
+        @param worksheets_info An iterable of WorksheetComparisonInfo objects, designating the worksheets to load.
+
+        @param cache An optional ParsedFrameCache object. If given, worksheets found in it are not read from the
+                Excel file, and those that are read from the Excel file are added to it. The workbook is not 
+                opened at all if all the worksheets are found in the cache.
+        '''
+        requested_sheets                                        = [info.worksheet_name for info in worksheets_info]
+        result_dict                                             = {sheet: None for sheet in requested_sheets}
+
+        if not _os.path.isfile(self.path):
+            return result_dict
+
+        sheets_to_read                                          = requested_sheets
+        if cache is not None:
+            for sheet in requested_sheets:
+                result_dict[sheet]                              = cache.get(self.path, sheet)
+            sheets_to_read                                      = [sheet for sheet in requested_sheets if result_dict[sheet] is None]
+            if len(sheets_to_read) == 0:
+                return result_dict
+
+        with _pd.ExcelFile(self.path) as workbook:
+            existing_sheets                                     = [sheet for sheet in sheets_to_read
+                                                                        if sheet in workbook.sheet_names]
+            if len(existing_sheets) > 0:
+                # A single call for all the sheets, so the workbook is parsed once
+                loaded_dict                                     = _pd.read_excel(workbook, sheet_name=existing_sheets)
+                result_dict.update(loaded_dict)
+
+        if cache is not None:
+            for sheet in existing_sheets:
+                cache.put(self.path, sheet, result_dict[sheet])
+
+        return result_dict
@@ -0,0 +1,207 @@
+import argparse                                                                 as _argparse
+import json                                                                     as _json
+import os                                                                       as _os
+import stat                                                                     as _stat
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.directory_manifest                                  import DirectoryManifest
+from conway_acceptance.util.file_copier                                         import FileCopier
+from conway_acceptance.util.file_digest                                         import FileDigest
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class BlobStore():
+
+    BLOBS_FOLDER                                                = "blobs"
+    SNAPSHOTS_FOLDER                                            = "snapshots"
+    SNAPSHOT_EXTENSION                                          = ".json"
+
+    # Blobs are shared by all snapshots that contain the same file, so they must never be modified in place
+    BLOB_MODE                                                   = _stat.S_IRUSR | _stat.S_IRGRP | _stat.S_IROTH
+
+    def __init__(self, store_folder):
+        '''
+        Content-addressable store for snapshots of folder structures, such as the ACTUALS@T* snapshots of test
+        databases. Consecutive snapshots of a test database are usually nearly identical, so instead of keeping a
+        full copy of each, the store keeps:
+
+        * one read-only "blob" per distinct file content, named by the SHA-256 digest of that content, under
+          `store_folder/blobs`
+        * one JSON "snapshot manifest" per snapshot, under `store_folder/snapshots`, mapping the relative path of
+          each file in the snapshot to the digest of its blob.
+
+        A snapshot can be turned back into a real folder structure with `materialize`, which hard-links the blobs
+        where possible, so materializing takes almost no time or disk space.
+
+        Blobs that no snapshot refers to any more are only removed by `gc`, which should not be called while
+        snapshots are being stored.
+
+        @param store_folder A string, the absolute path of the folder for the store.
+        '''
+        self.store_folder                                       = store_folder
+        self.copier                                             = FileCopier(TestStatics.COPY_STRATEGY_CLONE)
+
+    def put_tree(self, snapshot_name, src_root):
+        '''
+        Stores the content of `src_root` as the snapshot `snapshot_name`, replacing any previous snapshot of that
+        name. Only files whose content is not in the store yet are copied.
+
+        Returns a tuple of ints (file_count, new_blob_count).
+
+        @param snapshot_name A string identifying the snapshot, like "1001/ACTUALS@T2". It may contain "/".
+
+        @param src_root A string, the absolute path of the folder structure to store.
+        '''
+        digester                                                = FileDigest()
+        files_dict                                              = {}
+        new_blob_count                                          = 0
+        for relative_path in DirectoryManifest.build(src_root).relative_paths():
+            src_path                                            = src_root + relative_path
+            digest                                              = digester.raw_digest(src_path)
+            if self._put_blob(digest, src_path):
+                new_blob_count                                  += 1
+            files_dict[relative_path]                           = digest
+
+        self._save_json(self._snapshot_path(snapshot_name), {"files": files_dict})
+        return len(files_dict), new_blob_count
+
+    def has_snapshot(self, snapshot_name):
+        '''
+        Returns True if there is a snapshot called `snapshot_name` in the store.
+        '''
+        return _os.path.isfile(self._snapshot_path(snapshot_name))
+
+    def materialize(self, snapshot_name, dst_root):
+        '''
+        Recreates the snapshot `snapshot_name` as a real folder structure under `dst_root`, replacing whatever was
+        there. Files are hard-links to the blobs where possible, so they are read-only.
+
+        Returns a list of strings, the relative paths of the files materialized.
+
+        @param snapshot_name A string identifying a snapshot previously stored with `put_tree`.
+
+        @param dst_root A string, the absolute path of the folder to create.
+        '''
+        with open(self._snapshot_path(snapshot_name), 'r', encoding="UTF8") as reader:
+            files_dict                                          = _json.load(reader)["files"]
+
+        self.copier.clear_tree(dst_root)
+        for relative_path, digest in sorted(files_dict.items()):
+            dst_path                                            = dst_root + relative_path
+            _os.makedirs(_os.path.dirname(dst_path), exist_ok=True)
+            self.copier.copy_file(self._blob_path(digest), dst_path, read_only=True)
+        return sorted(files_dict.keys())
+
+    def remove_snapshot(self, snapshot_name):
+        '''
+        Removes the snapshot `snapshot_name` from the store, if it exists. Its blobs are left in place until `gc`
+        is called.
+        '''
+        if self.has_snapshot(snapshot_name):
+            _os.remove(self._snapshot_path(snapshot_name))
+
+    def snapshot_names(self):
+        '''
+        Returns a sorted list of strings, the names of all the snapshots in the store.
+        '''
+        snapshots_folder                                        = self.store_folder + "/" + self.SNAPSHOTS_FOLDER
+        return [relative_path[1:-len(self.SNAPSHOT_EXTENSION)]
+                    for relative_path in DirectoryManifest.build(snapshots_folder).relative_paths()
+                    if relative_path.endswith(self.SNAPSHOT_EXTENSION)]
+
+    def gc(self):
+        '''
+        Removes the blobs that no snapshot refers to. Returns a tuple of ints (removed_count, freed_bytes).
+        '''
+        referenced_s                                            = set()
+        for snapshot_name in self.snapshot_names():
+            with open(self._snapshot_path(snapshot_name), 'r', encoding="UTF8") as reader:
+                referenced_s.update(_json.load(reader)["files"].values())
+
+        blobs_manifest                                          = DirectoryManifest.build(self.store_folder + "/" + self.BLOBS_FOLDER)
+        removed_count                                           = 0
+        freed_bytes                                             = 0
+        for relative_path, (size, mtime_ns) in blobs_manifest.files_dict.items():
+            if _os.path.basename(relative_path) in referenced_s:
+                continue
+            _os.remove(blobs_manifest.root_folder + relative_path)
+            removed_count                                       += 1
+            freed_bytes                                         += size
+        return removed_count, freed_bytes
+
+    def stats(self):
+        '''
+        Returns a dictionary with the number of snapshots and blobs in the store, and the total size of the blobs.
+        '''
+        blobs_manifest                                          = DirectoryManifest.build(self.store_folder + "/" + self.BLOBS_FOLDER)
+        return {"snapshots":    len(self.snapshot_names()),
+                "blobs":        len(blobs_manifest.files_dict),
+                "total_bytes":  sum([size for size, mtime_ns in blobs_manifest.files_dict.values()])}
+
+    def _put_blob(self, digest, src_path):
+        '''
+        Copies the file at `src_path` into the store as the blob for `digest`, unless that blob already exists.
+        Returns True if the blob was created.
+        '''
+        blob_path                                               = self._blob_path(digest)
+        if _os.path.exists(blob_path):
+            return False
+        _os.makedirs(_os.path.dirname(blob_path), exist_ok=True)
+        # Copy to a temporary file and rename it, so that a blob is never seen partially written
+        tmp_path                                                = blob_path + "." + _uuid.uuid4().hex + ".tmp"
+        self.copier.copy_file(src_path, tmp_path)
+        _os.chmod(tmp_path, self.BLOB_MODE)
+        _os.replace(tmp_path, blob_path)
+        return True
+
+    def _blob_path(self, digest):
+        # Fan out blobs into subfolders by the first 2 characters of the digest, to keep folders small
+        return self.store_folder + "/" + self.BLOBS_FOLDER + "/" + digest[:2] + "/" + digest
+
+    def _snapshot_path(self, snapshot_name):
+        return self.store_folder + "/" + self.SNAPSHOTS_FOLDER + "/" + snapshot_name + self.SNAPSHOT_EXTENSION
+
+    def _save_json(self, path, data_dict):
+        _os.makedirs(_os.path.dirname(path), exist_ok=True)
+        tmp_path                                                = path + "." + _uuid.uuid4().hex + ".tmp"
+        with open(tmp_path, 'w', encoding="UTF8") as writer:
+            _json.dump(data_dict, writer)
+        _os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    '''
+    Command line interface to inspect a BlobStore, garbage-collect it or materialize one of its snapshots for
+    debugging. For example:
+
+        python -m conway_acceptance.util.blob_store gc <scenarios_root_folder>/CACHE/snapshot_store
+
+        python -m conway_acceptance.util.blob_store materialize <scenarios_root_folder>/CACHE/snapshot_store \
+                --snapshot 1001/ACTUALS@T2 --destination /tmp/1001_T2
+    '''
+    parser                                                      = _argparse.ArgumentParser(
+                                                                        description = "Inspect, garbage-collect or materialize a store of test database snapshots")
+    parser.add_argument("command", choices=["stats", "list", "gc", "materialize"])
+    parser.add_argument("store_folder", help="Folder of the store")
+    parser.add_argument("--snapshot", help="Name of the snapshot to materialize, like 1001/ACTUALS@T2")
+    parser.add_argument("--destination", help="Folder in which to materialize the snapshot")
+    args                                                        = parser.parse_args(argv)
+
+    store                                                       = BlobStore(args.store_folder)
+    if args.command == "list":
+        for snapshot_name in store.snapshot_names():
+            print(snapshot_name)
+        return
+    if args.command == "gc":
+        removed_count, freed_bytes                              = store.gc()
+        print(_json.dumps({"removed_blobs": removed_count, "freed_bytes": freed_bytes}))
+        return
+    if args.command == "materialize":
+        if args.snapshot is None or args.destination is None:
+            parser.error("materialize requires --snapshot and --destination")
+        store.materialize(args.snapshot, args.destination)
+        return
+    print(_json.dumps(store.stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import hashlib                                                                  as _hashlib
+import json                                                                     as _json
+import os                                                                       as _os
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.file_digest                                         import FileDigest
+
+
+class DirectoryManifest():
+
+    def __init__(self, root_folder, files_dict, folders_dict):
+        '''
+        Data structure class listing all the files under a folder structure, with their size and modification time.
+
+        File paths are relative to `root_folder`, Unix-style and start with "/", like "/reports/summary.xlsx".
+
+        Instances are normally created with DirectoryManifest.build, which walks the folder structure with
+        os.scandir, or DirectoryManifest.load_or_build, which reuses a manifest previously saved to disk if the folder
+        structure has not changed since.
+
+        @param root_folder A string, the absolute path of the folder described by this manifest.
+
+        @param files_dict A dictionary whose keys are relative file paths and whose values are tuples
+                (size, mtime_ns) of the corresponding file.
+
+        @param folders_dict A dictionary whose keys are relative folder paths ("" for `root_folder` itself) and whose
+                values are the folders' modification times, in nanoseconds. It is used to detect whether a saved
+                manifest is still valid, since adding, removing or renaming a file changes its folder's mtime.
+        '''
+        self.root_folder                                        = root_folder
+        self.files_dict                                         = files_dict
+        self.folders_dict                                       = folders_dict
+
+    @staticmethod
+    def build(root_folder):
+        '''
+        Returns a DirectoryManifest for `root_folder`, built by walking it with os.scandir. If `root_folder` does not
+        exist, the manifest is empty.
+
+        @param root_folder A string, the absolute path of the folder to describe.
+        '''
+        files_dict                                              = {}
+        folders_dict                                            = {}
+        if not _os.path.isdir(root_folder):
+            return DirectoryManifest(root_folder, files_dict, folders_dict)
+
+        pending_l                                               = [("", root_folder)]
+        while len(pending_l) > 0:
+            relative_folder, folder                             = pending_l.pop()
+            folders_dict[relative_folder]                       = _os.stat(folder).st_mtime_ns
+            with _os.scandir(folder) as scanner:
+                for entry in scanner:
+                    relative_path                               = relative_folder + "/" + entry.name
+                    # GOTCHA: like os.walk, don't descend into symbolic links to folders, which could be cycles.
+                    # Symbolic links to files are listed, like os.walk does
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_l.append((relative_path, entry.path))
+                    elif entry.is_file():
+                        stat                                    = entry.stat()
+                        files_dict[relative_path]               = (stat.st_size, stat.st_mtime_ns)
+
+        return DirectoryManifest(root_folder, files_dict, folders_dict)
+
+    @staticmethod
+    def load_or_build(root_folder, manifests_folder):
+        '''
+        Returns a DirectoryManifest for `root_folder`. If a manifest for it was previously saved under
+        `manifests_folder` and none of the folders under `root_folder` has changed since, that manifest is returned
+        without walking `root_folder`. Otherwise a new manifest is built and saved under `manifests_folder`.
+
+        This is intended for folder structures that rarely change, like the EXPECTED@... test databases.
+
+        @param root_folder A string, the absolute path of the folder to describe.
+
+        @param manifests_folder A string, the absolute path of the folder where manifests are saved.
+        '''
+        manifest_path                                           = manifests_folder + "/" \
+                                                                    + _hashlib.sha256(_os.path.abspath(root_folder).encode("UTF8")).hexdigest() \
+                                                                    + ".json"
+        manifest                                                = DirectoryManifest.load(manifest_path)
+        if manifest is not None and manifest.root_folder == root_folder and manifest.is_current():
+            return manifest
+
+        manifest                                                = DirectoryManifest.build(root_folder)
+        try:
+            manifest.save(manifest_path)
+        except OSError:
+            # Saving is just an optimization for the next run
+            pass
+        return manifest
+
+    @staticmethod
+    def load(manifest_path):
+        '''
+        Returns the DirectoryManifest saved at `manifest_path`, or None if there is none or it can't be read.
+
+        @param manifest_path A string, the absolute path of a file previously created by DirectoryManifest.save.
+        '''
+        try:
+            with open(manifest_path, 'r', encoding="UTF8") as reader:
+                data_dict                                       = _json.load(reader)
+        except (OSError, ValueError):
+            return None
+        files_dict                                              = {path: tuple(stats) for path, stats in data_dict["files"].items()}
+        return DirectoryManifest(data_dict["root_folder"], files_dict, data_dict["folders"])
+
+    def save(self, manifest_path):
+        '''
+        Saves this manifest as a JSON file at `manifest_path`.
+
+        @param manifest_path A string, the absolute path of the file to create.
+        '''
+        _os.makedirs(_os.path.dirname(manifest_path), exist_ok=True)
+        data_dict                                               = {"root_folder":   self.root_folder,
+                                                                   "folders":       self.folders_dict,
+                                                                   "files":         self.files_dict}
+        # Write to a temporary file and rename it, so that concurrent readers never see a partial manifest
+        tmp_path                                                = manifest_path + "." + _uuid.uuid4().hex + ".tmp"
+        with open(tmp_path, 'w', encoding="UTF8") as writer:
+            _json.dump(data_dict, writer)
+        _os.replace(tmp_path, manifest_path)
+
+    def is_current(self):
+        '''
+        Returns True if none of the folders in this manifest has been modified since it was built. In that case
+        the list of files in this manifest is still accurate.
+
+        The sizes and mtimes of the files may be stale if a file was overwritten in place, since that does not
+        change the mtime of its folder.
+        '''
+        if len(self.folders_dict) == 0:
+            return False
+        for relative_folder, mtime_ns in self.folders_dict.items():
+            try:
+                if _os.stat(self.root_folder + relative_folder).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def relative_paths(self):
+        '''
+        Returns a sorted list of strings, the relative paths of all the files in this manifest.
+        '''
+        return sorted(self.files_dict.keys())
+
+    def delta(self, target_manifest, digests_dict=None):
+        '''
+        Compares the files in this manifest against those at the same relative paths in `target_manifest`, as a
+        first step to make the latter a superset of the former by copying only what is needed.
+
+        Returns a tuple (new_l, changed_l, unchanged_count), where `new_l` is a sorted list of the relative paths of
+        files that don't exist in `target_manifest`, and `changed_l` those of files whose content differs.
+
+        Files are deemed unchanged if they have the same size and modification time, and changed if their sizes
+        differ. If the sizes match but the modification times don't, both files are hashed to tell.
+
+        @param target_manifest A DirectoryManifest object, for the folder structure to compare against.
+
+        @param digests_dict An optional dictionary whose keys are relative paths of files in this manifest and whose
+                values are their raw digests (see FileDigest.raw_digest), computed ahead of time so that those files
+                don't need to be hashed again.
+        '''
+        digester                                                = FileDigest()
+        digests_dict                                            = digests_dict or {}
+        new_l                                                   = []
+        changed_l                                               = []
+        unchanged_count                                         = 0
+        for relative_path, (size, mtime_ns) in self.files_dict.items():
+            target_stats                                        = target_manifest.files_dict.get(relative_path)
+            if target_stats is None:
+                new_l.append(relative_path)
+            elif target_stats[0] != size:
+                changed_l.append(relative_path)
+            elif target_stats[1] == mtime_ns \
+                    or (digests_dict.get(relative_path) or digester.raw_digest(self.root_folder + relative_path)) \
+                        == digester.raw_digest(target_manifest.root_folder + relative_path):
+                unchanged_count                                 += 1
+            else:
+                changed_l.append(relative_path)
+        return sorted(new_l), sorted(changed_l), unchanged_count
@@ -0,0 +1,251 @@
+import errno                                                                    as _errno
+import functools                                                                as _functools
+import os                                                                       as _os
+import shutil                                                                   as _shutil
+import stat                                                                     as _stat
+import sys                                                                      as _sys
+
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+# The `fcntl` module only exists on Unix. Elsewhere, files are never cloned, just copied.
+try:
+    import fcntl                                                                as _fcntl
+except ImportError:
+    _fcntl                                                      = None
+
+
+class FileCopier():
+
+    # Linux ioctl request to make a file share the data blocks of another one (a "reflink"), on filesystems
+    # that support it, like btrfs, XFS or APFS-like copy-on-write filesystems. It is _IOW(0x94, 9, int)
+    FICLONE                                                     = 0x40049409
+
+    # Errors meaning "this filesystem (or pair of filesystems) can't do that", as opposed to real I/O errors
+    UNSUPPORTED_ERRNOS                                          = [_errno.EXDEV, _errno.EINVAL, _errno.ENOTTY, _errno.EPERM,
+                                                                   _errno.ENOSYS, getattr(_errno, "EOPNOTSUPP", _errno.EINVAL),
+                                                                   getattr(_errno, "ENOTSUP", _errno.EINVAL)]
+
+    # Pairs of devices (as in os.stat().st_dev) of the source file and of the destination's folder, between which a
+    # reflink or an in-kernel copy failed, so we don't keep trying. GOTCHA: keyed by pair rather than by the source's
+    # device, since e.g. an EXDEV from copying to a tmpfs says nothing about copying within the source's filesystem
+    _NO_REFLINK_DEVICE_PAIRS                                    = set()
+    _NO_COPY_FILE_RANGE_DEVICE_PAIRS                            = set()
+
+    def __init__(self, strategy=TestStatics.COPY_STRATEGY_CLONE):
+        '''
+        Copies files and folder structures for the test harness, e.g., to seed a TestDatabase or to snapshot it.
+
+        @param strategy A string, determining how files are copied. It must be one of:
+
+            * TestStatics.COPY_STRATEGY_PLAIN: files are copied byte by byte.
+            * TestStatics.COPY_STRATEGY_CLONE: files flagged as read-only are hard-linked, so they take no time and
+              no additional disk space. Other files are reflinked if the filesystem supports it (so they share data
+              blocks until modified), else copied in-kernel with os.copy_file_range, else copied byte by byte.
+
+            Either way, the copy has the same modification time as the original.
+        '''
+        if not strategy in [TestStatics.COPY_STRATEGY_PLAIN, TestStatics.COPY_STRATEGY_CLONE]:
+            raise ValueError("Invalid copy strategy '" + str(strategy) + "': should be one of '"
+                             + TestStatics.COPY_STRATEGY_PLAIN + "' or '" + TestStatics.COPY_STRATEGY_CLONE + "'")
+        self.strategy                                           = strategy
+
+    def copy_file(self, src, dst, read_only=False):
+        '''
+        Copies the file at `src` to `dst`, replacing `dst` if it already exists. The parent folder of `dst`
+        must exist.
+
+        @param src A string, the absolute path of the file to copy.
+
+        @param dst A string, the absolute path of the copy.
+
+        @param read_only A boolean. If True, the caller guarantees that neither `src` nor `dst` will ever be
+                modified in place, so they may be hard-links to the same file.
+        '''
+        # GOTCHA: always remove `dst` first. If it is a hard-link to a read-only file (e.g., from a previous seeding),
+        # writing into it would modify the original too.
+        if _os.path.lexists(dst):
+            FileCopier._retry_as_writable(_os.remove, dst)
+
+        if self.strategy == TestStatics.COPY_STRATEGY_CLONE:
+            if read_only and self._try_hardlink(src, dst):
+                return
+            if self._try_reflink(src, dst) or self._try_copy_file_range(src, dst):
+                _shutil.copystat(src, dst)
+                return
+
+        _shutil.copy2(src, dst)
+
+    def copy_tree(self, src_root, dst_root, read_only=False):
+        '''
+        Copies all the files under `src_root` to the same relative paths under `dst_root`, creating folders as
+        needed. Files under `dst_root` that don't exist under `src_root` are left as they are. Like
+        DirectoryManifest.build, it doesn't descend into symbolic links to folders, which are skipped, while symbolic
+        links to files are copied as files.
+
+        Returns a list of strings, the relative paths of the files copied.
+
+        @param src_root A string, the absolute path of the folder to copy.
+
+        @param dst_root A string, the absolute path of the folder to copy into.
+
+        @param read_only A boolean. If True, the caller guarantees that the files being copied will never be
+                modified in place, neither under `src_root` nor under `dst_root`.
+        '''
+        copied_l                                                = []
+        for relative_folder, file_names_l in self._walk(src_root):
+            _os.makedirs(dst_root + relative_folder, exist_ok=True)
+            for name in file_names_l:
+                relative_path                                   = relative_folder + "/" + name
+                self.copy_file(src_root + relative_path, dst_root + relative_path, read_only=read_only)
+                copied_l.append(relative_path)
+        return copied_l
+
+    def subtree_tasks(self, src_root, dst_root, read_only=False):
+        '''
+        Returns a list of callables that, between them, do the same as `self.copy_tree(src_root, dst_root, read_only)`,
+        so that a large folder structure can be copied concurrently. There is a callable for each subfolder of
+        `src_root`, and one more for the files directly under `src_root`, if any. They may be called in any order and
+        from any thread.
+
+        `dst_root` is created, if needed, before this method returns.
+        '''
+        _os.makedirs(dst_root, exist_ok=True)
+        tasks_l                                                 = []
+        file_names_l                                            = []
+        with _os.scandir(src_root) as scanner:
+            for entry in scanner:
+                # GOTCHA: don't follow symbolic links to folders, as in `_walk`
+                if entry.is_dir(follow_symlinks=False):
+                    tasks_l.append(_functools.partial(self.copy_tree, src_root + "/" + entry.name, dst_root + "/" + entry.name,
+                                                      read_only=read_only))
+                elif entry.is_file():
+                    file_names_l.append(entry.name)
+        if len(file_names_l) > 0:
+            tasks_l.append(_functools.partial(self._copy_files, src_root, dst_root, file_names_l, read_only))
+        return tasks_l
+
+    def clear_tree(self, root):
+        '''
+        Removes the folder `root` with all its content, if it exists, and re-creates it empty.
+        '''
+        FileCopier.remove_tree(root)
+        _os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def remove_tree(root):
+        '''
+        Removes the folder `root` with all its content, if it exists, like shutil.rmtree, except that files that
+        can't be removed because they are read-only are made writable and removed. That happens on Windows with
+        hard-links to read-only files, such as the blobs of snapshots materialized by a BlobStore.
+        '''
+        if not _os.path.isdir(root):
+            return
+        def _on_error(func, path, exc_info):
+            FileCopier._retry_as_writable(func, path)
+        # GOTCHA: Python 3.12 deprecated `onerror` in favour of `onexc`, whose handlers get the exception instead of
+        # the exc_info tuple
+        if _sys.version_info >= (3, 12):
+            _shutil.rmtree(root, onexc=_on_error)
+        else:
+            _shutil.rmtree(root, onerror=_on_error)
+
+    @staticmethod
+    def _retry_as_writable(func, path):
+        '''
+        Calls `func(path)`, where `func` removes a file or folder, and if that fails with a PermissionError, makes
+        `path` writable and calls it again.
+
+        GOTCHA: for a hard-link, making it writable makes all the links to the same file writable, including a
+        BlobStore's blob. Blobs are only read-only as a precaution, so that is the lesser evil.
+        '''
+        try:
+            func(path)
+        except PermissionError:
+            _os.chmod(path, _stat.S_IWRITE | _stat.S_IREAD)
+            func(path)
+
+    def replace_tree(self, src_root, dst_root, read_only=False):
+        '''
+        Makes `dst_root` a copy of `src_root`: it removes `dst_root`, if it exists, and then copies `src_root` into it.
+
+        Returns a list of strings, the relative paths of the files copied.
+        '''
+        self.clear_tree(dst_root)
+        return self.copy_tree(src_root, dst_root, read_only=read_only)
+
+    def _copy_files(self, src_root, dst_root, file_names_l, read_only):
+        for name in file_names_l:
+            self.copy_file(src_root + "/" + name, dst_root + "/" + name, read_only=read_only)
+
+    def _walk(self, root):
+        '''
+        Generator of tuples (relative_folder, file_names_l) for each folder under `root`, where `relative_folder`
+        is "" for `root` itself and like "/sub/folder" for others.
+        '''
+        pending_l                                               = [""]
+        while len(pending_l) > 0:
+            relative_folder                                     = pending_l.pop()
+            file_names_l                                        = []
+            with _os.scandir(root + relative_folder) as scanner:
+                for entry in scanner:
+                    # GOTCHA: like DirectoryManifest.build, don't descend into symbolic links to folders, which could be
+                    # cycles or point outside `root`, so they would be copied as real data
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_l.append(relative_folder + "/" + entry.name)
+                    elif entry.is_file():
+                        file_names_l.append(entry.name)
+            yield relative_folder, file_names_l
+
+    def _try_hardlink(self, src, dst):
+        try:
+            _os.link(src, dst)
+            return True
+        except OSError as ex:
+            if ex.errno in self.UNSUPPORTED_ERRNOS or ex.errno == _errno.EMLINK:
+                return False
+            raise
+
+    def _try_reflink(self, src, dst):
+        if _fcntl is None:
+            return False
+        devices                                                 = self._devices(src, dst)
+        if devices in FileCopier._NO_REFLINK_DEVICE_PAIRS:
+            return False
+        with open(src, 'rb') as reader, open(dst, 'wb') as writer:
+            try:
+                _fcntl.ioctl(writer.fileno(), self.FICLONE, reader.fileno())
+                return True
+            except OSError as ex:
+                if not ex.errno in self.UNSUPPORTED_ERRNOS:
+                    raise
+        FileCopier._NO_REFLINK_DEVICE_PAIRS.add(devices)
+        return False
+
+    def _try_copy_file_range(self, src, dst):
+        if not hasattr(_os, "copy_file_range"):
+            return False
+        devices                                                 = self._devices(src, dst)
+        if devices in FileCopier._NO_COPY_FILE_RANGE_DEVICE_PAIRS:
+            return False
+        with open(src, 'rb') as reader, open(dst, 'wb') as writer:
+            remaining                                           = _os.fstat(reader.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied                                      = _os.copy_file_range(reader.fileno(), writer.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining                                   -= copied
+                if remaining == 0:
+                    return True
+            except OSError as ex:
+                if not ex.errno in self.UNSUPPORTED_ERRNOS:
+                    raise
+        FileCopier._NO_COPY_FILE_RANGE_DEVICE_PAIRS.add(devices)
+        return False
+
+    def _devices(self, src, dst):
+        '''
+        Returns a tuple (src_device, dst_device) with the devices of the file `src` and of the folder of `dst`, which
+        must exist.
+        '''
+        return (_os.stat(src).st_dev, _os.stat(_os.path.dirname(dst) or ".").st_dev)
@@ -0,0 +1,95 @@
+import hashlib                                                                  as _hashlib
+import zipfile                                                                  as _zipfile
+import xml.etree.ElementTree                                                    as _ElementTree
+
+
+class FileDigest():
+
+    # Extension of the Excel files for which we compute a content-aware digest, as opposed to a digest of the raw bytes
+    XLSX_EXTENSION                                              = ".xlsx"
+
+    # Members of an xlsx zip archive that carry metadata (author, creation/modification timestamps, application
+    # version, ...) rather than data. Two workbooks with the same data but saved at different times differ in
+    # these members, so they are left out of the digest.
+    IGNORED_XLSX_MEMBER_PREFIXES                                = ["docProps/"]
+
+    WORKBOOK_MEMBER                                             = "xl/workbook.xml"
+
+    READ_CHUNK_SIZE                                             = 1024 * 1024
+
+    def __init__(self):
+        '''
+        Helper class to compute digests of files in a test database, so that callers can cheaply determine if
+        two files have the same content without having to parse them.
+
+        For Excel files the digest is "xlsx-aware": an xlsx file is a zip archive, and the digest is computed on the
+        uncompressed content of its members, ignoring the zip timestamps and the `docProps` metadata members. That way
+        two workbooks with exactly the same data have the same digest even if they were saved at different times.
+
+        For any other file, or for an xlsx file that is not a valid zip archive, the digest is that of its raw bytes.
+        '''
+
+    def digest(self, path):
+        '''
+        Returns a string, the hexadecimal SHA-256 digest of the file at `path`.
+
+        @param path A string, the absolute path of the file to digest.
+        '''
+        if path.lower().endswith(self.XLSX_EXTENSION):
+            try:
+                return self._xlsx_digest(path)
+            except _zipfile.BadZipFile:
+                # Not a real xlsx file, so fall back to the bytes
+                pass
+        return self.raw_digest(path)
+
+    def raw_digest(self, path):
+        '''
+        Returns a string, the hexadecimal SHA-256 digest of the raw bytes of the file at `path`.
+
+        @param path A string, the absolute path of the file to digest.
+        '''
+        hasher                                                  = _hashlib.sha256()
+        with open(path, 'rb') as reader:
+            for chunk in iter(lambda: reader.read(self.READ_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def worksheet_names(self, path):
+        '''
+        Returns a list of strings, the names of the worksheets in the Excel file at `path`, in the order
+        in which they appear in the workbook. This only reads the workbook's XML catalog, and is therefore much cheaper
+        than loading the workbook.
+
+        Returns None if `path` is not a valid xlsx file.
+
+        @param path A string, the absolute path of an xlsx file.
+        '''
+        try:
+            with _zipfile.ZipFile(path) as archive:
+                workbook_xml                                    = archive.read(self.WORKBOOK_MEMBER)
+        except (_zipfile.BadZipFile, KeyError):
+            return None
+
+        root                                                    = _ElementTree.fromstring(workbook_xml)
+        # GOTCHA: tags are namespace-qualified, like "{http://schemas.openxmlformats.org/...}sheet"
+        names                                                   = [elt.get("name") for elt in root.iter()
+                                                                        if elt.tag.endswith("}sheet") or elt.tag == "sheet"]
+        return names
+
+    def _xlsx_digest(self, path):
+        '''
+        Returns a string, the hexadecimal SHA-256 digest of the uncompressed members of the xlsx file at `path`,
+        excluding metadata members. Raises a zipfile.BadZipFile if `path` is not a zip archive.
+        '''
+        hasher                                                  = _hashlib.sha256()
+        with _zipfile.ZipFile(path) as archive:
+            # Sort by name so that the digest does not depend on the order in which the writer added the members
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                if any(info.filename.startswith(prefix) for prefix in self.IGNORED_XLSX_MEMBER_PREFIXES):
+                    continue
+                hasher.update(info.filename.encode("UTF8") + b"\0" + str(info.file_size).encode("UTF8") + b"\0")
+                with archive.open(info) as member:
+                    for chunk in iter(lambda: member.read(self.READ_CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+        return hasher.hexdigest()
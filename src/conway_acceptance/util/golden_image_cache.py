@@ -0,0 +1,150 @@
+import hashlib                                                                  as _hashlib
+import json                                                                     as _json
+import os                                                                       as _os
+import shutil                                                                   as _shutil
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.directory_manifest                                  import DirectoryManifest
+from conway_acceptance.util.file_copier                                         import FileCopier
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class GoldenImageCache():
+
+    # Extension of the DirectoryManifest saved next to each image, listing the image's files
+    MANIFEST_EXTENSION                                          = ".json"
+
+    def __init__(self, images_folder, strategy=TestStatics.COPY_STRATEGY_CLONE):
+        '''
+        Caches "golden images" of a test database, i.e., copies of what ACTUALS@latest looks like right after being
+        populated from SEED@T0, so that later runs can restore ACTUALS@latest from the image instead of populating
+        it from scratch.
+
+        Each image is identified by a fingerprint of whatever it was built from (see GoldenImageCache.fingerprint),
+        so an image is never used once its seed changes. Only the latest image is kept in `images_folder`.
+
+        Restoring is done as a delta against whatever a previous run left in ACTUALS@latest: files that are
+        unchanged (same size and modification time as in the image) are kept, and only the other ones are copied,
+        so restoring after a test that modified a few files takes about as long as copying those few files.
+
+        @param images_folder A string, the absolute path of the folder where images are kept, normally
+                a subfolder of the cache folder for a single scenario.
+
+        @param strategy A string, the FileCopier strategy used to copy files in and out of images. It must be
+                one of TestStatics.COPY_STRATEGY_PLAIN or TestStatics.COPY_STRATEGY_CLONE.
+        '''
+        self.images_folder                                      = images_folder
+        self.copier                                             = FileCopier(strategy)
+
+    @staticmethod
+    def fingerprint(seed_folder, salt_l=None):
+        '''
+        Returns a string, a fingerprint of the files under `seed_folder` based on their relative paths, sizes and
+        modification times, so it changes whenever the seed is regenerated or edited.
+
+        @param seed_folder A string, the absolute path of a SEED@T* folder.
+
+        @param salt_l An optional list of strings that also determine what an image built from `seed_folder` would
+                contain, such as the class of the TestDatabase and its copy strategy.
+        '''
+        manifest                                                = DirectoryManifest.build(seed_folder)
+        data                                                    = [list(salt_l or []),
+                                                                   sorted([[path] + list(stats)
+                                                                           for path, stats in manifest.files_dict.items()])]
+        return _hashlib.sha256(_json.dumps(data).encode("UTF8")).hexdigest()
+
+    def restore(self, fingerprint, target_folder, read_only_folders_l=None):
+        '''
+        Makes `target_folder` identical to the image for `fingerprint`, by removing the files that are not in the
+        image and copying those that are missing or differ from it.
+
+        Returns None if there is no image for `fingerprint`, in which case `target_folder` is left untouched.
+        Otherwise returns a tuple of ints (copied_count, removed_count, kept_count).
+
+        @param fingerprint A string, as returned by GoldenImageCache.fingerprint.
+
+        @param target_folder A string, the absolute path of the folder to restore, such as ACTUALS@latest.
+
+        @param read_only_folders_l An optional list of strings, names of top-level folders of the image whose files
+                are never modified in place by the business logic, so they may be restored as hard-links. If None,
+                every file is copied (or reflinked), so nothing done to `target_folder` can corrupt the image.
+        '''
+        read_only_folders_l                                     = read_only_folders_l or []
+        image_folder                                            = self._image_folder(fingerprint)
+        image_manifest                                          = DirectoryManifest.load(image_folder + self.MANIFEST_EXTENSION)
+        if image_manifest is None or not _os.path.isdir(image_folder):
+            return None
+
+        target_manifest                                         = DirectoryManifest.build(target_folder)
+
+        removed_count                                           = 0
+        for relative_path in target_manifest.files_dict.keys():
+            if not relative_path in image_manifest.files_dict.keys():
+                _os.remove(target_folder + relative_path)
+                removed_count                                   += 1
+        # Deepest folders first, so that parents are removed after their children
+        for relative_folder in sorted(target_manifest.folders_dict.keys(), key=len, reverse=True):
+            if not relative_folder in image_manifest.folders_dict.keys():
+                _shutil.rmtree(target_folder + relative_folder, ignore_errors=True)
+        for relative_folder in image_manifest.folders_dict.keys():
+            _os.makedirs(target_folder + relative_folder, exist_ok=True)
+
+        copied_count                                            = 0
+        kept_count                                              = 0
+        for relative_path, stats in image_manifest.files_dict.items():
+            if target_manifest.files_dict.get(relative_path) == stats:
+                kept_count                                      += 1
+                continue
+            self.copier.copy_file(image_folder + relative_path, target_folder + relative_path,
+                                  read_only = self._is_read_only(relative_path, read_only_folders_l))
+            copied_count                                        += 1
+
+        return copied_count, removed_count, kept_count
+
+    def capture(self, fingerprint, source_folder, read_only_folders_l=None):
+        '''
+        Creates the image for `fingerprint` as a copy of `source_folder`, replacing any images previously kept
+        in `self.images_folder`.
+
+        @param fingerprint A string, as returned by GoldenImageCache.fingerprint.
+
+        @param source_folder A string, the absolute path of the folder to copy, such as ACTUALS@latest right after
+                it was populated from SEED@T0.
+
+        @param read_only_folders_l An optional list of strings, names of top-level folders of `source_folder` whose
+                files are never modified in place, so they may be hard-linked into the image. If None, every file is
+                copied (or reflinked).
+        '''
+        read_only_folders_l                                     = read_only_folders_l or []
+        self.clear()
+        _os.makedirs(self.images_folder, exist_ok=True)
+
+        image_folder                                            = self._image_folder(fingerprint)
+        # Copy to a temporary folder and rename it, so that an interrupted capture never leaves a partial image
+        tmp_folder                                              = image_folder + "." + _uuid.uuid4().hex + ".tmp"
+        _os.makedirs(tmp_folder)
+        with _os.scandir(source_folder) as scanner:
+            for entry in scanner:
+                if entry.is_dir():
+                    self.copier.copy_tree(entry.path, tmp_folder + "/" + entry.name,
+                                          read_only = entry.name in read_only_folders_l)
+                else:
+                    self.copier.copy_file(entry.path, tmp_folder + "/" + entry.name)
+        _os.replace(tmp_folder, image_folder)
+
+        # Saved last, since an image without a manifest is never restored
+        DirectoryManifest.build(image_folder).save(image_folder + self.MANIFEST_EXTENSION)
+
+    def clear(self):
+        '''
+        Removes all images in `self.images_folder`.
+        '''
+        if _os.path.isdir(self.images_folder):
+            _shutil.rmtree(self.images_folder)
+
+    def _image_folder(self, fingerprint):
+        return self.images_folder + "/" + fingerprint
+
+    def _is_read_only(self, relative_path, read_only_folders_l):
+        top_folder                                              = relative_path.split("/")[1]
+        return top_folder in read_only_folders_l and relative_path.count("/") > 1
@@ -0,0 +1,257 @@
+import argparse                                                                 as _argparse
+import hashlib                                                                  as _hashlib
+import importlib.util                                                           as _importlib_util
+import json                                                                     as _json
+import os                                                                       as _os
+import pickle                                                                   as _pickle
+import threading                                                                as _threading
+import time                                                                     as _time
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.file_digest                                         import FileDigest
+
+
+class ParsedFrameCache():
+
+    # Default bound on the disk space used by the cache. Least recently used entries are evicted beyond it.
+    DEFAULT_MAX_BYTES                                           = 2 * 1024 * 1024 * 1024
+
+    # Entries are stored in Parquet (a columnar binary format) when pyarrow is available and the DataFrame
+    # round-trips through it unchanged. Otherwise they are pickled.
+    PARQUET_EXTENSION                                           = ".parquet"
+    PICKLE_EXTENSION                                            = ".pkl"
+
+    # Eviction lists the whole cache folder, so it is done on the first `put` of each object and then once every
+    # this many `put` calls, rather than on every one
+    EVICTION_INTERVAL                                           = 32
+
+    # Excel files modified less than this many seconds ago are also keyed on a digest of their content, since a
+    # file rewritten within the resolution of the file system's timestamps might keep its size and modification time
+    RACY_SECONDS                                                = 2
+
+    # The objects returned by ParsedFrameCache.shared, keyed by (cache_folder, max_bytes)
+    _SHARED_DICT                                                = {}
+    _SHARED_LOCK                                                = _threading.Lock()
+
+    def __init__(self, cache_folder, max_bytes=DEFAULT_MAX_BYTES):
+        '''
+        On-disk cache of DataFrames parsed from Excel worksheets, intended for Excel files that rarely change,
+        such as those in EXPECTED@latest and EXPECTED@T{n}, which only change when a scenario is re-baselined.
+
+        Each entry is keyed by the Excel file's absolute path, the worksheet name, and the file's size and modification
+        time, so looking up an entry doesn't read the Excel file. If the Excel file changes, the key changes and the
+        old entry is just never used again, until it is evicted. Files modified very recently (see RACY_SECONDS) are
+        also keyed on a digest of their content, since their modification time alone can't be trusted yet.
+
+        Eviction is least-recently-used, bounded by `max_bytes`. Recency is tracked with the modification time of
+        each entry's file, so there is no shared index and multiple processes may use the same cache concurrently.
+
+        @param cache_folder A string, the absolute path of the folder where cached entries are stored. It is
+                created if it does not exist.
+
+        @param max_bytes An int, the maximum number of bytes the cache may use on disk.
+        '''
+        self.cache_folder                                       = cache_folder
+        self.max_bytes                                          = max_bytes
+
+        # Memoized digests of the recently modified Excel files seen by this object, so that such a workbook is
+        # hashed only once even if several of its worksheets are requested
+        self._file_keys_dict                                    = {}
+        self._puts_before_eviction                              = 0
+
+    @staticmethod
+    def shared(cache_folder, max_bytes=DEFAULT_MAX_BYTES):
+        '''
+        Returns the ParsedFrameCache for `cache_folder` and `max_bytes` shared by all callers in this process, creating
+        it the first time, so that comparisons don't each build their own and repeat its eviction scans and digests.
+        '''
+        key                                                     = (cache_folder, max_bytes)
+        with ParsedFrameCache._SHARED_LOCK:
+            if not key in ParsedFrameCache._SHARED_DICT.keys():
+                ParsedFrameCache._SHARED_DICT[key]              = ParsedFrameCache(cache_folder, max_bytes=max_bytes)
+            return ParsedFrameCache._SHARED_DICT[key]
+
+    def get(self, excel_path, worksheet_name):
+        '''
+        Returns the cached DataFrame for worksheet `worksheet_name` of the Excel file at `excel_path`, or None
+        if there is no such entry in the cache.
+
+        @param excel_path A string, the absolute path of an Excel file.
+
+        @param worksheet_name A string, the name of a worksheet in the Excel file.
+        '''
+        entry_path                                              = self._find_entry(excel_path, worksheet_name)
+        if entry_path is None:
+            return None
+        try:
+            if entry_path.endswith(self.PARQUET_EXTENSION):
+                # Imported here, so that importing this module doesn't load pandas
+                import pandas                                   as _pd
+                df                                              = _pd.read_parquet(entry_path)
+            else:
+                with open(entry_path, 'rb') as reader:
+                    df                                          = _pickle.load(reader)
+        except Exception:
+            # A corrupt or concurrently evicted entry is just a cache miss
+            return None
+
+        # Mark the entry as recently used, for the LRU eviction policy
+        try:
+            _os.utime(entry_path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, excel_path, worksheet_name, df):
+        '''
+        Saves `df` in the cache as the parsed content of worksheet `worksheet_name` of the Excel file at
+        `excel_path`. Every EVICTION_INTERVAL calls, starting with the first, it then evicts least recently used
+        entries if the cache exceeds its size bound, so the bound may be exceeded by that many entries in between.
+
+        @param excel_path A string, the absolute path of an Excel file.
+
+        @param worksheet_name A string, the name of a worksheet in the Excel file.
+
+        @param df A DataFrame, the content of the worksheet.
+        '''
+        _os.makedirs(self.cache_folder, exist_ok=True)
+        entry_stem                                              = self.cache_folder + "/" + self._entry_key(excel_path, worksheet_name)
+
+        # Write to a temporary file and rename it, so that concurrent readers never see a partial entry
+        tmp_path                                                = entry_stem + "." + _uuid.uuid4().hex + ".tmp"
+        if self._roundtrips_through_parquet(df, tmp_path):
+            entry_path                                          = entry_stem + self.PARQUET_EXTENSION
+        else:
+            entry_path                                          = entry_stem + self.PICKLE_EXTENSION
+            with open(tmp_path, 'wb') as writer:
+                _pickle.dump(df, writer, protocol=_pickle.HIGHEST_PROTOCOL)
+        _os.replace(tmp_path, entry_path)
+
+        if self._puts_before_eviction <= 0:
+            self.evict()
+            self._puts_before_eviction                          = self.EVICTION_INTERVAL
+        self._puts_before_eviction                              -= 1
+
+    def evict(self):
+        '''
+        Deletes least recently used entries until the cache uses at most `self.max_bytes` bytes on disk.
+        '''
+        entries_l                                               = self._list_entries()
+        total_bytes                                             = sum([size for (path, size, mtime) in entries_l])
+        for path, size, mtime in sorted(entries_l, key=lambda entry: entry[2]):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                _os.remove(path)
+            except OSError:
+                # Someone else evicted it first
+                pass
+            total_bytes                                         -= size
+
+    def clear(self):
+        '''
+        Deletes all entries in the cache.
+        '''
+        for path, size, mtime in self._list_entries():
+            try:
+                _os.remove(path)
+            except OSError:
+                pass
+        self._file_keys_dict                                    = {}
+
+    def stats(self):
+        '''
+        Returns a dictionary with the number of entries in the cache and the bytes they use on disk.
+        '''
+        entries_l                                               = self._list_entries()
+        return {"entries": len(entries_l), "bytes": sum([size for (path, size, mtime) in entries_l])}
+
+    def _find_entry(self, excel_path, worksheet_name):
+        '''
+        Returns the absolute path of the cache entry for the worksheet, or None if there is none.
+        '''
+        if not _os.path.isfile(excel_path):
+            return None
+        entry_stem                                              = self.cache_folder + "/" + self._entry_key(excel_path, worksheet_name)
+        for extension in [self.PARQUET_EXTENSION, self.PICKLE_EXTENSION]:
+            if _os.path.isfile(entry_stem + extension):
+                return entry_stem + extension
+        return None
+
+    def _entry_key(self, excel_path, worksheet_name):
+        '''
+        Returns a string that uniquely identifies the content of worksheet `worksheet_name` in the Excel file
+        at `excel_path`, in its current state.
+        '''
+        stat                                                    = _os.stat(excel_path)
+        content_digest                                          = None
+        if _time.time() - stat.st_mtime < self.RACY_SECONDS:
+            file_signature                                      = (excel_path, stat.st_size, stat.st_mtime_ns)
+            if not file_signature in self._file_keys_dict.keys():
+                self._file_keys_dict[file_signature]            = FileDigest().raw_digest(excel_path)
+            content_digest                                      = self._file_keys_dict[file_signature]
+
+        key_data                                                = _json.dumps([_os.path.abspath(excel_path), worksheet_name,
+                                                                               stat.st_size, stat.st_mtime_ns, content_digest])
+        return _hashlib.sha256(key_data.encode("UTF8")).hexdigest()
+
+    def _roundtrips_through_parquet(self, df, tmp_path):
+        '''
+        Writes `df` to `tmp_path` in Parquet format and returns True if reading it back yields an equal DataFrame.
+        Otherwise returns False, and there is no file at `tmp_path`.
+
+        The check matters because Excel worksheets often have columns of mixed types or non-string column labels,
+        which Parquet either can't store or would silently convert, and a cached frame that differs from the
+        Excel content would make comparisons fail spuriously.
+        '''
+        if _importlib_util.find_spec("pyarrow") is None:
+            return False
+        import pandas                                           as _pd
+        try:
+            df.to_parquet(tmp_path)
+            if _pd.read_parquet(tmp_path).equals(df):
+                return True
+        except Exception:
+            pass
+        if _os.path.exists(tmp_path):
+            _os.remove(tmp_path)
+        return False
+
+    def _list_entries(self):
+        '''
+        Returns a list of (path, size, mtime) tuples, one for each entry in the cache.
+        '''
+        entries_l                                               = []
+        if not _os.path.isdir(self.cache_folder):
+            return entries_l
+        with _os.scandir(self.cache_folder) as scanner:
+            for entry in scanner:
+                if entry.is_file() and (entry.name.endswith(self.PARQUET_EXTENSION)
+                                        or entry.name.endswith(self.PICKLE_EXTENSION)):
+                    try:
+                        stat                                    = entry.stat()
+                    except OSError:
+                        continue
+                    entries_l.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries_l
+
+
+def main(argv=None):
+    '''
+    Command line interface to inspect or clear a ParsedFrameCache. For example:
+
+        python -m conway_acceptance.util.parsed_frame_cache clear <scenarios_root_folder>/CACHE/parsed_frames
+    '''
+    parser                                                      = _argparse.ArgumentParser(
+                                                                        description = "Inspect or clear a cache of parsed EXPECTED worksheets")
+    parser.add_argument("command", choices=["clear", "stats"])
+    parser.add_argument("cache_folder", help="Folder of the cache")
+    args                                                        = parser.parse_args(argv)
+
+    cache                                                       = ParsedFrameCache(args.cache_folder)
+    if args.command == "clear":
+        cache.clear()
+    print(_json.dumps(cache.stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import hashlib                                                                  as _hashlib
+import json                                                                     as _json
+import os                                                                       as _os
+import uuid                                                                     as _uuid
+import yaml                                                                     as _yaml
+
+# The C loader is much faster for large files, but only exists if PyYAML was built against libyaml
+_YAML_LOADER                                                    = getattr(_yaml, "CFullLoader", _yaml.FullLoader)
+
+
+class ScenarioRegistry():
+
+    # Extension of the compiled index saved in the index folder, like "ScenarioIds.yaml.index.json"
+    INDEX_EXTENSION                                             = ".index.json"
+
+    # Bump whenever the content of the index changes, so that indices saved by older versions are rebuilt
+    INDEX_VERSION                                               = 2
+
+    # Registries already loaded in this process, by path of their YAML file
+    _LOADED_DICT                                                = {}
+
+    def __init__(self, config_path, config_dict, mappings_key, file_stats, file_digest):
+        '''
+        Data structure class with the content of a YAML file like ScenarioIds.yaml, indexed for constant-time
+        lookups of scenario ids by test case name and of test case names by scenario id.
+
+        Instances are normally obtained with ScenarioRegistry.load, which avoids parsing the YAML file if it has
+        not changed since it was last parsed, in this process or in any other one.
+
+        Several test cases with the same scenario id would share the scenario's folder. That is not an error here,
+        so that one bad entry doesn't break lookups for all the others, but it is reported by `duplicate_ids`.
+
+        Raises a KeyError if `config_dict` has no `mappings_key` section.
+
+        @param config_path A string, the absolute path of the YAML file.
+
+        @param config_dict A dictionary, the content of the YAML file.
+
+        @param mappings_key A string, the key in `config_dict` of the dictionary mapping test case names to
+                scenario ids.
+
+        @param file_stats A tuple (size, mtime_ns) of the YAML file when it was parsed.
+
+        @param file_digest A string, the SHA-256 digest of the YAML file when it was parsed.
+        '''
+        self.config_path                                        = config_path
+        self.config_dict                                        = config_dict
+        self.file_stats                                         = file_stats
+        self.file_digest                                        = file_digest
+
+        if not mappings_key in config_dict.keys():
+            raise KeyError("There is no '" + str(mappings_key) + "' section in '" + str(config_path) + "'")
+        mappings_dict                                           = config_dict[mappings_key] or {}
+        self.ids_by_name_dict                                   = dict(mappings_dict)
+        # For duplicate ids, the first test case listed for the id
+        self.names_by_id_dict                                   = {}
+        # Lists of the names of all test cases with each id, only for ids that have more than one
+        self._duplicates_dict                                   = {}
+        for test_case_name, scenario_id in mappings_dict.items():
+            if scenario_id in self.names_by_id_dict.keys():
+                self._duplicates_dict.setdefault(scenario_id, [self.names_by_id_dict[scenario_id]]).append(test_case_name)
+                continue
+            self.names_by_id_dict[scenario_id]                  = test_case_name
+
+    @staticmethod
+    def load(config_path, mappings_key, index_folder=None):
+        '''
+        Returns a ScenarioRegistry for the YAML file at `config_path`. The file is only parsed if it changed since
+        the last time, as determined by:
+
+        * a registry already loaded in this process, if the file's size and mtime are the same as when loaded
+        * otherwise, the compiled index saved as JSON in `index_folder`, if the file's size and mtime, or else its
+          SHA-256 digest, are the same as when the index was saved.
+
+        If the file is parsed, the index is saved again, unless the YAML content doesn't survive a JSON round trip
+        unchanged (e.g., it has dates or non-string keys). Failing to save it is not an error.
+
+        @param config_path A string, the absolute path of the YAML file.
+
+        @param mappings_key A string, the key in the YAML file of the dictionary mapping test case names to
+                scenario ids.
+
+        @param index_folder A string, the absolute path of the folder in which to keep the compiled index, normally
+                a subfolder of the cache folder under the scenarios root folder. If None, no index is kept.
+        '''
+        stat                                                    = _os.stat(config_path)
+        file_stats                                              = (stat.st_size, stat.st_mtime_ns)
+
+        registry                                                = ScenarioRegistry._LOADED_DICT.get(config_path)
+        if registry is not None and registry.file_stats == file_stats:
+            return registry
+
+        index_path                                              = None
+        index_dict                                              = None
+        if index_folder is not None:
+            index_path                                          = index_folder + "/" + _os.path.basename(config_path) \
+                                                                    + ScenarioRegistry.INDEX_EXTENSION
+            index_dict                                          = ScenarioRegistry._load_index(index_path, config_path)
+        file_digest                                             = None
+        if index_dict is not None and index_dict["file_stats"] != list(file_stats):
+            file_digest                                         = ScenarioRegistry._digest(config_path)
+            if index_dict["file_digest"] != file_digest:
+                index_dict                                      = None
+
+        if index_dict is None:
+            with open(config_path, 'rb') as reader:
+                content                                         = reader.read()
+            file_digest                                         = _hashlib.sha256(content).hexdigest()
+            index_dict                                          = {"version":       ScenarioRegistry.INDEX_VERSION,
+                                                                   "config_path":   config_path,
+                                                                   "file_stats":    list(file_stats),
+                                                                   "file_digest":   file_digest,
+                                                                   "config":        _yaml.load(content, Loader=_YAML_LOADER) or {}}
+            # Built before saving the index, so that an invalid file is never indexed
+            registry                                            = ScenarioRegistry(config_path, index_dict["config"], mappings_key,
+                                                                                   file_stats, file_digest)
+            if index_path is not None:
+                ScenarioRegistry._save_index(index_path, index_dict)
+            ScenarioRegistry._LOADED_DICT[config_path]          = registry
+            return registry
+        elif index_dict["file_stats"] != list(file_stats):
+            # Same content with a new mtime (e.g., after a fresh checkout), so refresh the index to skip hashing next time
+            index_dict["file_stats"]                            = list(file_stats)
+            ScenarioRegistry._save_index(index_path, index_dict)
+
+        registry                                                = ScenarioRegistry(config_path, index_dict["config"], mappings_key,
+                                                                                   file_stats, index_dict["file_digest"])
+        ScenarioRegistry._LOADED_DICT[config_path]              = registry
+        return registry
+
+    def get_scenario_id(self, test_case_name):
+        '''
+        Returns the scenario id for the test case called `test_case_name`, or None if there is none.
+        '''
+        return self.ids_by_name_dict.get(test_case_name)
+
+    def get_test_case_name(self, scenario_id):
+        '''
+        Returns the name of the test case whose scenario id is `scenario_id`, or None if there is none.
+        '''
+        return self.names_by_id_dict.get(scenario_id)
+
+    def duplicate_ids(self):
+        '''
+        Returns a dictionary whose keys are the scenario ids used by more than one test case, and whose values are
+        lists with the names of those test cases, in the order in which they are listed. It is empty if ids are unique.
+        '''
+        return {scenario_id: list(names_l) for scenario_id, names_l in self._duplicates_dict.items()}
+
+    @staticmethod
+    def _digest(path):
+        with open(path, 'rb') as reader:
+            return _hashlib.sha256(reader.read()).hexdigest()
+
+    @staticmethod
+    def _load_index(index_path, config_path):
+        try:
+            with open(index_path, 'r', encoding="UTF8") as reader:
+                index_dict                                      = _json.load(reader)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index_dict, dict) or index_dict.get("version") != ScenarioRegistry.INDEX_VERSION \
+                or index_dict.get("config_path") != config_path:
+            return None
+        return index_dict
+
+    @staticmethod
+    def _save_index(index_path, index_dict):
+        try:
+            serialized                                          = _json.dumps(index_dict, indent=2)
+        except (TypeError, ValueError):
+            return
+        if _json.loads(serialized) != index_dict:
+            # GOTCHA: e.g., integer keys would come back as strings, so the index would not be faithful to the YAML file
+            return
+        # Write to a temporary file and rename it, so that concurrent readers never see a partial index
+        tmp_path                                                = index_path + "." + _uuid.uuid4().hex + ".tmp"
+        try:
+            _os.makedirs(_os.path.dirname(index_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding="UTF8") as writer:
+                writer.write(serialized)
+            _os.replace(tmp_path, index_path)
+        except OSError:
+            # Saving is just an optimization for the next process
+            if _os.path.exists(tmp_path):
+                _os.remove(tmp_path)
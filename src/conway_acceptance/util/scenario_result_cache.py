@@ -0,0 +1,146 @@
+import hashlib                                                                  as _hashlib
+import json                                                                     as _json
+import os                                                                       as _os
+import time                                                                     as _time
+import uuid                                                                     as _uuid
+
+from conway_acceptance.util.directory_manifest                                  import DirectoryManifest
+from conway_acceptance.util.file_digest                                         import FileDigest
+from conway_acceptance.util.test_statics                                        import TestStatics
+
+
+class ScenarioResultCache():
+
+    # Subfolder of the cache folder with, per scenario, the digests of its SEED@T* and EXPECTED@* files
+    DIGESTS_FOLDER                                              = "digests"
+    # Files modified less than this many seconds ago are always digested again, since they could still change without
+    # their modification time changing
+    RACY_SECONDS                                                = 2
+
+    def __init__(self, cache_folder):
+        '''
+        Remembers which scenarios passed, keyed by a fingerprint of everything that determines their outcome (see
+        ScenarioResultCache.fingerprint), so that a later run with the same fingerprint can report the scenario as
+        passed without running it.
+
+        There is a JSON file per fingerprint, with information about the run that passed, such as where its
+        notes are.
+
+        @param cache_folder A string, the absolute path of the folder for the cache.
+        '''
+        self.cache_folder                                       = cache_folder
+
+    def fingerprint(self, scenario_folder, test_name, excels_to_compare_l, code_version):
+        '''
+        Returns a string, a fingerprint that changes if anything that determines the outcome of a scenario's test
+        case changes:
+
+        * the content of the SEED@T* and EXPECTED@* folders of the scenario
+        * the name of the test case
+        * which Excel files and worksheets are compared, and how (e.g., with what tolerances)
+        * the version of the code under test, as supplied by the caller (e.g., a git commit hash)
+
+        @param scenario_folder A string, the absolute path of the scenario's folder.
+
+        @param test_name A string identifying the test case, like unittest's `TestCase.id()`.
+
+        @param excels_to_compare_l A list of ExcelsToCompare objects, for all the assertions made by the test case.
+
+        @param code_version A string identifying the version of the code under test.
+
+        Files are only read if their size or modification time changed since the previous call for the scenario, or if
+        they were modified very recently (see ScenarioResultCache.RACY_SECONDS). Otherwise the digest remembered under
+        ScenarioResultCache.DIGESTS_FOLDER is used.
+        '''
+        digester                                                = FileDigest()
+        memo_path                                               = self._digests_memo_path(scenario_folder)
+        memo_dict                                               = self._load_digests_memo(memo_path)
+        new_memo_dict                                           = {}
+        racy_before_ns                                          = (_time.time() - self.RACY_SECONDS) * 1e9
+        trees_l                                                 = []
+        with _os.scandir(scenario_folder) as scanner:
+            folder_names_l                                      = sorted([entry.name for entry in scanner if entry.is_dir()])
+        for folder_name in folder_names_l:
+            if not (folder_name.startswith(TestStatics.SEED_FOLDER + "@")
+                    or folder_name.startswith(TestStatics.TEST_DATABASE_EXPECTED + "@")):
+                continue
+            manifest                                            = DirectoryManifest.build(scenario_folder + "/" + folder_name)
+            digests_l                                           = []
+            for relative_path in manifest.relative_paths():
+                size, mtime_ns                                  = manifest.files_dict[relative_path]
+                memo_key                                        = folder_name + relative_path
+                remembered                                      = memo_dict.get(memo_key)
+                if remembered is not None and remembered[0] == size and remembered[1] == mtime_ns:
+                    digest                                      = remembered[2]
+                else:
+                    digest                                      = digester.raw_digest(manifest.root_folder + relative_path)
+                if mtime_ns < racy_before_ns:
+                    new_memo_dict[memo_key]                     = [size, mtime_ns, digest]
+                digests_l.append([relative_path, digest])
+            trees_l.append([folder_name, digests_l])
+
+        if new_memo_dict != memo_dict:
+            self._save_digests_memo(memo_path, new_memo_dict)
+
+        comparisons_l                                           = []
+        for excels_to_compare in excels_to_compare_l:
+            comparisons_l.append([[relative_path, [sorted(vars(sheet_info).items())
+                                                   for sheet_info in excels_to_compare.worksheets_info(relative_path)]]
+                                  for relative_path in sorted(excels_to_compare.relative_paths())])
+
+        data                                                    = [test_name, str(code_version), trees_l, comparisons_l]
+        # `default=str` because tolerances may be keyed by non-string column labels
+        return _hashlib.sha256(_json.dumps(data, default=str).encode("UTF8")).hexdigest()
+
+    def get(self, fingerprint):
+        '''
+        Returns the dictionary recorded with `put` for `fingerprint`, or None if there is none.
+        '''
+        try:
+            with open(self._entry_path(fingerprint), 'r', encoding="UTF8") as reader:
+                return _json.load(reader)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, fingerprint, record_dict):
+        '''
+        Records that the scenario with `fingerprint` passed.
+
+        @param record_dict A JSON-serializable dictionary with information about the run that passed.
+        '''
+        path                                                    = self._entry_path(fingerprint)
+        _os.makedirs(self.cache_folder, exist_ok=True)
+        tmp_path                                                = path + "." + _uuid.uuid4().hex + ".tmp"
+        with open(tmp_path, 'w', encoding="UTF8") as writer:
+            _json.dump(record_dict, writer, indent=2)
+        _os.replace(tmp_path, path)
+
+    def _entry_path(self, fingerprint):
+        return self.cache_folder + "/" + fingerprint + ".json"
+
+    def _digests_memo_path(self, scenario_folder):
+        return self.cache_folder + "/" + self.DIGESTS_FOLDER + "/" \
+                    + _hashlib.sha256(_os.path.abspath(scenario_folder).encode("UTF8")).hexdigest()[:16] + ".json"
+
+    def _load_digests_memo(self, memo_path):
+        '''
+        Returns a dictionary whose keys are strings "<folder name><relative path>" and whose values are lists
+        [size, mtime_ns, digest], or an empty dictionary if there is no valid memo at `memo_path`.
+        '''
+        try:
+            with open(memo_path, 'r', encoding="UTF8") as reader:
+                memo_dict                                       = _json.load(reader)
+        except (OSError, ValueError):
+            return {}
+        return memo_dict if isinstance(memo_dict, dict) else {}
+
+    def _save_digests_memo(self, memo_path, memo_dict):
+        try:
+            _os.makedirs(_os.path.dirname(memo_path), exist_ok=True)
+            tmp_path                                            = memo_path + "." + _uuid.uuid4().hex + ".tmp"
+            with open(tmp_path, 'w', encoding="UTF8") as writer:
+                _json.dump(memo_dict, writer)
+            _os.replace(tmp_path, memo_path)
+        except OSError:
+            # The memo is just an optimization for the next call
+            pass
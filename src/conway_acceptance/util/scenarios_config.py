@@ -1,44 +1,58 @@
-import yaml                                                                     as _yaml
-
-# We cache the dictionaries for static configurations loaded from YAML files, so that we don't have to load
-# each time we want to check out a field
-_YAML_CACHE = {}
+from conway_acceptance.util.scenario_registry                                   import ScenarioRegistry
+from conway_acceptance.util.test_statics                                        import TestStatics
 
 class ScenariosConfig():
 
-    SCENARIOS_CONFIG_FILE                                       = "ScenarioIds.yaml"  
+    SCENARIOS_CONFIG_FILE                                       = "ScenarioIds.yaml"
 
     SCENARIOS_IDS                                               = "scenario_ids"
 
 
-    def __init__(self, scenarios_repo):
+    def __init__(self, scenarios_repo, cache_folder=None):
         '''
+        @param scenarios_repo A string, the absolute path of the folder containing the ScenarioIds.yaml file.
+
+        @param cache_folder A string, the absolute path of the test harness's cache folder (see 
+                TestStatics.CACHE_FOLDER), where the compiled index of ScenarioIds.yaml is kept. If None, it is the 
+                cache folder under `scenarios_repo`, which is the one under the scenarios root folder when the
+                ScenarioIds.yaml file is kept there.
         '''
         self.scenarios_repo                                     = scenarios_repo
-        self.scenarios_id_dict                                  = self._load_scenarios_id_config(scenarios_repo)
+        self.cache_folder                                       = cache_folder or scenarios_repo + "/" + TestStatics.CACHE_FOLDER
+        self.registry                                           = self._load_registry(scenarios_repo)
+        self.scenarios_id_dict                                  = self.registry.config_dict
 
-    def _load_scenarios_id_config(self, scenarios_repo):
+    def _load_registry(self, scenarios_repo):
         '''
+        Returns a ScenarioRegistry for the ScenarioIds.yaml file in `scenarios_repo`. The YAML file is only parsed
+        if it changed since it was last loaded, so this is cheap to call in each test case and each worker process.
         '''
         path                                                    = scenarios_repo + "/" + self.SCENARIOS_CONFIG_FILE
 
-        if path in _YAML_CACHE.keys():
-            scenarios_id_dict                                   = _YAML_CACHE[path]                 
-        else:
-            with open(path, 'r', encoding="UTF8") as file:
-                scenarios_id_dict                               = _yaml.load(file, Loader=_yaml.FullLoader)
-                _YAML_CACHE[path]                               = scenarios_id_dict
+        return ScenarioRegistry.load(path, mappings_key=self.SCENARIOS_IDS,
+                                     index_folder   = self.cache_folder + "/" + TestStatics.SCENARIO_REGISTRY_CACHE)
 
-        return scenarios_id_dict
-    
     def get_scenario_id(self, test_case_name):
         '''
-        Returns an int, such as 1001, which serves as scenario id for the test case with name `test_case_name`
+        Returns an int, such as 1001, which serves as scenario id for the test case with name `test_case_name`, or
+        None if there is no such test case.
 
         @param test_case_name A string, such as "services.post_reports_governance", that identifies a test case.
         '''
-        mappings_dict                                           = self.scenarios_id_dict[self.SCENARIOS_IDS]
-        if test_case_name in mappings_dict.keys():
-            return mappings_dict[test_case_name]
-        else:
-            return None
\ No newline at end of file
+        return self.registry.get_scenario_id(test_case_name)
+
+    def get_test_case_name(self, scenario_id):
+        '''
+        Returns a string, such as "services.post_reports_governance", which is the name of the test case whose scenario
+        id is `scenario_id`, or None if there is none.
+
+        @param scenario_id An int, such as 1001, that identifies a scenario.
+        '''
+        return self.registry.get_test_case_name(scenario_id)
+
+    def duplicate_ids(self):
+        '''
+        Returns a dictionary whose keys are the scenario ids used by more than one test case in ScenarioIds.yaml, and
+        whose values are lists with the names of those test cases. It is empty if ids are unique.
+        '''
+        return self.registry.duplicate_ids()
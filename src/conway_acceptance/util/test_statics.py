@@ -23,6 +23,16 @@ class TestStatics():
     TEST_DB_SNAPSHOT_LATEST                                     = "latest"
     TEST_DB_SNAPSHOT_PREFIX                                     = "T"    
 
+    # Strategies for copying files when seeding or snapshotting a TestDatabase:
+    #
+    #   * "datahub" delegates the copy to the DataHubs, as returned by the ScenarioManifest
+    #   * "plain" copies files byte by byte
+    #   * "clone" hard-links files known to be read-only, and reflinks the others where the filesystem supports it 
+    #             (falling back to an in-kernel copy, and then to a plain copy)
+    COPY_STRATEGY_DATAHUB                                       = "datahub"
+    COPY_STRATEGY_PLAIN                                         = "plain"
+    COPY_STRATEGY_CLONE                                         = "clone"
+
     # This is a folder for datasets that are common across all scenarios. Typically this would be data that can be used
     # as inputs by the scenario foundry business logic (e.g., by the ScenarioGenerator logic) to create the seeds for 
     # test scenarios.
@@ -31,10 +41,54 @@ class TestStatics():
     GLOBAL_DATASETS_HUB                                         = "GLOBAL_DATASETS_HUB"
     GENEARATED_SCENARIO_HUB                                     = "GENEARATED_SCENARIO_HUB"
 
+    # File, in a scenario's folder, with the fingerprint of the ScenarioSpec and input datasets it was generated from
+    SPEC_FINGERPRINT_FILE                                       = "SPEC_FINGERPRINT.json"
+
 
     # Folder used to save some notes about the test run. Useful to verify what happened in the test and/or debug
     RUN_NOTES                                                   = "RUN_NOTES"
 
+    # Folder, under the scenarios root folder, for data that the test harness caches across runs to speed them up. 
+    # It can be deleted at any time, at the cost of making the next run slower.
+    CACHE_FOLDER                                                = "CACHE"
+
+    # Folder, next to ACTUALS@latest, where the seed for the next round is staged when seeding is pipelined (see
+    # TestDatabase.stage_seed). Like SEED folders, it is suffixed by the round, as in "STAGING@T2"
+    STAGING_FOLDER                                              = "STAGING"
+
+    # Subfolder of CACHE_FOLDER where DataFrames parsed from EXPECTED Excel worksheets are cached
+    PARSED_FRAMES_CACHE                                         = "parsed_frames"
+
+    # Subfolder of CACHE_FOLDER where listings of the files in EXPECTED databases are cached
+    DIRECTORY_MANIFESTS_CACHE                                   = "directory_manifests"
+
+    # Subfolder of CACHE_FOLDER where golden images of ACTUALS@latest, as populated from SEED@T0, are cached. 
+    # There is a subfolder per scenario
+    GOLDEN_IMAGES_CACHE                                         = "golden_images"
+
+    # Subfolder of CACHE_FOLDER for the content-addressable store of ACTUALS@T* snapshots, shared by all scenarios
+    SNAPSHOT_STORE_CACHE                                        = "snapshot_store"
+
+    # Environment variable to keep the ACTUALS test databases in memory (see ScenarioManifest.use_in_memory_actuals).
+    # Its value may be "1" for the default memory-backed location, or the path of a tmpfs folder to use instead.
+    IN_MEMORY_ACTUALS_ENV_VAR                                   = "CONWAY_ACCEPTANCE_IN_MEMORY"
+
+    # Subfolder of the memory-backed location where in-memory ACTUALS test databases are kept
+    IN_MEMORY_FOLDER                                            = "conway_acceptance"
+
+    # File, under CACHE_FOLDER, where the ScenarioScheduler records how long each scenario took, to schedule
+    # the longest ones first in the next run
+    SCENARIO_DURATIONS_FILE                                     = "scenario_durations.json"
+
+    # Subfolder of CACHE_FOLDER where the compiled index of ScenarioIds.yaml is kept (see ScenarioRegistry)
+    SCENARIO_REGISTRY_CACHE                                     = "scenario_registry"
+
+    # Subfolder of CACHE_FOLDER where passed scenarios are recorded by fingerprint (see ScenarioResultCache)
+    SCENARIO_RESULTS_CACHE                                      = "scenario_results"
+
+    # Environment variable that, if set to "1", makes test cases run even if the result cache says they passed
+    FORCE_RERUN_ENV_VAR                                         = "CONWAY_ACCEPTANCE_FORCE_RERUN"
+
     # When testing the projector, we need to simulate input, output, and seed db's. We use this statics to 
     # to define their roots in VM_ProjectorTestContext
     #